@@ -0,0 +1,63 @@
+"""DRF authentication classes for the API."""
+from __future__ import annotations
+
+import time
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import authentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from core import metricas, replicas
+
+from . import credenciales
+from .models import UsuarioToken
+
+
+class JWTAuthentication(authentication.JWTAuthentication):
+    """simplejwt authentication that reports its duration to :mod:`core.metricas`.
+
+    The user id is handed to :mod:`core.replicas` for read-your-writes routing.
+    """
+
+    def authenticate(self, request):
+        inicio = time.perf_counter()
+        resultado = "error"
+        try:
+            autenticado = super().authenticate(request)
+            resultado = "ok" if autenticado else "sin_token"
+            if autenticado:
+                replicas.identificar(autenticado[0].pk)
+            return autenticado
+        finally:
+            metricas.registrar_jwt(time.perf_counter() - inicio, resultado)
+
+
+class JWTSinConsultaAuthentication(JWTAuthentication):
+    """Authenticate from the signed claims instead of reading the user row on every request.
+
+    The token must carry the credential generation of the user (see
+    :mod:`accounts.credenciales`); tokens issued before it was added fall
+    back to the regular lookup. ``request.user`` is a :class:`UsuarioToken`
+    whose other fields are loaded lazily.
+    """
+
+    def get_user(self, validated_token):
+        generacion = validated_token.get(credenciales.CLAIM_GENERACION)
+        if generacion is None or "username" not in validated_token:
+            return super().get_user(validated_token)
+        try:
+            usuario_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError) as error:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from error
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not validated_token.get("is_active", False):
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if generacion != credenciales.generacion(usuario_id):
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return UsuarioToken.from_db(
+            None,
+            ["id", "username", "is_active"],
+            [usuario_id, validated_token["username"], validated_token.get("is_active", False)],
+        )
@@ -0,0 +1,168 @@
+"""Credential generations and the in-process cache behind stateless JWT authentication.
+
+Access tokens carry the user's ``username``, ``is_active`` and credential
+generation (``gen``). :class:`accounts.authentication.JWTSinConsultaAuthentication`
+trusts them as long as ``gen`` matches :func:`generacion`, which is read from a
+small in-process LRU, then from the shared cache and only then from the
+database. The full user row is loaded the same way, and only when a view reads
+a field the token does not carry.
+
+Local entries live ``AUTH_CACHE_SEGUNDOS`` at most, and so do the generations
+stored in the shared cache, whose local copies never outlive them: a
+revocation or a profile change made by another process is seen by this one
+within that window even when the Django cache is per process (LocMemCache).
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable
+from typing import Any
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import Credenciales
+
+CLAIM_GENERACION = "gen"
+# Generation of a deleted user, which no token carries.
+INEXISTENTE = -1
+
+
+class CacheLRU:
+    """Thread-safe LRU with a per-entry time to live."""
+
+    def __init__(self, maximo: int, segundos: float) -> None:
+        self.maximo = maximo
+        self.segundos = segundos
+        self._entradas: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, clave: Hashable) -> Any:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                return None
+            if entrada[0] < time.monotonic():
+                del self._entradas[clave]
+                return None
+            self._entradas.move_to_end(clave)
+            return entrada[1]
+
+    def guardar(self, clave: Hashable, valor: Any, segundos: float | None = None) -> None:
+        """Store ``valor`` for ``segundos`` (capped at the cache's time to live)."""
+
+        vida = self.segundos if segundos is None else min(segundos, self.segundos)
+        with self._lock:
+            self._entradas[clave] = (time.monotonic() + vida, valor)
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+
+    def descartar(self, clave: Hashable) -> None:
+        with self._lock:
+            self._entradas.pop(clave, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+
+def _cache_local() -> CacheLRU:
+    return CacheLRU(getattr(settings, "AUTH_CACHE_MAXIMO", 1024), getattr(settings, "AUTH_CACHE_SEGUNDOS", 30))
+
+
+_generaciones = _cache_local()
+_filas = _cache_local()
+
+
+def _clave_generacion(usuario_id: int) -> str:
+    return f"accounts:generacion:{usuario_id}"
+
+
+def _segundos() -> float:
+    return getattr(settings, "AUTH_CACHE_SEGUNDOS", 30)
+
+
+def _entrada(valor: int) -> tuple[int, float]:
+    """Shared cache entry: the generation and the wall-clock time it expires at."""
+
+    return valor, time.time() + _segundos()
+
+
+def generacion(usuario_id: int) -> int:
+    """Return the current credential generation of a user; ``-1`` if the user does not exist."""
+
+    valor = _generaciones.obtener(usuario_id)
+    if valor is None:
+        entrada = cache.get(_clave_generacion(usuario_id))
+        if entrada is None:
+            filas = list(User.objects.filter(pk=usuario_id).values_list("credenciales__generacion", flat=True))
+            entrada = _entrada((filas[0] or 0) if filas else INEXISTENTE)
+            # ``add`` so a value published by a concurrent revocation is never overwritten.
+            cache.add(_clave_generacion(usuario_id), entrada, timeout=_segundos())
+        valor, vence = entrada
+        _generaciones.guardar(usuario_id, valor, vence - time.time())
+    return valor
+
+
+def revocar(usuario_id: int) -> int:
+    """Bump the user's generation so every token issued so far is rejected; return the new one."""
+
+    with transaction.atomic():
+        Credenciales.objects.get_or_create(usuario_id=usuario_id)
+        Credenciales.objects.filter(usuario_id=usuario_id).update(generacion=F("generacion") + 1)
+        nueva = Credenciales.objects.filter(usuario_id=usuario_id).values_list("generacion", flat=True).get()
+        _olvidar(usuario_id)
+        transaction.on_commit(lambda: _publicar(usuario_id, nueva))
+    return nueva
+
+
+def _olvidar(usuario_id: int) -> None:
+    cache.delete(_clave_generacion(usuario_id))
+    _generaciones.descartar(usuario_id)
+    _filas.descartar(usuario_id)
+
+
+def _publicar(usuario_id: int, valor: int) -> None:
+    # Overwrites an old value a concurrent reader may have cached before the commit.
+    cache.set(_clave_generacion(usuario_id), _entrada(valor), timeout=_segundos())
+    _generaciones.descartar(usuario_id)
+    _filas.descartar(usuario_id)
+
+
+def fila(usuario_id: int) -> dict[str, Any] | None:
+    """Return the stored field values of a user keyed by attname, ``None`` if it does not exist."""
+
+    valores = _filas.obtener(usuario_id)
+    if valores is None:
+        campos = [campo.attname for campo in User._meta.concrete_fields]
+        valores = User.objects.filter(pk=usuario_id).values(*campos).first()
+        if valores is None:
+            return None
+        _filas.guardar(usuario_id, valores)
+    return valores
+
+
+def invalidar(usuario_id: int) -> None:
+    """Forget the cached row of a user after it changed."""
+
+    _filas.descartar(usuario_id)
+
+
+def retirar(usuario_id: int) -> None:
+    """Reject the tokens of a deleted user."""
+
+    _olvidar(usuario_id)
+    transaction.on_commit(lambda: _publicar(usuario_id, INEXISTENTE))
+
+
+def limpiar() -> None:
+    """Empty the in-process caches (tests and settings changes)."""
+
+    _generaciones.limpiar()
+    _filas.limpiar()
@@ -0,0 +1,80 @@
+"""Password hashers tuned from settings, and password checks off the event loop.
+
+``PASSWORD_HASHERS`` lists the hasher selected with ``HASH_ALGORITMO`` first
+and the others after it, so hashes made with an older algorithm or older
+costs are still accepted and Django re-hashes them with the current
+configuration the next time the user logs in. The costs are read on every
+use; raising them takes effect without touching existing hashes. The
+``benchmark_hash`` command measures candidate costs on the host.
+
+Django's ``acheck_password`` verifies on the event loop thread. Async code
+uses :func:`acomprobar` instead, which runs the hash in a pool of
+``HASH_HILOS`` threads so a burst of logins neither blocks the loop nor
+takes more CPUs than that.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+from core.asincronia import en_hilo
+
+
+class Argon2idHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with the ``HASH_ARGON2_*`` costs (the defaults follow OWASP's minimum)."""
+
+    @property
+    def time_cost(self) -> int:
+        return getattr(settings, "HASH_ARGON2_TIEMPO", 2)
+
+    @property
+    def memory_cost(self) -> int:
+        return getattr(settings, "HASH_ARGON2_MEMORIA_KIB", 19 * 1024)
+
+    @property
+    def parallelism(self) -> int:
+        return getattr(settings, "HASH_ARGON2_PARALELISMO", 1)
+
+
+class PBKDF2Hasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with ``HASH_PBKDF2_ITERACIONES`` iterations."""
+
+    @property
+    def iterations(self) -> int:
+        return getattr(settings, "HASH_PBKDF2_ITERACIONES", hashers.PBKDF2PasswordHasher.iterations)
+
+
+_ejecutor: ThreadPoolExecutor | None = None
+_ejecutor_lock = threading.Lock()
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _ejecutor
+    if _ejecutor is None:
+        with _ejecutor_lock:
+            if _ejecutor is None:
+                _ejecutor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, "HASH_HILOS", 4), thread_name_prefix="hash"
+                )
+    return _ejecutor
+
+
+async def acomprobar(usuario, password: str) -> bool:
+    """Async ``usuario.check_password``: hash in the pool, re-hash and save outdated hashes."""
+
+    loop = asyncio.get_running_loop()
+    correcta, actualizar = await loop.run_in_executor(_pool(), hashers.verify_password, password, usuario.password)
+    if correcta and actualizar:
+        usuario.password = await loop.run_in_executor(_pool(), hashers.make_password, password)
+        await en_hilo(usuario.save, update_fields=["password"])
+    return correcta
+
+
+async def ahashear_en_vano(password: str) -> None:
+    """Spend the time of a real check, so unknown usernames cannot be told apart by timing."""
+
+    await asyncio.get_running_loop().run_in_executor(_pool(), hashers.make_password, password)
@@ -0,0 +1,93 @@
+"""Measure password hashing costs on this host and recommend the ``HASH_*`` settings."""
+from __future__ import annotations
+
+import statistics
+import time
+from collections.abc import Callable
+from importlib.util import find_spec
+
+from django.contrib.auth import hashers
+from django.core.management.base import BaseCommand, CommandError
+
+PASSWORD = "benchmark-Contraseña-123"
+# OWASP's minimum for Argon2id; lower memory costs are not tried.
+ARGON2_MEMORIA_MINIMA_MIB = 19
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide cuánto tarda en este servidor un hash de contraseña con distintos costos y recomienda "
+        "los valores de HASH_* más altos que no superan --objetivo-ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--algoritmo", choices=("argon2", "pbkdf2"), default=None)
+        parser.add_argument("--objetivo-ms", type=float, default=250.0)
+        parser.add_argument("--repeticiones", type=int, default=5)
+        parser.add_argument("--memoria-max-mib", type=int, default=64)
+        parser.add_argument("--tiempo-max", type=int, default=10)
+
+    def handle(self, *args, **options):
+        algoritmo = options["algoritmo"] or ("argon2" if find_spec("argon2") else "pbkdf2")
+        objetivo = options["objetivo_ms"]
+        if objetivo <= 0 or options["repeticiones"] < 1:
+            raise CommandError("--objetivo-ms y --repeticiones deben ser positivos.")
+        if algoritmo == "argon2":
+            recomendado = self._argon2(objetivo, options)
+        else:
+            recomendado = self._pbkdf2(objetivo, options)
+        self.stdout.write(f"Recomendado para ~{objetivo:.0f} ms por verificación:")
+        for nombre, valor in {"HASH_ALGORITMO": algoritmo, **recomendado}.items():
+            self.stdout.write(f"{nombre}={valor}")
+
+    def _medir(self, hasher, repeticiones: int) -> float:
+        """Median milliseconds of one ``encode``, which costs the same as a verification."""
+
+        def encode():
+            hasher.encode(PASSWORD, hasher.salt())
+
+        return statistics.median(_cronometrar(encode) for _ in range(repeticiones))
+
+    def _pbkdf2(self, objetivo: float, options) -> dict[str, int]:
+        hasher = hashers.PBKDF2PasswordHasher()
+        # Cost is linear in the iterations: measure a sample and scale it.
+        hasher.iterations = 100_000
+        por_iteracion = self._medir(hasher, options["repeticiones"]) / hasher.iterations
+        iteraciones = max(int(objetivo / por_iteracion) // 10_000 * 10_000, 10_000)
+        hasher.iterations = iteraciones
+        ms = self._medir(hasher, options["repeticiones"])
+        self.stdout.write(f"pbkdf2_sha256 iteraciones={iteraciones}: {ms:.1f} ms")
+        return {"HASH_PBKDF2_ITERACIONES": iteraciones}
+
+    def _argon2(self, objetivo: float, options) -> dict[str, int]:
+        if not find_spec("argon2"):
+            raise CommandError("Argon2 requiere el paquete argon2-cffi (pip install argon2-cffi).")
+        memoria_max = options["memoria_max_mib"]
+        if memoria_max < ARGON2_MEMORIA_MINIMA_MIB:
+            raise CommandError(f"--memoria-max-mib debe ser al menos {ARGON2_MEMORIA_MINIMA_MIB}.")
+        memorias = sorted({ARGON2_MEMORIA_MINIMA_MIB, *(m for m in (32, 64, 128, 256) if m <= memoria_max), memoria_max})
+        hasher = hashers.Argon2PasswordHasher()
+        hasher.parallelism = 1
+        mejor = None
+        for memoria in memorias:
+            hasher.memory_cost = memoria * 1024
+            for tiempo in range(1, options["tiempo_max"] + 1):
+                hasher.time_cost = tiempo
+                ms = self._medir(hasher, options["repeticiones"])
+                self.stdout.write(f"argon2id memoria={memoria} MiB tiempo={tiempo}: {ms:.1f} ms")
+                if ms > objetivo:
+                    break
+                # Memory is what makes GPU attacks expensive: prefer it over passes.
+                if mejor is None or (memoria, tiempo) > (mejor[0], mejor[1]):
+                    mejor = (memoria, tiempo)
+        if mejor is None:
+            raise CommandError(
+                f"Ni el costo mínimo (memoria={ARGON2_MEMORIA_MINIMA_MIB} MiB, tiempo=1) cabe en {objetivo:.0f} ms."
+            )
+        return {"HASH_ARGON2_MEMORIA_KIB": mejor[0] * 1024, "HASH_ARGON2_TIEMPO": mejor[1], "HASH_ARGON2_PARALELISMO": 1}
+
+
+def _cronometrar(funcion: Callable[[], None]) -> float:
+    inicio = time.perf_counter()
+    funcion()
+    return (time.perf_counter() - inicio) * 1000
@@ -1,4 +1,56 @@
 """Database models for the accounts app."""
 from __future__ import annotations
 
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import models
+
 # The project relies on Django's built-in User model.
+
+
+class Credenciales(models.Model):
+    """Generation of a user's credentials, embedded in the JWTs issued to them.
+
+    Bumping it (see :func:`accounts.credenciales.revocar`) invalidates every
+    token issued before, without a per-request lookup of the user row.
+    """
+
+    usuario = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="credenciales",
+    )
+    generacion = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = "credenciales"
+        verbose_name_plural = "credenciales"
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.usuario_id}: {self.generacion}"
+
+
+class UsuarioToken(User):
+    """User built from the claims of an access token.
+
+    Only ``id``, ``username`` and ``is_active`` are set; the other fields are
+    deferred and loaded together, from the in-process cache of
+    :mod:`accounts.credenciales` when possible, the first time one is read.
+    """
+
+    class Meta:
+        proxy = True
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        diferidos = self.get_deferred_fields()
+        if fields is not None and from_queryset is None and set(fields) <= diferidos:
+            from . import credenciales
+
+            fila = credenciales.fila(self.pk)
+            if fila is not None:
+                for campo in self._meta.concrete_fields:
+                    if campo.attname in diferidos:
+                        setattr(self, campo.attname, fila[campo.attname])
+                return
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
@@ -17,6 +17,13 @@ class UserSerializer(serializers.ModelSerializer[User]):
         read_only_fields = fields
 
 
+class LoginSerializer(serializers.Serializer):
+    """Validate the credentials posted to the async login endpoint."""
+
+    username = serializers.CharField()
+    password = serializers.CharField(write_only=True, trim_whitespace=False)
+
+
 class ChangePasswordSerializer(serializers.Serializer):
     """Validate password change payload."""
 
@@ -0,0 +1,40 @@
+"""Signal handlers that keep the credential caches in sync with the user rows."""
+from __future__ import annotations
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import credenciales
+from .models import UsuarioToken
+
+
+# Proxy models send their own class as the sender: request.user is a UsuarioToken.
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UsuarioToken)
+def actualizar_credenciales(sender, instance, created=False, raw=False, update_fields=None, **kwargs):
+    """Drop the cached row of a changed user; revoke the tokens of a deactivated one or on a new password.
+
+    Covers every way of changing a password (the API, the admin,
+    ``changepassword``): all of them go through ``set_password``, which sets
+    ``_password`` until the user is saved. Hash upgrades on login leave it
+    unset and keep the sessions.
+    """
+
+    if raw or created:
+        return
+    usuario_id = instance.pk
+    credenciales.invalidar(usuario_id)
+    # Again once committed: a concurrent request may have cached the old row meanwhile.
+    transaction.on_commit(lambda: credenciales.invalidar(usuario_id))
+    desactivado = not instance.is_active and (update_fields is None or "is_active" in update_fields)
+    nueva_password = instance._password is not None and (update_fields is None or "password" in update_fields)
+    if desactivado or nueva_password:
+        credenciales.revocar(usuario_id)
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=UsuarioToken)
+def retirar_credenciales(sender, instance, **kwargs):
+    credenciales.retirar(instance.pk)
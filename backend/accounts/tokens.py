@@ -0,0 +1,41 @@
+"""Token serializers that add the claims read by :class:`JWTSinConsultaAuthentication`."""
+from __future__ import annotations
+
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import credenciales
+
+
+def tokens_para(usuario, generacion: int | None = None) -> RefreshToken:
+    """Return a refresh token (and its access token) carrying the user claims."""
+
+    refresh = RefreshToken.for_user(usuario)
+    refresh["username"] = usuario.get_username()
+    refresh["is_active"] = usuario.is_active
+    refresh[credenciales.CLAIM_GENERACION] = (
+        credenciales.generacion(usuario.pk) if generacion is None else generacion
+    )
+    return refresh
+
+
+class TokenConClaimsSerializer(TokenObtainPairSerializer):
+    """Login serializer whose tokens carry ``username``, ``is_active`` and ``gen``."""
+
+    @classmethod
+    def get_token(cls, user):
+        return tokens_para(user)
+
+
+class TokenRefreshConClaimsSerializer(TokenRefreshSerializer):
+    """Reject refresh tokens issued before the user's last credential change."""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        generacion = refresh.payload.get(credenciales.CLAIM_GENERACION)
+        usuario_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        if generacion is not None and usuario_id is not None and generacion != credenciales.generacion(usuario_id):
+            raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+        return super().validate(attrs)
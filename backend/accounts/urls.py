@@ -2,10 +2,18 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from core.throttling import LoginIPThrottle, LoginUsuarioThrottle
+
+from . import views_async
 from .views import ChangePasswordView, MeView
 
 urlpatterns = [
-    path("login/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
+    path(
+        "login/",
+        TokenObtainPairView.as_view(throttle_classes=[LoginIPThrottle, LoginUsuarioThrottle]),
+        name="token_obtain_pair",
+    ),
+    path("async/login/", views_async.login, name="token_obtain_pair_async"),
     path("refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("me/", MeView.as_view(), name="auth_me"),
     path("password/change/", ChangePasswordView.as_view(), name="auth_change_password"),
@@ -7,6 +7,7 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from .serializers import ChangePasswordSerializer, UserSerializer
+from .tokens import tokens_para
 
 
 class MeView(APIView):
@@ -20,7 +21,10 @@ class MeView(APIView):
 
 
 class ChangePasswordView(APIView):
-    """Allow a logged-in user to change their password."""
+    """Allow a logged-in user to change their password.
+
+    Every token issued before is revoked; the response carries a new pair.
+    """
 
     permission_classes = [IsAuthenticated]
 
@@ -29,6 +33,15 @@ class ChangePasswordView(APIView):
         serializer.is_valid(raise_exception=True)
 
         request.user.set_password(serializer.validated_data["password_nuevo"])
+        # Saving the new password revokes the previous tokens (see ``accounts.signals``).
         request.user.save(update_fields=["password"])
-
-        return Response({"detail": "Contraseña actualizada correctamente."}, status=status.HTTP_200_OK)
+        refresh = tokens_para(request.user)
+
+        return Response(
+            {
+                "detail": "Contraseña actualizada correctamente.",
+                "access": str(refresh.access_token),
+                "refresh": str(refresh),
+            },
+            status=status.HTTP_200_OK,
+        )
@@ -0,0 +1,82 @@
+"""Async login for the ASGI deployment (``uvicorn core.asgi:application``).
+
+Under ASGI every sync view runs in Django's single thread-sensitive
+executor, so a password hash checked by ``TokenObtainPairView`` stalls
+every other sync request of the process for its whole duration. This view
+takes the same payload and returns the same tokens, but checks the password
+with :func:`accounts.hashers.acomprobar` in the hashing pool and runs the
+database work in pool threads, leaving the event loop free.
+"""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import update_last_login
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+from rest_framework_simplejwt.serializers import TokenObtainSerializer
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+from core import throttling
+from core.asincronia import en_hilo, respuesta_json
+
+from . import hashers
+from .serializers import LoginSerializer
+from .tokens import tokens_para
+
+User = get_user_model()
+
+THROTTLES_LOGIN = (throttling.LoginIPThrottle, throttling.LoginUsuarioThrottle)
+
+
+def _preparar(drf_request: Request) -> tuple[float | None, dict]:
+    # Parsing the body and the rate counters may block; both run in a pool thread.
+    espera = throttling.rechazo(drf_request, clases=THROTTLES_LOGIN)
+    if espera is not None:
+        return espera, {}
+    serializer = LoginSerializer(data=drf_request.data)
+    serializer.is_valid(raise_exception=True)
+    return None, serializer.validated_data
+
+
+def _buscar(username: str):
+    try:
+        return User._default_manager.get_by_natural_key(username)
+    except User.DoesNotExist:
+        return None
+
+
+def _emitir(usuario) -> dict[str, str]:
+    refresh = tokens_para(usuario)
+    if jwt_settings.UPDATE_LAST_LOGIN:
+        update_last_login(None, usuario)
+    return {"refresh": str(refresh), "access": str(refresh.access_token)}
+
+
+async def login(request):
+    """``POST {"username", "password"}`` → ``{"refresh", "access"}``, like ``/api/v1/auth/login/``."""
+
+    if request.method != "POST":
+        return respuesta_json(
+            {"detail": f'Método "{request.method}" no permitido.'}, status=405, headers={"Allow": "POST"}
+        )
+    drf_request = Request(request, parsers=[parser() for parser in api_settings.DEFAULT_PARSER_CLASSES])
+    try:
+        espera, datos = await en_hilo(_preparar, drf_request)
+        if espera is not None:
+            raise exceptions.Throttled(wait=espera)
+        usuario = await en_hilo(_buscar, datos["username"])
+        if usuario is None:
+            await hashers.ahashear_en_vano(datos["password"])
+        elif await hashers.acomprobar(usuario, datos["password"]) and getattr(usuario, "is_active", True):
+            return respuesta_json(await en_hilo(_emitir, usuario))
+        raise exceptions.AuthenticationFailed(
+            TokenObtainSerializer.default_error_messages["no_active_account"], "no_active_account"
+        )
+    except exceptions.ValidationError as error:
+        return respuesta_json(error.detail, status=error.status_code)
+    except exceptions.APIException as error:
+        headers = {}
+        if isinstance(error, exceptions.Throttled) and error.wait is not None:
+            headers["Retry-After"] = str(int(error.wait))
+        return respuesta_json({"detail": error.detail}, status=error.status_code, headers=headers)
@@ -0,0 +1,36 @@
+"""Helpers shared by the async views."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import HttpResponse
+
+from core.renderers import JSONRapidoRenderer
+
+
+async def en_hilo(funcion: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run blocking ``funcion`` in a pool thread with its own DB connection.
+
+    Like a request, the thread's connection is checked before the call (it may
+    have expired or broken while the thread sat idle) and released after it
+    according to ``CONN_MAX_AGE``, or returned to the pool.
+    """
+
+    def _ejecutar():
+        close_old_connections()
+        try:
+            return funcion(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return await sync_to_async(_ejecutar, thread_sensitive=False)()
+
+
+def respuesta_json(data, status: int = 200, headers: dict | None = None) -> HttpResponse:
+    """JSON response rendered like the DRF views; ``None`` gives an empty body."""
+
+    contenido = b"" if data is None else JSONRapidoRenderer().render(data)
+    return HttpResponse(contenido, status=status, content_type="application/json", headers=headers)
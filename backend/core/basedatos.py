@@ -0,0 +1,104 @@
+"""``DATABASES["default"]`` built from environment variables.
+
+Two ways to reuse PostgreSQL connections between requests:
+
+- Persistent connections (the default): each worker thread keeps its
+  connection open ``DB_CONN_MAX_AGE`` seconds and, with
+  ``DB_CONN_HEALTH_CHECKS``, checks it is still usable at the start of each
+  request before trusting it. Suited to gunicorn sync workers, where every
+  worker serves one request at a time.
+- A psycopg 3 pool (``DB_POOL=1``), shared by the threads of a process:
+  a connection is taken at the start of each request and returned at the
+  end. Required under ASGI, where the async views run their queries in a
+  pool of threads (see :func:`core.asincronia.en_hilo`) that would
+  otherwise each keep a connection open. Sizes, lifetimes and the check
+  done when a connection is handed out come from ``DB_POOL_*``.
+
+``DB_REPLICAS`` adds read replicas with the same settings (see
+:mod:`core.replicas`).
+"""
+from __future__ import annotations
+
+import copy
+import os
+from collections.abc import Mapping
+from importlib.util import find_spec
+from typing import Any
+
+from django.core.exceptions import ImproperlyConfigured
+
+
+def _activo(valor: str | None) -> bool:
+    return (valor or "").strip().lower() in ("1", "true", "si", "sí", "yes")
+
+
+def opciones_pool(entorno: Mapping[str, str]) -> dict[str, Any]:
+    """Keyword arguments for ``psycopg_pool.ConnectionPool`` (``OPTIONS["pool"]``)."""
+
+    if find_spec("psycopg_pool") is None:
+        raise ImproperlyConfigured('DB_POOL=1 requiere psycopg 3 con el pool: pip install "psycopg[binary,pool]".')
+    opciones: dict[str, Any] = {
+        "min_size": int(entorno.get("DB_POOL_MIN", "2")),
+        "max_size": int(entorno.get("DB_POOL_MAX", "10")),
+        # Seconds a request waits for a free connection before failing.
+        "timeout": float(entorno.get("DB_POOL_TIMEOUT", "10")),
+        "max_lifetime": float(entorno.get("DB_POOL_MAX_LIFETIME", "1800")),
+        "max_idle": float(entorno.get("DB_POOL_MAX_IDLE", "300")),
+    }
+    if opciones["max_size"] < opciones["min_size"]:
+        raise ImproperlyConfigured("DB_POOL_MAX no puede ser menor que DB_POOL_MIN.")
+    if _activo(entorno.get("DB_POOL_CHECK", "1")):
+        from psycopg_pool import ConnectionPool
+
+        opciones["check"] = ConnectionPool.check_connection
+    return opciones
+
+
+def configuracion(entorno: Mapping[str, str] = os.environ) -> dict[str, Any]:
+    """Return the ``default`` database settings for ``entorno``."""
+
+    if entorno.get("SQLITE_PATH"):
+        return {
+            "ENGINE": "django.db.backends.sqlite3",
+            "NAME": entorno["SQLITE_PATH"],
+            "CONN_MAX_AGE": int(entorno.get("DB_CONN_MAX_AGE", "60")),
+        }
+    base: dict[str, Any] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": entorno.get("POSTGRES_DB", "postgres"),
+        "USER": entorno.get("POSTGRES_USER", "postgres"),
+        "PASSWORD": entorno.get("POSTGRES_PASSWORD", "postgres"),
+        "HOST": entorno.get("POSTGRES_HOST", "localhost"),
+        "PORT": entorno.get("POSTGRES_PORT", "5432"),
+    }
+    if _activo(entorno.get("DB_POOL")):
+        # Django refuses persistent connections together with a pool.
+        base["CONN_MAX_AGE"] = 0
+        base["OPTIONS"] = {"pool": opciones_pool(entorno)}
+    else:
+        base["CONN_MAX_AGE"] = int(entorno.get("DB_CONN_MAX_AGE", "60"))
+        base["CONN_HEALTH_CHECKS"] = _activo(entorno.get("DB_CONN_HEALTH_CHECKS", "1"))
+    return base
+
+
+def replicas(principal: dict[str, Any], entorno: Mapping[str, str] = os.environ) -> dict[str, dict[str, Any]]:
+    """Return the ``replica1``, ``replica2``... aliases listed in ``DB_REPLICAS``.
+
+    Each entry is ``host[:puerto]`` of a PostgreSQL replica, which shares the
+    name, credentials and pool settings of ``principal``; with ``SQLITE_PATH``
+    it is the path of a SQLite copy instead. Tests mirror them to ``default``.
+    """
+
+    resultado = {}
+    entradas = [entrada.strip() for entrada in entorno.get("DB_REPLICAS", "").split(",") if entrada.strip()]
+    for indice, entrada in enumerate(entradas, start=1):
+        replica = copy.deepcopy(principal)
+        if replica["ENGINE"] == "django.db.backends.sqlite3":
+            replica["NAME"] = entrada
+        else:
+            host, _, puerto = entrada.partition(":")
+            replica["HOST"] = host
+            replica["PORT"] = puerto or principal.get("PORT", "5432")
+        replica["TEST"] = {"MIRROR": "default"}
+        resultado[f"replica{indice}"] = replica
+    return resultado
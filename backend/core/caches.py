@@ -0,0 +1,19 @@
+"""Whether a Django cache is seen by every process serving the app."""
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+
+# Backends whose entries live in (or never leave) the current process.
+EN_PROCESO = frozenset(
+    {
+        "django.core.cache.backends.locmem.LocMemCache",
+        "django.core.cache.backends.dummy.DummyCache",
+    }
+)
+
+
+def compartida(alias: str = DEFAULT_CACHE_ALIAS) -> bool:
+    """Return whether a write to cache ``alias`` is visible to the other workers (Redis, memcached...)."""
+
+    return settings.CACHES[alias]["BACKEND"] not in EN_PROCESO
@@ -0,0 +1,206 @@
+"""Prometheus metrics for the API, exported at ``/metrics``.
+
+Enabled with ``METRICAS_ACTIVAS``; outside ``DEBUG`` the view also needs
+``METRICAS_TOKEN`` and answers 404 until it is set. The ``prometheus_client`` registry is
+created lazily, so nothing is imported nor recorded while metrics are off.
+Under a multi-process server (gunicorn with several workers) set
+``PROMETHEUS_MULTIPROC_DIR`` to an empty, writable directory before the
+workers start: every process then writes its samples to memory-mapped files
+there and the ``/metrics`` view aggregates all of them. ``gunicorn.conf.py``
+removes the files of workers that exit.
+
+Recorded series:
+
+- ``http_solicitud_duracion_segundos{vista,metodo}``: latency per URL name
+  (for DRF viewsets the name includes the action, e.g. ``gasto-list``).
+- ``http_respuestas_total{vista,metodo,estado}``: responses, for error rates.
+- ``http_consultas_sql{vista}``: SQL statements per request.
+- ``db_consulta_duracion_segundos{alias}``: duration of every SQL statement.
+- ``db_conexiones_total{alias}``: connections opened by Django (with
+  ``DB_POOL`` these are checkouts from the pool). With persistent
+  connections it should grow far slower than the request count.
+- ``cache_consultas_total{cache,resultado}``: hits and misses of the
+  payload caches in :mod:`finanzas.cache`.
+- ``jwt_autenticacion_duracion_segundos{resultado}``: JWT validation time.
+"""
+from __future__ import annotations
+
+import os
+import threading
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.backends.signals import connection_created
+from django.http import Http404, HttpResponse
+
+_consultas_solicitud: ContextVar[list[int] | None] = ContextVar("metricas_consultas", default=None)
+_bloqueo = threading.Lock()
+_metricas = None
+
+BUCKETS_HTTP = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BUCKETS_SQL = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+BUCKETS_CONSULTAS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+def activas() -> bool:
+    return bool(getattr(settings, "METRICAS_ACTIVAS", False))
+
+
+class _Metricas:
+    def __init__(self) -> None:
+        from prometheus_client import Counter, Histogram
+
+        self.duracion = Histogram(
+            "http_solicitud_duracion_segundos",
+            "Latencia de las solicitudes HTTP.",
+            ["vista", "metodo"],
+            buckets=BUCKETS_HTTP,
+        )
+        self.respuestas = Counter(
+            "http_respuestas_total", "Respuestas HTTP por código de estado.", ["vista", "metodo", "estado"]
+        )
+        self.consultas_solicitud = Histogram(
+            "http_consultas_sql", "Consultas SQL por solicitud.", ["vista"], buckets=BUCKETS_CONSULTAS
+        )
+        self.consulta = Histogram(
+            "db_consulta_duracion_segundos", "Duración de cada consulta SQL.", ["alias"], buckets=BUCKETS_SQL
+        )
+        self.conexiones = Counter("db_conexiones_total", "Conexiones nuevas a la base de datos.", ["alias"])
+        self.cache = Counter("cache_consultas_total", "Lecturas de caché.", ["cache", "resultado"])
+        self.jwt = Histogram(
+            "jwt_autenticacion_duracion_segundos",
+            "Tiempo de validación del token JWT.",
+            ["resultado"],
+            buckets=BUCKETS_SQL,
+        )
+
+
+def _obtener() -> _Metricas | None:
+    global _metricas
+    if _metricas is None and activas():
+        with _bloqueo:
+            if _metricas is None:
+                _metricas = _Metricas()
+    return _metricas
+
+
+class _ContadorSQL:
+    """Execute wrapper installed on every connection while metrics are on."""
+
+    def __init__(self, alias: str) -> None:
+        self.alias = alias
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metricas = _obtener()
+            if metricas is not None:
+                metricas.consulta.labels(self.alias).observe(time.perf_counter() - inicio)
+            contador = _consultas_solicitud.get()
+            if contador is not None:
+                contador[0] += 1
+
+
+def _instrumentar_conexion(sender, connection, **kwargs) -> None:
+    metricas = _obtener()
+    if metricas is None:
+        return
+    metricas.conexiones.labels(connection.alias).inc()
+    if not any(isinstance(w, _ContadorSQL) for w in connection.execute_wrappers):
+        connection.execute_wrappers.append(_ContadorSQL(connection.alias))
+
+
+connection_created.connect(_instrumentar_conexion, dispatch_uid="core.metricas")
+
+
+def registrar_cache(cache: str, acierto: bool) -> None:
+    metricas = _obtener()
+    if metricas is not None:
+        metricas.cache.labels(cache, "acierto" if acierto else "fallo").inc()
+
+
+def registrar_jwt(segundos: float, resultado: str) -> None:
+    metricas = _obtener()
+    if metricas is not None:
+        metricas.jwt.labels(resultado).observe(segundos)
+
+
+def _vista(request) -> str:
+    coincidencia = getattr(request, "resolver_match", None)
+    if coincidencia is None:
+        return "sin_ruta"
+    return coincidencia.view_name or coincidencia.route
+
+
+class MetricasMiddleware:
+    """Record latency, status and SQL query count of every request (sync and async)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not activas():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        contador = [0]
+        token = _consultas_solicitud.set(contador)
+        inicio = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _consultas_solicitud.reset(token)
+        self._registrar(request, response, time.perf_counter() - inicio, contador[0])
+        return response
+
+    async def _acall(self, request):
+        contador = [0]
+        token = _consultas_solicitud.set(contador)
+        inicio = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _consultas_solicitud.reset(token)
+        self._registrar(request, response, time.perf_counter() - inicio, contador[0])
+        return response
+
+    def _registrar(self, request, response, duracion: float, consultas: int) -> None:
+        if request.path.startswith("/metrics"):
+            return
+        metricas = _obtener()
+        vista = _vista(request)
+        metricas.duracion.labels(vista, request.method).observe(duracion)
+        metricas.respuestas.labels(vista, request.method, str(response.status_code)).inc()
+        metricas.consultas_solicitud.labels(vista).observe(consultas)
+
+
+def vista_metricas(request):
+    """Expose the registry in the Prometheus text format."""
+
+    token = getattr(settings, "METRICAS_TOKEN", "")
+    # Without a token the samples (view names, traffic) are only served in DEBUG.
+    if not activas() or not (token or settings.DEBUG):
+        raise Http404
+    if token and request.headers.get("Authorization") != f"Bearer {token}":
+        return HttpResponse(status=401)
+
+    from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest
+
+    _obtener()
+    registro = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+    return HttpResponse(generate_latest(registro), content_type=CONTENT_TYPE_LATEST)
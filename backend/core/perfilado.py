@@ -0,0 +1,193 @@
+"""Opt-in per-request profiling: wall time, SQL time, duplicate and slow queries.
+
+Enabled with ``PERFILADO_ACTIVO``; when disabled the middleware raises
+``MiddlewareNotUsed`` and is dropped from the chain, so it costs nothing.
+A ``PERFILADO_MUESTREO`` percentage of requests is instrumented: their
+timings are returned in a ``Server-Timing`` header and logged as one JSON
+line on the ``core.perfilado`` logger. Requests slower than
+``PERFILADO_LENTO_MS`` are logged as warnings and, when ``PERFILADO_DIR`` is
+set, their cProfile (or pyinstrument, if installed and selected) profile is
+written there.
+
+Statements are recorded in whichever thread they run: the async views run
+theirs in pool threads with connections of their own (see
+:func:`core.asincronia.en_hilo`), which inherit the request's context.
+"""
+from __future__ import annotations
+
+import cProfile
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("core.perfilado")
+
+
+class RegistroSQL:
+    """``execute_wrapper`` that times every statement of the request."""
+
+    def __init__(self) -> None:
+        self.consultas: list[tuple[str, tuple, float]] = []
+
+    def __call__(self, execute, sql, params, many, context):
+        inicio = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            parametros = tuple(map(repr, params)) if params is not None and not many else ()
+            self.consultas.append((sql, parametros, (time.perf_counter() - inicio) * 1000))
+
+    @property
+    def tiempo_ms(self) -> float:
+        return sum(duracion for _, _, duracion in self.consultas)
+
+    def duplicadas(self) -> int:
+        """Statements executed more than once with the very same parameters."""
+
+        repetidas = Counter((sql, parametros) for sql, parametros, _ in self.consultas)
+        return sum(veces - 1 for veces in repetidas.values() if veces > 1)
+
+    def similares(self, limite: int = 3) -> list[dict]:
+        """Statements repeated with different parameters, the usual N+1 signature."""
+
+        repetidas = Counter(sql for sql, _, _ in self.consultas)
+        return [{"sql": sql, "veces": veces} for sql, veces in repetidas.most_common(limite) if veces > 1]
+
+    def lentas(self, limite: int) -> list[dict]:
+        ordenadas = sorted(self.consultas, key=lambda consulta: consulta[2], reverse=True)[:limite]
+        return [{"sql": sql, "ms": round(duracion, 2)} for sql, _, duracion in ordenadas]
+
+
+_registro: ContextVar[RegistroSQL | None] = ContextVar("perfilado_registro", default=None)
+
+
+class _EnvolturaSQL:
+    """``execute_wrapper`` installed on every connection that feeds the current request's registro."""
+
+    def __call__(self, execute, sql, params, many, context):
+        registro = _registro.get()
+        if registro is None:
+            return execute(sql, params, many, context)
+        return registro(execute, sql, params, many, context)
+
+
+def _instrumentar_conexion(sender, connection, **kwargs) -> None:
+    if not any(isinstance(wrapper, _EnvolturaSQL) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(_EnvolturaSQL())
+
+
+class _Perfilador:
+    """Thin wrapper over cProfile or pyinstrument with a common interface."""
+
+    def __init__(self, motor: str) -> None:
+        self._pyinstrument = None
+        if motor == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:  # pragma: no cover - optional dependency
+                logger.warning("pyinstrument no está instalado; se usa cProfile.")
+            else:
+                self._pyinstrument = Profiler()
+        self._cprofile = None if self._pyinstrument else cProfile.Profile()
+
+    def __enter__(self) -> _Perfilador:
+        if self._pyinstrument:
+            self._pyinstrument.start()
+        else:
+            self._cprofile.enable()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        if self._pyinstrument:
+            self._pyinstrument.stop()
+        else:
+            self._cprofile.disable()
+
+    def guardar(self, ruta_base: Path) -> Path:
+        if self._pyinstrument:
+            ruta = ruta_base.with_suffix(".html")
+            ruta.write_text(self._pyinstrument.output_html(), encoding="utf-8")
+        else:
+            ruta = ruta_base.with_suffix(".prof")
+            self._cprofile.dump_stats(ruta)
+        return ruta
+
+
+class PerfiladoMiddleware:
+    """Instrument a sample of requests; see the module docstring for the settings."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "PERFILADO_ACTIVO", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.muestreo = float(getattr(settings, "PERFILADO_MUESTREO", 100)) / 100
+        self.lento_ms = float(getattr(settings, "PERFILADO_LENTO_MS", 500))
+        self.consultas_lentas = int(getattr(settings, "PERFILADO_CONSULTAS_LENTAS", 5))
+        directorio = getattr(settings, "PERFILADO_DIR", "")
+        self.directorio = Path(directorio) if directorio else None
+        self.motor = getattr(settings, "PERFILADO_MOTOR", "cprofile")
+        connection_created.connect(_instrumentar_conexion, dispatch_uid="core.perfilado")
+
+    def __call__(self, request):
+        if random.random() >= self.muestreo:
+            return self.get_response(request)
+
+        registro = RegistroSQL()
+        perfilador = _Perfilador(self.motor) if self.directorio else None
+        inicio = time.perf_counter()
+        # This thread's connections may have been opened before the middleware.
+        for alias in connections:
+            _instrumentar_conexion(None, connections[alias])
+        token = _registro.set(registro)
+        try:
+            if perfilador:
+                with perfilador:
+                    response = self.get_response(request)
+            else:
+                response = self.get_response(request)
+        finally:
+            _registro.reset(token)
+        total_ms = (time.perf_counter() - inicio) * 1000
+
+        db_ms = registro.tiempo_ms
+        response["Server-Timing"] = ", ".join(
+            filter(
+                None,
+                [
+                    response.get("Server-Timing"),
+                    f"total;dur={total_ms:.1f}",
+                    f'db;dur={db_ms:.1f};desc="{len(registro.consultas)} consultas"',
+                    f"app;dur={max(total_ms - db_ms, 0):.1f}",
+                ],
+            )
+        )
+
+        lenta = total_ms >= self.lento_ms
+        datos = {
+            "metodo": request.method,
+            "ruta": request.path,
+            "estado": response.status_code,
+            "usuario": getattr(getattr(request, "user", None), "pk", None),
+            "total_ms": round(total_ms, 2),
+            "db_ms": round(db_ms, 2),
+            "consultas": len(registro.consultas),
+            "duplicadas": registro.duplicadas(),
+            "similares": registro.similares(),
+            "lentas": registro.lentas(self.consultas_lentas),
+        }
+        if lenta and perfilador:
+            self.directorio.mkdir(parents=True, exist_ok=True)
+            nombre = f"{time.strftime('%Y%m%d-%H%M%S')}-{request.method}-{request.path.strip('/').replace('/', '_')}"
+            datos["perfil"] = str(perfilador.guardar(self.directorio / nombre))
+        logger.log(logging.WARNING if lenta else logging.INFO, json.dumps(datos, ensure_ascii=False))
+        return response
+
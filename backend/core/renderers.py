@@ -0,0 +1,35 @@
+"""JSON renderer backed by ``orjson`` when it is installed.
+
+The output is byte-for-byte the one of DRF's ``JSONRenderer`` with the
+default ``COMPACT_JSON`` and ``UNICODE_JSON`` settings: types orjson would
+format differently (``Decimal``, ``datetime``...) are handed to DRF's own
+encoder, and U+2028/U+2029 are escaped the same way. Indented responses, or
+other settings, fall back to the stock renderer.
+"""
+from __future__ import annotations
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class JSONRapidoRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or not self.compact
+            or self.ensure_ascii
+            or self.get_indent(accepted_media_type, renderer_context or {})
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        contenido = orjson.dumps(
+            data,
+            default=self.encoder_class().default,
+            option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS,
+        )
+        return contenido.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -0,0 +1,159 @@
+"""Read replicas: serve the reads of read-only finance requests away from the primary.
+
+The aliases in ``REPLICAS_LECTURA`` (built by :func:`core.basedatos.replicas`)
+are read-only copies of ``default``. :class:`ReplicasMiddleware` records the
+current request and :class:`EnrutadorReplicas` sends its ``finanzas`` reads
+to one of the replicas, picked at random once per request, when:
+
+- the request is a ``GET``/``HEAD`` handled by a view of ``finanzas`` (the
+  viewsets, resumen, exportar, tendencias, inicio, the async variants...),
+  except the ones in ``SOLO_PRINCIPAL``;
+- the request has not written anything and no transaction is open on
+  ``default``;
+- the user has not written in the last ``REPLICAS_PEGAJOSO_SEGUNDOS``.
+
+That last rule gives read-your-writes: every committed write to a user's
+finance data bumps their cache version (:func:`finanzas.cache.invalidar_usuario`),
+which also marks the user in the cache, and while the mark lives their
+reads stay on the primary. The mark must be seen by every worker, so
+replicas require a shared cache (``REDIS_URL``): the middleware refuses to
+start with a per-process one. The window has to exceed the replication
+lag; otherwise a payload read from a lagging replica would be cached under
+the new version. Everything else — writes, authentication, migrations and
+any code outside a request — uses ``default``.
+"""
+from __future__ import annotations
+
+import random
+from contextvars import ContextVar
+from dataclasses import dataclass
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from core import caches
+
+APPS_REPLICA = frozenset({"finanzas"})
+MODULOS_VISTAS = ("finanzas.views", "finanzas.views_async")
+# Delta sync tokens advance with the clock; a lagging replica could make them skip rows.
+SOLO_PRINCIPAL = frozenset({"sincronizar"})
+METODOS_LECTURA = frozenset({"GET", "HEAD"})
+
+
+@dataclass
+class _Solicitud:
+    request: object
+    usuario_id: int | None = None
+    alias: str | None = None
+    escribio: bool = False
+
+
+_solicitud: ContextVar[_Solicitud | None] = ContextVar("replicas_solicitud", default=None)
+
+
+def replicas() -> list[str]:
+    return list(getattr(settings, "REPLICAS_LECTURA", ()))
+
+
+def _clave(usuario_id: int) -> str:
+    return f"replicas:escritura:{usuario_id}"
+
+
+def identificar(usuario_id: int) -> None:
+    """Tell the router which user the current request belongs to (called on authentication)."""
+
+    solicitud = _solicitud.get()
+    if solicitud is not None:
+        solicitud.usuario_id = usuario_id
+
+
+def marcar_escritura(usuario_id: int) -> None:
+    """Keep the user's reads on the primary for ``REPLICAS_PEGAJOSO_SEGUNDOS``."""
+
+    if replicas():
+        cache.set(_clave(usuario_id), 1, timeout=getattr(settings, "REPLICAS_PEGAJOSO_SEGUNDOS", 10))
+
+
+def _elegir(solicitud: _Solicitud) -> str:
+    aliases = replicas()
+    request = solicitud.request
+    coincidencia = getattr(request, "resolver_match", None)
+    if (
+        not aliases
+        or request.method not in METODOS_LECTURA
+        or coincidencia is None
+        or coincidencia.func.__module__ not in MODULOS_VISTAS
+        or coincidencia.url_name in SOLO_PRINCIPAL
+    ):
+        return DEFAULT_DB_ALIAS
+    if solicitud.usuario_id is not None and cache.get(_clave(solicitud.usuario_id)):
+        return DEFAULT_DB_ALIAS
+    return random.choice(aliases)
+
+
+class EnrutadorReplicas:
+    """Database router installed when ``REPLICAS_LECTURA`` is not empty."""
+
+    def db_for_read(self, model, **hints):
+        solicitud = _solicitud.get()
+        if solicitud is None or solicitud.escribio or model._meta.app_label not in APPS_REPLICA:
+            return None
+        if solicitud.alias is None:
+            solicitud.alias = _elegir(solicitud)
+        if solicitud.alias == DEFAULT_DB_ALIAS or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return solicitud.alias
+
+    def db_for_write(self, model, **hints):
+        solicitud = _solicitud.get()
+        if solicitud is not None:
+            solicitud.escribio = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return False if db in replicas() else None
+
+
+class ReplicasMiddleware:
+    """Expose the current request to :class:`EnrutadorReplicas` (sync and async)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not replicas():
+            raise MiddlewareNotUsed
+        if not caches.compartida():
+            # A write served by another worker would not keep this one's reads on the primary.
+            raise ImproperlyConfigured("DB_REPLICAS requiere una caché compartida entre workers (REDIS_URL).")
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self._acall(request)
+        token = _solicitud.set(_Solicitud(request))
+        response = self.get_response(request)
+        return self._terminar(response, token)
+
+    async def _acall(self, request):
+        token = _solicitud.set(_Solicitud(request))
+        response = await self.get_response(request)
+        return self._terminar(response, token)
+
+    @staticmethod
+    def _terminar(response, token):
+        if response.streaming:
+            # Streaming bodies (exports) query while the server iterates them.
+            response._resource_closers.append(lambda: _solicitud.set(None))
+        else:
+            _solicitud.reset(token)
+        return response
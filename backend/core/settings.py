@@ -3,10 +3,13 @@ from __future__ import annotations
 
 import os
 from datetime import timedelta
+from importlib.util import find_spec
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+from core import basedatos
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 load_dotenv(BASE_DIR / ".env")
@@ -38,6 +41,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "core.metricas.MetricasMiddleware",
+    "core.perfilado.PerfiladoMiddleware",
+    "core.replicas.ReplicasMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",   # 👈 nuevo, arriba de CommonMiddleware
@@ -93,16 +99,39 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "core.wsgi.application"
 
-DATABASES = {
-    "default": {
-        "ENGINE": "django.db.backends.postgresql",
-        "NAME": os.environ.get("POSTGRES_DB", "postgres"),
-        "USER": os.environ.get("POSTGRES_USER", "postgres"),
-        "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "postgres"),
-        "HOST": os.environ.get("POSTGRES_HOST", "localhost"),
-        "PORT": os.environ.get("POSTGRES_PORT", "5432"),
+# PostgreSQL con conexiones persistentes (DB_CONN_MAX_AGE) o, con DB_POOL=1, un
+# pool de psycopg 3 (DB_POOL_MIN, DB_POOL_MAX, DB_POOL_MAX_LIFETIME...). Bajo
+# ASGI usar el pool. SQLITE_PATH=/ruta/db.sqlite3 usa SQLite en su lugar
+# (benchmarks y desarrollo local). Ver core.basedatos.
+DATABASES = {"default": basedatos.configuracion()}
+
+# Réplicas de lectura (ver core.replicas): DB_REPLICAS=host1,host2:5433 (o rutas
+# SQLite con SQLITE_PATH). Las lecturas GET de finanzas van a una réplica salvo
+# que el usuario haya escrito hace menos de DB_REPLICA_PEGAJOSO_SEGUNDOS, que
+# debe superar el retraso de replicación. Requiere REDIS_URL (caché compartida).
+DATABASES.update(basedatos.replicas(DATABASES["default"]))
+REPLICAS_LECTURA = [alias for alias in DATABASES if alias != "default"]
+REPLICAS_PEGAJOSO_SEGUNDOS = float(os.environ.get("DB_REPLICA_PEGAJOSO_SEGUNDOS", "10"))
+DATABASE_ROUTERS = ["core.replicas.EnrutadorReplicas"] if REPLICAS_LECTURA else []
+
+if os.environ.get("SQLITE_PATH"):
+    # SQLite ignora las columnas INCLUDE de los índices compuestos.
+    SILENCED_SYSTEM_CHECKS = ["models.W040"]
+
+# Redis en producción (REDIS_URL=redis://host:6379/0); memoria local en desarrollo y tests.
+if os.environ.get("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.environ["REDIS_URL"],
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
     }
-}
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -119,6 +148,26 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hash de contraseñas (ver accounts.hashers). HASH_ALGORITMO elige el hasher de
+# los hashes nuevos; los demás siguen aceptándose y se vuelven a generar con la
+# configuración actual al iniciar sesión. Los costos se miden en el servidor con
+# ``python manage.py benchmark_hash``.
+HASH_ALGORITMO = os.environ.get("HASH_ALGORITMO", "argon2" if find_spec("argon2") else "pbkdf2")
+HASH_ARGON2_TIEMPO = int(os.environ.get("HASH_ARGON2_TIEMPO", "2"))
+HASH_ARGON2_MEMORIA_KIB = int(os.environ.get("HASH_ARGON2_MEMORIA_KIB", str(19 * 1024)))
+HASH_ARGON2_PARALELISMO = int(os.environ.get("HASH_ARGON2_PARALELISMO", "1"))
+HASH_PBKDF2_ITERACIONES = int(os.environ.get("HASH_PBKDF2_ITERACIONES", "1000000"))
+# Hilos que verifican contraseñas en las vistas async (no bloquean el event loop).
+HASH_HILOS = int(os.environ.get("HASH_HILOS", "4"))
+_HASHERS = {"argon2": "accounts.hashers.Argon2idHasher", "pbkdf2": "accounts.hashers.PBKDF2Hasher"}
+PASSWORD_HASHERS = [
+    _HASHERS[HASH_ALGORITMO],
+    *(hasher for algoritmo, hasher in _HASHERS.items() if algoritmo != HASH_ALGORITMO),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+]
+
 LANGUAGE_CODE = "es-es"
 
 TIME_ZONE = "UTC"
@@ -133,15 +182,100 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.JWTSinConsultaAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
     ),
+    # Límites por ventana deslizante (ver core.throttling y THROTTLE_TASAS).
+    "DEFAULT_THROTTLE_CLASSES": (
+        "core.throttling.IPThrottle",
+        "core.throttling.EscrituraUsuarioThrottle",
+    ),
+    "NUM_PROXIES": int(os.environ["NUM_PROXIES"]) if os.environ.get("NUM_PROXIES") else None,
+    # Misma salida que JSONRenderer, generada con orjson si está instalado.
+    "DEFAULT_RENDERER_CLASSES": (
+        "core.renderers.JSONRapidoRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ),
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=int(os.environ.get("JWT_ACCESS_MINUTES", "5"))),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=int(os.environ.get("JWT_REFRESH_DAYS", "1"))),
     "AUTH_HEADER_TYPES": ("Bearer",),
+    # Los tokens llevan username, is_active y la generación de credenciales
+    # (ver accounts.credenciales), así cada petición evita leer auth_user.
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.tokens.TokenConClaimsSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "accounts.tokens.TokenRefreshConClaimsSerializer",
+}
+
+# Límites de solicitudes (ver core.throttling). Formato "N/periodo" (5/min,
+# 100/15m, 1000/d); una tasa vacía desactiva el límite. Con varios nodos usar
+# THROTTLE_ALMACEN=redis para compartir los contadores.
+THROTTLE_ALMACEN = os.environ.get("THROTTLE_ALMACEN", "redis" if os.environ.get("REDIS_URL") else "memoria")
+THROTTLE_REDIS_URL = os.environ.get("THROTTLE_REDIS_URL", os.environ.get("REDIS_URL", ""))
+THROTTLE_TASAS = {
+    "ip": os.environ.get("THROTTLE_IP", "1200/min"),
+    "escritura": os.environ.get("THROTTLE_ESCRITURA", "120/min"),
+    "login_ip": os.environ.get("THROTTLE_LOGIN_IP", "20/min"),
+    # Por nombre de usuario y también por IP, para que no sirva para bloquear cuentas ajenas.
+    "login_usuario": os.environ.get("THROTTLE_LOGIN_USUARIO", "5/min"),
+}
+
+# Caché en proceso de generaciones y filas de usuario usada por la autenticación.
+AUTH_CACHE_MAXIMO = int(os.environ.get("AUTH_CACHE_MAXIMO", "1024"))
+AUTH_CACHE_SEGUNDOS = float(os.environ.get("AUTH_CACHE_SEGUNDOS", "30"))
+
+# Paginación por cursor de /gastos/ e /ingresos/ (ver finanzas.pagination).
+FINANZAS_PAGE_SIZE = int(os.environ.get("FINANZAS_PAGE_SIZE", "100"))
+FINANZAS_MAX_PAGE_SIZE = int(os.environ.get("FINANZAS_MAX_PAGE_SIZE", "1000"))
+FINANZAS_PAGINACION_POR_DEFECTO = os.environ.get("FINANZAS_PAGINACION_POR_DEFECTO", "0") == "1"
+
+# Máximo de filas aceptadas por /gastos/lote/ e /ingresos/lote/.
+FINANZAS_LOTE_MAXIMO = int(os.environ.get("FINANZAS_LOTE_MAXIMO", "5000"))
+
+# Caché del resumen del dashboard (ver finanzas.cache).
+FINANZAS_CACHE_ALIAS = "default"
+FINANZAS_CACHE_TIMEOUT = int(os.environ.get("FINANZAS_CACHE_TIMEOUT", str(60 * 60 * 24)))
+# Sin Redis cada worker tiene su propia caché y no ve las invalidaciones de los
+# demás: las versiones caducan tras estos segundos para acotar datos obsoletos.
+FINANZAS_CACHE_VERSION_SEGUNDOS = float(os.environ.get("FINANZAS_CACHE_VERSION_SEGUNDOS", "30"))
+
+# Importación de cartolas (ver finanzas.importacion).
+FINANZAS_IMPORTACION_DIR = Path(os.environ.get("FINANZAS_IMPORTACION_DIR", BASE_DIR / "importaciones"))
+FINANZAS_IMPORTACION_LOTE = int(os.environ.get("FINANZAS_IMPORTACION_LOTE", "1000"))
+FINANZAS_IMPORTACION_WORKERS = int(os.environ.get("FINANZAS_IMPORTACION_WORKERS", "2"))
+FINANZAS_IMPORTACION_SINCRONA = os.environ.get("FINANZAS_IMPORTACION_SINCRONA", "0") == "1"
+
+# Sincronización incremental (ver finanzas.sincronizacion). Las marcas de borrado
+# más antiguas que la retención se eliminan con ``purgar_eliminaciones``.
+SINCRONIZACION_RETENCION_DIAS = int(os.environ.get("SINCRONIZACION_RETENCION_DIAS", "90"))
+SINCRONIZACION_MARGEN_SEGUNDOS = int(os.environ.get("SINCRONIZACION_MARGEN_SEGUNDOS", "60"))
+
+# Alertas de presupuesto (ver finanzas.alertas): porcentaje del monto asignado
+# desde el que se avisa, salvo que la partida defina su propio umbral_aviso.
+ALERTAS_UMBRAL_AVISO = int(os.environ.get("ALERTAS_UMBRAL_AVISO", "90"))
+
+# Perfilado por solicitud (ver core.perfilado). Desactivado no agrega costo.
+PERFILADO_ACTIVO = os.environ.get("PERFILADO_ACTIVO", "0") == "1"
+PERFILADO_MUESTREO = float(os.environ.get("PERFILADO_MUESTREO", "10"))
+PERFILADO_LENTO_MS = float(os.environ.get("PERFILADO_LENTO_MS", "500"))
+PERFILADO_CONSULTAS_LENTAS = int(os.environ.get("PERFILADO_CONSULTAS_LENTAS", "5"))
+PERFILADO_DIR = os.environ.get("PERFILADO_DIR", "")
+PERFILADO_MOTOR = os.environ.get("PERFILADO_MOTOR", "cprofile")
+
+# Métricas Prometheus en /metrics (ver core.metricas). Con varios workers definir
+# PROMETHEUS_MULTIPROC_DIR y usar gunicorn.conf.py. Sin DEBUG, /metrics responde 404
+# mientras METRICAS_TOKEN esté vacío.
+METRICAS_ACTIVAS = os.environ.get("METRICAS_ACTIVAS", "0") == "1"
+METRICAS_TOKEN = os.environ.get("METRICAS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {"console": {"class": "logging.StreamHandler"}},
+    "loggers": {
+        "core.perfilado": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
 }
@@ -0,0 +1,262 @@
+"""Sliding-window rate limits for the API.
+
+Each limit (``THROTTLE_TASAS``, e.g. ``"login_usuario": "5/min"``) keeps two
+counters per key: the current fixed window and the previous one. The number
+of requests in the last ``ventana`` seconds is estimated as
+``previo * (1 - transcurrido / ventana) + actual``, which smooths the burst
+a fixed window allows at its edges while storing O(1) data per key.
+
+The counters live in ``THROTTLE_ALMACEN``: ``memoria`` keeps them in the
+process (development and tests) and ``redis`` in the Redis server at
+``THROTTLE_REDIS_URL``, shared by every node, where the check and increment
+run atomically in a Lua script. If Redis cannot be reached requests are let
+through and a warning is logged.
+
+Rejected requests get DRF's 429 response with a ``Retry-After`` header.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+logger = logging.getLogger(__name__)
+
+PERIODOS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+_TASA = re.compile(r"^\s*(\d+)\s*/\s*(\d*)\s*([smhd])[a-z]*\s*$")
+
+
+@dataclass(frozen=True)
+class Resultado:
+    permitido: bool
+    espera: float = 0.0
+
+
+def parsear_tasa(tasa: str) -> tuple[int, int]:
+    """Return ``(limite, ventana_en_segundos)`` for ``"N/periodo"`` (``"5/min"``, ``"100/15m"``, ``"1000/d"``)."""
+
+    coincidencia = _TASA.match(tasa)
+    if coincidencia is None:
+        raise ValueError(f"Tasa inválida: {tasa!r}. Usa por ejemplo 5/min o 100/15m.")
+    limite, multiplo, periodo = coincidencia.groups()
+    return int(limite), int(multiplo or 1) * PERIODOS[periodo]
+
+
+def estimar(previo: int, actual: int, transcurrido: float, ventana: int) -> float:
+    """Requests counted in the sliding window ending ``transcurrido`` seconds into the current window."""
+
+    return previo * (1 - transcurrido / ventana) + actual
+
+
+def espera(previo: int, actual: int, transcurrido: float, limite: int, ventana: int) -> float:
+    """Seconds until the estimate drops below ``limite`` again."""
+
+    if actual < limite:
+        if not previo:
+            return 0.0
+        # previo * (1 - t / ventana) + actual < limite
+        return max(ventana * (1 - (limite - actual) / previo) - transcurrido, 0.0)
+    # The current count only fades once it becomes the previous window.
+    return ventana - transcurrido + ventana * (1 - limite / actual)
+
+
+class AlmacenMemoria:
+    """Counters kept in this process; each key stores its window index and two counts."""
+
+    def __init__(self, maximo: int = 100_000, reloj=time.time) -> None:
+        self.maximo = maximo
+        self.reloj = reloj
+        self._contadores: dict[str, list[int]] = {}
+        self._lock = threading.Lock()
+
+    def consumir(self, clave: str, limite: int, ventana: int) -> Resultado:
+        ahora = self.reloj()
+        indice, transcurrido = divmod(ahora, ventana)
+        indice = int(indice)
+        with self._lock:
+            contador = self._contadores.get(clave)
+            if contador is None or contador[0] < indice - 1:
+                contador = [indice, 0, 0]
+            elif contador[0] == indice - 1:
+                contador = [indice, contador[2], 0]
+            _, previo, actual = contador
+            if estimar(previo, actual, transcurrido, ventana) >= limite:
+                self._contadores[clave] = contador
+                return Resultado(False, espera(previo, actual, transcurrido, limite, ventana))
+            contador[2] += 1
+            self._contadores[clave] = contador
+            if len(self._contadores) > self.maximo:
+                self._purgar(indice)
+        return Resultado(True)
+
+    def _purgar(self, indice: int) -> None:
+        # Counters two windows old no longer affect any estimate.
+        for clave in [clave for clave, contador in self._contadores.items() if contador[0] < indice - 1]:
+            del self._contadores[clave]
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._contadores.clear()
+
+
+_SCRIPT_REDIS = """
+local actual = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previo = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previo * tonumber(ARGV[1]) + actual >= tonumber(ARGV[2]) then
+    return {0, actual, previo}
+end
+redis.call('INCR', KEYS[1])
+redis.call('EXPIRE', KEYS[1], ARGV[3])
+return {1, actual, previo}
+"""
+
+
+class AlmacenRedis:
+    """Counters shared through Redis (or any server speaking its protocol with Lua scripting)."""
+
+    def __init__(self, url: str, reloj=time.time) -> None:
+        import redis
+
+        self.cliente = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self.script = self.cliente.register_script(_SCRIPT_REDIS)
+        self.reloj = reloj
+
+    def consumir(self, clave: str, limite: int, ventana: int) -> Resultado:
+        import redis
+
+        ahora = self.reloj()
+        indice, transcurrido = divmod(ahora, ventana)
+        indice = int(indice)
+        claves = [f"throttle:{clave}:{indice}", f"throttle:{clave}:{indice - 1}"]
+        try:
+            permitido, actual, previo = self.script(
+                keys=claves, args=[repr(1 - transcurrido / ventana), limite, 2 * ventana]
+            )
+        except redis.RedisError:
+            logger.warning("No se pudo consultar el límite de solicitudes en Redis", exc_info=True)
+            return Resultado(True)
+        if permitido:
+            return Resultado(True)
+        return Resultado(False, espera(int(previo), int(actual), transcurrido, limite, ventana))
+
+    def limpiar(self) -> None:
+        for clave in self.cliente.scan_iter("throttle:*"):
+            self.cliente.delete(clave)
+
+
+_almacen = None
+_almacen_lock = threading.Lock()
+
+
+def almacen():
+    """Return the configured counter store, created on first use."""
+
+    global _almacen
+    if _almacen is None:
+        with _almacen_lock:
+            if _almacen is None:
+                if getattr(settings, "THROTTLE_ALMACEN", "memoria") == "redis":
+                    _almacen = AlmacenRedis(settings.THROTTLE_REDIS_URL)
+                else:
+                    _almacen = AlmacenMemoria(getattr(settings, "THROTTLE_MEMORIA_MAXIMO", 100_000))
+    return _almacen
+
+
+def reiniciar() -> None:
+    """Drop the store so the next request builds it from the current settings."""
+
+    global _almacen
+    with _almacen_lock:
+        _almacen = None
+
+
+class VentanaDeslizanteThrottle(BaseThrottle):
+    """Base class: ``alcance`` names the rate in ``THROTTLE_TASAS`` and :meth:`clave` the counter."""
+
+    alcance: str = ""
+
+    def clave(self, request, view) -> str | None:
+        """Return the counter key of the request, or ``None`` to skip this limit."""
+
+        raise NotImplementedError
+
+    def allow_request(self, request, view) -> bool:
+        tasa = getattr(settings, "THROTTLE_TASAS", {}).get(self.alcance)
+        if not tasa:
+            return True
+        clave = self.clave(request, view)
+        if clave is None:
+            return True
+        limite, ventana = parsear_tasa(tasa)
+        self.resultado = almacen().consumir(f"{self.alcance}:{clave}", limite, ventana)
+        return self.resultado.permitido
+
+    def wait(self) -> float | None:
+        resultado = getattr(self, "resultado", None)
+        if resultado is None or resultado.permitido:
+            return None
+        return math.ceil(resultado.espera)
+
+
+class IPThrottle(VentanaDeslizanteThrottle):
+    """Every request, per client IP (``NUM_PROXIES`` decides how ``X-Forwarded-For`` is read)."""
+
+    alcance = "ip"
+
+    def clave(self, request, view) -> str | None:
+        return self.get_ident(request)
+
+
+class EscrituraUsuarioThrottle(VentanaDeslizanteThrottle):
+    """Write requests (POST, PUT, PATCH, DELETE), per authenticated user."""
+
+    alcance = "escritura"
+
+    def clave(self, request, view) -> str | None:
+        if request.method in ("GET", "HEAD", "OPTIONS") or not request.user.is_authenticated:
+            return None
+        return str(request.user.pk)
+
+
+class LoginIPThrottle(IPThrottle):
+    """Login attempts per client IP."""
+
+    alcance = "login_ip"
+
+
+class LoginUsuarioThrottle(VentanaDeslizanteThrottle):
+    """Login attempts per username and client IP.
+
+    Counting per username alone would let anyone who knows a username keep
+    its owner locked out; per IP, a guesser is still slowed on each account.
+    """
+
+    alcance = "login_usuario"
+
+    def clave(self, request, view) -> str | None:
+        if request.method != "POST":
+            return None
+        try:
+            username = request.data.get("username")
+        except AttributeError:
+            return None
+        if not isinstance(username, str) or not username.strip():
+            return None
+        return f"{username.strip().lower()[:150]}|{self.get_ident(request)}"
+
+
+def rechazo(request, view=None, clases=None) -> float | None:
+    """Run ``clases`` (the default throttles) outside DRF's views; return the wait of the first one exceeded."""
+
+    for clase in api_settings.DEFAULT_THROTTLE_CLASSES if clases is None else clases:
+        throttle = clase()
+        if not throttle.allow_request(request, view):
+            return throttle.wait() or 0
+    return None
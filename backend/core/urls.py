@@ -2,8 +2,11 @@
 from django.contrib import admin
 from django.urls import include, path
 
+from core.metricas import vista_metricas
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/auth/", include("accounts.urls")),
     path("api/v1/", include("finanzas.urls")),
+    path("metrics", vista_metricas, name="metricas"),
 ]
@@ -3,7 +3,7 @@ from __future__ import annotations
 
 from django.contrib import admin
 
-from .models import Gasto, Ingreso, Partida
+from .models import Alerta, Gasto, Importacion, Ingreso, Partida, Recurrencia, ReglaPartida, ResumenMensual
 
 
 @admin.register(Partida)
@@ -25,3 +25,37 @@ class IngresoAdmin(admin.ModelAdmin):
     list_display = ("usuario", "monto", "fecha", "tipo")
     list_filter = ("tipo", "fecha")
     search_fields = ("usuario__username", "observacion")
+
+
+@admin.register(ResumenMensual)
+class ResumenMensualAdmin(admin.ModelAdmin):
+    list_display = ("usuario", "mes", "partida", "categoria", "total_gastos", "total_ingresos")
+    list_filter = ("mes",)
+    search_fields = ("usuario__username", "categoria")
+
+
+@admin.register(Alerta)
+class AlertaAdmin(admin.ModelAdmin):
+    list_display = ("usuario", "partida", "mes", "tipo", "porcentaje", "activa", "leida")
+    list_filter = ("tipo", "activa", "mes")
+    search_fields = ("usuario__username", "partida__nombre")
+
+
+@admin.register(ReglaPartida)
+class ReglaPartidaAdmin(admin.ModelAdmin):
+    list_display = ("usuario", "patron", "partida", "prioridad")
+    search_fields = ("usuario__username", "patron")
+
+
+@admin.register(Importacion)
+class ImportacionAdmin(admin.ModelAdmin):
+    list_display = ("usuario", "nombre_archivo", "formato", "estado", "creados", "duplicados", "created_at")
+    list_filter = ("estado", "formato")
+    search_fields = ("usuario__username", "nombre_archivo")
+
+
+@admin.register(Recurrencia)
+class RecurrenciaAdmin(admin.ModelAdmin):
+    list_display = ("usuario", "movimiento", "monto", "frecuencia", "proxima_fecha", "activa")
+    list_filter = ("movimiento", "frecuencia", "activa")
+    search_fields = ("usuario__username", "categoria", "observacion")
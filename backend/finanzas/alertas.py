@@ -0,0 +1,181 @@
+"""Budget threshold alerts, evaluated when the spend of a partida changes.
+
+The dashboard used to compare every partida's month spend with its budget
+on each read. Instead, :func:`evaluar` runs from :func:`resumenes.aplicar`
+and from the partida signals with the ``(partida, mes)`` pairs whose totals
+changed, reads their running total from :class:`ResumenMensual` along with
+the active alert and writes only the :class:`Alerta` rows whose state or
+amounts changed; the summary then just lists the active ones.
+
+A partida raises an ``aviso`` once its spend reaches ``umbral_aviso`` percent
+of ``monto_asignado`` (``ALERTAS_UMBRAL_AVISO`` when unset) and an
+``excedido`` once it goes over the budget, which replaces the ``aviso``.
+"""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, OuterRef, QuerySet, Subquery
+from django.utils import timezone
+
+from . import cache
+from .models import Alerta, Partida, ResumenMensual
+
+CERO = Decimal("0.00")
+CIEN = Decimal("100")
+
+CAMPOS_ACTUALIZABLES = ("porcentaje", "gastado", "asignado", "activa", "leida", "updated_at")
+# Fields of the active alert read along with the rollup totals.
+CAMPOS_ACTIVA = ("id", "tipo", "gastado", "asignado")
+
+
+def umbral_por_defecto() -> int:
+    return getattr(settings, "ALERTAS_UMBRAL_AVISO", 90)
+
+
+def estado(gastado: Decimal, asignado: Decimal, umbral: int | None = None) -> str | None:
+    """Return the alert ``tipo`` a partida is in, or ``None`` while it is under the threshold."""
+
+    if gastado > asignado:
+        return Alerta.Tipo.EXCEDIDO
+    umbral = umbral or umbral_por_defecto()
+    if gastado > CERO and gastado * CIEN >= asignado * umbral:
+        return Alerta.Tipo.AVISO
+    return None
+
+
+def porcentaje(gastado: Decimal, asignado: Decimal) -> Decimal | None:
+    if not asignado:
+        return None
+    return (gastado / asignado * CIEN).quantize(Decimal("0.01"))
+
+
+def evaluar(claves: Iterable[tuple[int, date]]) -> int:
+    """Re-evaluate the alerts of the ``(partida_id, mes)`` pairs; return the rows written.
+
+    A single query reads, for every pair, the owner's total from the rollup
+    together with the partida's budget and the month's active alert, so a
+    write that keeps the partida in the same state costs that read plus, when
+    an alert is active, one update of its amounts.
+    """
+
+    claves = set(claves)
+    if not claves:
+        return 0
+    partida_ids = {partida_id for partida_id, _ in claves}
+    meses = {mes for _, mes in claves}
+    activa = Alerta.objects.filter(partida_id=OuterRef("partida_id"), mes=OuterRef("mes"), activa=True)
+    # Only the owner's gastos count, as in ``Partida.gasto_total_mes``.
+    filas = (
+        ResumenMensual.objects.filter(partida_id__in=partida_ids, mes__in=meses, usuario_id=F("partida__usuario_id"))
+        .annotate(**{f"alerta_{campo}": Subquery(activa.values(campo)[:1]) for campo in CAMPOS_ACTIVA})
+        .values_list(
+            "partida_id",
+            "mes",
+            "usuario_id",
+            "total_gastos",
+            "partida__monto_asignado",
+            "partida__umbral_aviso",
+            *(f"alerta_{campo}" for campo in CAMPOS_ACTIVA),
+        )
+    )
+    estados: dict[tuple[int, date], tuple] = {}
+    for partida_id, mes, usuario_id, total, asignado, umbral, *alerta in filas:
+        if (partida_id, mes) in claves:
+            estados[(partida_id, mes)] = (usuario_id, total, asignado, umbral, alerta if alerta[0] else None)
+    faltantes = claves - estados.keys()
+    if faltantes:
+        # The rollup row is gone, so the month spend is zero: only active alerts can change.
+        for pk, partida_id, mes, usuario_id, tipo in Alerta.objects.filter(
+            partida_id__in={partida_id for partida_id, _ in faltantes},
+            mes__in={mes for _, mes in faltantes},
+            activa=True,
+        ).values_list("pk", "partida_id", "mes", "usuario_id", "tipo"):
+            if (partida_id, mes) in faltantes:
+                estados[(partida_id, mes)] = (usuario_id, CERO, None, None, [pk, tipo, None, None])
+
+    ahora = timezone.now()
+    nuevas: list[Alerta] = []
+    modificadas: list[Alerta] = []
+    desactivadas: list[Alerta] = []
+    usuarios: set[int] = set()
+    for (partida_id, mes), (usuario_id, total, asignado, umbral, alerta) in estados.items():
+        vigente = estado(total, asignado, umbral) if asignado is not None else None
+        valores = {"porcentaje": porcentaje(total, asignado), "gastado": total, "asignado": asignado}
+        if alerta is not None:
+            alerta_id, tipo, gastado, asignado_alerta = alerta
+            if tipo == vigente:
+                if (gastado, asignado_alerta) != (total, asignado):
+                    modificadas.append(Alerta(pk=alerta_id, updated_at=ahora, **valores))
+                    usuarios.add(usuario_id)
+                continue
+            desactivadas.append(Alerta(pk=alerta_id, activa=False, updated_at=ahora))
+            usuarios.add(usuario_id)
+        if vigente is not None:
+            # New, or cleared before: crossing the threshold again is a new alert for the user.
+            nuevas.append(
+                Alerta(
+                    usuario_id=usuario_id,
+                    partida_id=partida_id,
+                    mes=mes,
+                    tipo=vigente,
+                    activa=True,
+                    leida=False,
+                    **valores,
+                )
+            )
+            usuarios.add(usuario_id)
+
+    if nuevas:
+        Alerta.objects.bulk_create(
+            nuevas,
+            update_conflicts=True,
+            unique_fields=["partida", "mes", "tipo"],
+            update_fields=CAMPOS_ACTUALIZABLES,
+        )
+    if modificadas:
+        Alerta.objects.bulk_update(modificadas, ["porcentaje", "gastado", "asignado", "updated_at"])
+    if desactivadas:
+        Alerta.objects.bulk_update(desactivadas, ["activa", "updated_at"])
+    for usuario_id in usuarios:
+        cache.invalidar_usuario_al_confirmar(usuario_id)
+    return len(nuevas) + len(modificadas) + len(desactivadas)
+
+
+def evaluar_partida(partida: Partida) -> int:
+    """Re-evaluate every month of ``partida`` after its budget or threshold changed."""
+
+    meses = set(ResumenMensual.objects.filter(partida=partida).values_list("mes", flat=True))
+    meses.update(Alerta.objects.filter(partida=partida).values_list("mes", flat=True))
+    meses.add(timezone.localdate().replace(day=1))
+    return evaluar((partida.pk, mes) for mes in meses)
+
+
+def reevaluar(usuario_id: int | None = None, meses: Iterable[date] | None = None) -> int:
+    """Re-evaluate every partida and month of the rollup, e.g. after rebuilding it."""
+
+    rollup = ResumenMensual.objects.filter(partida__isnull=False)
+    activas = Alerta.objects.filter(activa=True)
+    if usuario_id is not None:
+        rollup = rollup.filter(usuario_id=usuario_id)
+        activas = activas.filter(usuario_id=usuario_id)
+    if meses is not None:
+        meses = list(meses)
+        rollup = rollup.filter(mes__in=meses)
+        activas = activas.filter(mes__in=meses)
+    with transaction.atomic():
+        return evaluar({*rollup.values_list("partida_id", "mes"), *activas.values_list("partida_id", "mes")})
+
+
+def activas(usuario_id: int, mes: date) -> QuerySet[Alerta]:
+    """Return the active alerts of a month ordered like the partidas."""
+
+    return (
+        Alerta.objects.filter(usuario_id=usuario_id, mes=mes.replace(day=1), activa=True)
+        .select_related("partida")
+        .order_by("partida__nombre", "tipo")
+    )
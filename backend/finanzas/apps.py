@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class FinanzasConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "finanzas"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401
@@ -0,0 +1,424 @@
+"""Deterministic data generation and API measurements used by the performance commands."""
+from __future__ import annotations
+
+import http.client
+import math
+import random
+import threading
+import time
+from collections.abc import Iterator
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.backends.signals import connection_created
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import resumenes, sincronizacion
+from .models import Gasto, Ingreso, Partida
+
+CATEGORIAS = ("Transporte", "Salud", "Ocio", "Mascotas", "Regalos", "Educación")
+
+
+@dataclass(frozen=True)
+class PerfilDatos:
+    """Size of the generated dataset; ``gastos``/``ingresos`` are per user."""
+
+    usuarios: int = 10
+    partidas: int = 8
+    gastos: int = 1_000
+    ingresos: int = 48
+    anios: int = 3
+    semilla: int = 1234
+
+
+def generar_datos(perfil: PerfilDatos, *, prefijo: str = "bench", lote: int = 5_000) -> list[int]:
+    """Create (or reuse) ``perfil.usuarios`` users filled with ledger rows.
+
+    Users are named ``<prefijo>_<n>``. If they already exist the dataset is
+    reused as-is, so re-running a benchmark against a multi-million row seed
+    does not pay the generation cost again. Rows are inserted with
+    ``bulk_create`` and the monthly rollup is rebuilt afterwards.
+    """
+
+    User = get_user_model()
+    nombres = [f"{prefijo}_{indice:05d}" for indice in range(perfil.usuarios)]
+    existentes = dict(User.objects.filter(username__in=nombres).values_list("username", "pk"))
+    if len(existentes) == len(nombres):
+        return [existentes[nombre] for nombre in nombres]
+
+    rng = random.Random(perfil.semilla)
+    hasta = timezone.localdate()
+    desde = hasta - timedelta(days=365 * perfil.anios)
+    ids: list[int] = []
+    for nombre in nombres:
+        if nombre in existentes:
+            ids.append(existentes[nombre])
+            continue
+        with transaction.atomic():
+            usuario = User(username=nombre)
+            usuario.set_unusable_password()
+            usuario.save()
+            partidas = Partida.objects.bulk_create(
+                Partida(
+                    usuario=usuario,
+                    nombre=f"Partida {indice}",
+                    tipo=rng.choice(Partida.Tipo.values),
+                    monto_asignado=Decimal(rng.randrange(50_000, 500_000)) / 100,
+                )
+                for indice in range(perfil.partidas)
+            )
+            _insertar(Gasto, _gastos(rng, usuario.pk, [p.pk for p in partidas], perfil.gastos, desde, hasta), lote)
+            _insertar(Ingreso, _ingresos(rng, usuario.pk, perfil.ingresos, desde, hasta), lote)
+            resumenes.reconstruir(usuario_id=usuario.pk)
+        ids.append(usuario.pk)
+    return ids
+
+
+def servidor() -> str:
+    """Host name accepted by ``ALLOWED_HOSTS`` for in-process requests."""
+
+    hosts = [host for host in settings.ALLOWED_HOSTS if host not in ("*", "")]
+    return hosts[0].lstrip(".") if hosts else "localhost"
+
+
+def _cliente() -> APIClient:
+    return APIClient(SERVER_NAME=servidor())
+
+
+def cliente_api(usuario) -> APIClient:
+    """Return an in-process API client authenticated as ``usuario``."""
+
+    cliente = _cliente()
+    cliente.force_authenticate(user=usuario)
+    return cliente
+
+
+CLAVE_BENCHMARK = "benchmark-clave-1234"
+
+
+@dataclass(frozen=True)
+class Escenario:
+    """One API call measured by ``benchmark_api``."""
+
+    nombre: str
+    metodo: str
+    ruta: str
+    datos: dict | list | None = None
+    autenticado: bool = True
+    estado: int = 200
+
+
+@dataclass
+class Medicion:
+    """Latency percentiles (ms), throughput and SQL queries of an :class:`Escenario`."""
+
+    nombre: str
+    repeticiones: int
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    solicitudes_por_segundo: float
+    consultas: int
+    errores: list[str] = field(default_factory=list)
+
+    def como_dict(self) -> dict:
+        datos = asdict(self)
+        datos.pop("nombre")
+        datos.pop("errores")
+        return datos
+
+
+def escenarios(usuario) -> list[Escenario]:
+    """Return one scenario per endpoint of ``finanzas.urls`` and ``accounts.urls``.
+
+    The password change is left out, since it would revoke the tokens of the
+    other scenarios, and so are the uploads of bank statements, processed
+    off the request. Detail routes use the oldest rows of ``usuario``; write
+    scenarios are meant to run inside a transaction that is rolled back
+    afterwards.
+    """
+
+    gasto = Gasto.objects.filter(usuario=usuario).order_by("pk").values_list("pk", flat=True).first()
+    ingreso = Ingreso.objects.filter(usuario=usuario).order_by("pk").values_list("pk", flat=True).first()
+    partida = Partida.objects.filter(usuario=usuario).order_by("pk").values_list("pk", flat=True).first()
+    hoy = timezone.localdate()
+    refresh = str(RefreshToken.for_user(usuario))
+    token_delta = sincronizacion.codificar_token(timezone.now() - timedelta(hours=1))
+    lista = [
+        Escenario("auth_login", "post", "/api/v1/auth/login/",
+                  {"username": usuario.get_username(), "password": CLAVE_BENCHMARK}, autenticado=False),
+        Escenario("auth_login_async", "post", "/api/v1/auth/async/login/",
+                  {"username": usuario.get_username(), "password": CLAVE_BENCHMARK}, autenticado=False),
+        Escenario("auth_refresh", "post", "/api/v1/auth/refresh/", {"refresh": refresh}, autenticado=False),
+        Escenario("auth_me", "get", "/api/v1/auth/me/"),
+        Escenario("resumen", "get", "/api/v1/resumen/"),
+        Escenario("inicio", "get", "/api/v1/inicio/"),
+        Escenario("tendencias_mes", "get", f"/api/v1/tendencias/?periodo=mes&desde={hoy.year - 5}-01-01"),
+        Escenario("tendencias_semana", "get", "/api/v1/tendencias/?periodo=semana"),
+        Escenario("partidas", "get", "/api/v1/partidas/"),
+        Escenario("gastos", "get", "/api/v1/gastos/"),
+        Escenario("gastos_pagina", "get", "/api/v1/gastos/?page_size=100"),
+        Escenario("gastos_mes", "get", f"/api/v1/gastos/?desde={hoy.replace(day=1)}"),
+        Escenario("ingresos", "get", "/api/v1/ingresos/"),
+        Escenario("ingresos_pagina", "get", "/api/v1/ingresos/?page_size=100"),
+        Escenario("reglas_partida", "get", "/api/v1/reglas-partida/"),
+        Escenario("recurrencias", "get", "/api/v1/recurrencias/"),
+        Escenario("importaciones", "get", "/api/v1/importaciones/"),
+        Escenario("alertas", "get", "/api/v1/alertas/?activas=1"),
+        Escenario("exportar_csv", "get", f"/api/v1/exportar/?desde={hoy.replace(day=1)}"),
+        Escenario("sincronizar", "get", "/api/v1/sincronizar/"),
+        Escenario("sincronizar_delta", "get", f"/api/v1/sincronizar/?token={token_delta}"),
+        Escenario("async_resumen", "get", "/api/v1/async/resumen/"),
+        Escenario("async_gastos", "get", "/api/v1/async/gastos/"),
+        Escenario("async_ingresos", "get", "/api/v1/async/ingresos/"),
+        Escenario("async_partidas", "get", "/api/v1/async/partidas/"),
+        Escenario(
+            "gastos_crear",
+            "post",
+            "/api/v1/gastos/",
+            {"partida": partida, "monto": "1000.00", "fecha": str(hoy), "tipo": "variable"},
+            estado=201,
+        ),
+        Escenario(
+            "ingresos_crear", "post", "/api/v1/ingresos/", {"monto": "1000.00", "fecha": str(hoy)}, estado=201
+        ),
+        Escenario(
+            "gastos_lote",
+            "post",
+            "/api/v1/gastos/lote/",
+            [{"partida": partida, "monto": "10.00", "fecha": str(hoy)} for _ in range(100)],
+            estado=201,
+        ),
+    ]
+    if partida:
+        lista.append(Escenario("partida_detalle", "get", f"/api/v1/partidas/{partida}/"))
+    if gasto:
+        lista.append(Escenario("gasto_detalle", "get", f"/api/v1/gastos/{gasto}/"))
+        lista.append(Escenario("gasto_editar", "patch", f"/api/v1/gastos/{gasto}/", {"observacion": "bench"}))
+    if ingreso:
+        lista.append(Escenario("ingreso_detalle", "get", f"/api/v1/ingresos/{ingreso}/"))
+    return lista
+
+
+def cliente_jwt(usuario) -> APIClient:
+    """Return an API client that authenticates with a real access token."""
+
+    cliente = _cliente()
+    cliente.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(usuario).access_token}")
+    return cliente
+
+
+# Statements of the call being measured; the async views run theirs in pool
+# threads, which inherit the context and so add to the same counter.
+_consultas: ContextVar[list[int] | None] = ContextVar("benchmark_consultas", default=None)
+
+
+class _ContadorConsultas:
+    """``execute_wrapper`` installed on every connection that counts the measured statements."""
+
+    def __call__(self, execute, sql, params, many, context):
+        contador = _consultas.get()
+        if contador is not None:
+            contador[0] += 1
+        return execute(sql, params, many, context)
+
+
+def _instrumentar_conexion(sender, connection, **kwargs) -> None:
+    if not any(isinstance(wrapper, _ContadorConsultas) for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(_ContadorConsultas())
+
+
+connection_created.connect(_instrumentar_conexion, dispatch_uid="finanzas.benchmarking")
+
+
+def percentil(valores: list[float], percentil: float) -> float:
+    ordenados = sorted(valores)
+    indice = max(0, math.ceil(percentil / 100 * len(ordenados)) - 1)
+    return ordenados[indice]
+
+
+def medir(cliente: APIClient, escenario: Escenario, repeticiones: int) -> Medicion:
+    """Call ``escenario`` ``repeticiones`` times after one warm-up call.
+
+    ``consultas`` is the number of SQL queries of the warm-up call, i.e. the
+    worst case with cold caches, counting those the async views run in pool
+    threads.
+    """
+
+    llamar = getattr(cliente if escenario.autenticado else _cliente(), escenario.metodo)
+    errores: list[str] = []
+
+    def _llamar():
+        respuesta = llamar(escenario.ruta, escenario.datos, format="json")
+        if respuesta.status_code != escenario.estado and len(errores) < 3:
+            errores.append(f"{escenario.nombre}: HTTP {respuesta.status_code}")
+        if getattr(respuesta, "streaming", False):
+            b"".join(respuesta.streaming_content)
+        return respuesta
+
+    # The current connection may predate the signal handler.
+    _instrumentar_conexion(None, connection)
+    contador = [0]
+    token = _consultas.set(contador)
+    try:
+        _llamar()
+    finally:
+        _consultas.reset(token)
+    tiempos = []
+    inicio_total = time.perf_counter()
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        _llamar()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    total = time.perf_counter() - inicio_total
+    return Medicion(
+        nombre=escenario.nombre,
+        repeticiones=repeticiones,
+        p50_ms=round(percentil(tiempos, 50), 3),
+        p95_ms=round(percentil(tiempos, 95), 3),
+        p99_ms=round(percentil(tiempos, 99), 3),
+        solicitudes_por_segundo=round(repeticiones / total, 1) if total else 0.0,
+        consultas=contador[0],
+        errores=errores,
+    )
+
+
+def comparar(mediciones: list[Medicion], linea_base: dict, *, tolerancia: float, solo_consultas: bool) -> list[str]:
+    """Return the regressions of ``mediciones`` against a stored baseline.
+
+    Any increase in the query count is a regression; latency regresses when
+    p95 exceeds the baseline by more than ``tolerancia`` (0.5 = +50%).
+    """
+
+    regresiones = []
+    for medicion in mediciones:
+        base = linea_base.get(medicion.nombre)
+        if base is None:
+            continue
+        if medicion.consultas > base["consultas"]:
+            regresiones.append(
+                f"{medicion.nombre}: {medicion.consultas} consultas SQL (línea base {base['consultas']})"
+            )
+        if not solo_consultas and medicion.p95_ms > base["p95_ms"] * (1 + tolerancia):
+            regresiones.append(
+                f"{medicion.nombre}: p95 {medicion.p95_ms:.1f} ms (línea base {base['p95_ms']:.1f} ms)"
+            )
+    return regresiones
+
+
+@dataclass
+class ResultadoCarga:
+    """Outcome of :func:`carga_http`; latencies in milliseconds."""
+
+    solicitudes: int
+    errores: int
+    solicitudes_por_segundo: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+
+
+def carga_http(url: str, encabezados: dict[str, str], *, concurrencia: int, duracion: float) -> ResultadoCarga:
+    """Hit ``url`` from ``concurrencia`` keep-alive connections for ``duracion`` seconds."""
+
+    partes = urlsplit(url)
+    ruta = partes.path + (f"?{partes.query}" if partes.query else "")
+    tiempos: list[float] = []
+    errores = [0]
+    bloqueo = threading.Lock()
+    fin = time.perf_counter() + duracion
+
+    def _trabajador():
+        conexion = None
+        propios: list[float] = []
+        fallidas = 0
+        while time.perf_counter() < fin:
+            if conexion is None:
+                conexion = http.client.HTTPConnection(partes.hostname, partes.port or 80, timeout=30)
+            inicio = time.perf_counter()
+            try:
+                conexion.request("GET", ruta, headers=encabezados)
+                respuesta = conexion.getresponse()
+                respuesta.read()
+                if respuesta.status != 200:
+                    fallidas += 1
+                if respuesta.will_close:
+                    conexion.close()
+                    conexion = None
+            except (OSError, http.client.HTTPException):
+                fallidas += 1
+                conexion.close()
+                conexion = None
+                continue
+            propios.append((time.perf_counter() - inicio) * 1000)
+        if conexion is not None:
+            conexion.close()
+        with bloqueo:
+            tiempos.extend(propios)
+            errores[0] += fallidas
+
+    hilos = [threading.Thread(target=_trabajador) for _ in range(concurrencia)]
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    transcurrido = time.perf_counter() - inicio
+    if not tiempos:
+        return ResultadoCarga(0, errores[0], 0.0, 0.0, 0.0, 0.0)
+    return ResultadoCarga(
+        solicitudes=len(tiempos),
+        errores=errores[0],
+        solicitudes_por_segundo=round(len(tiempos) / transcurrido, 1),
+        p50_ms=round(percentil(tiempos, 50), 2),
+        p95_ms=round(percentil(tiempos, 95), 2),
+        p99_ms=round(percentil(tiempos, 99), 2),
+    )
+
+
+def _fecha(rng: random.Random, desde: date, hasta: date) -> date:
+    return desde + timedelta(days=rng.randrange((hasta - desde).days + 1))
+
+
+def _gastos(
+    rng: random.Random, usuario_id: int, partidas: list[int], cantidad: int, desde: date, hasta: date
+) -> Iterator[Gasto]:
+    for _ in range(cantidad):
+        con_partida = partidas and rng.random() < 0.8
+        yield Gasto(
+            usuario_id=usuario_id,
+            partida_id=rng.choice(partidas) if con_partida else None,
+            categoria="" if con_partida else rng.choice(CATEGORIAS),
+            monto=Decimal(rng.randrange(100, 15_000_000)) / 100,
+            fecha=_fecha(rng, desde, hasta),
+            tipo=rng.choice(Gasto.Tipo.values),
+        )
+
+
+def _ingresos(rng: random.Random, usuario_id: int, cantidad: int, desde: date, hasta: date) -> Iterator[Ingreso]:
+    for _ in range(cantidad):
+        yield Ingreso(
+            usuario_id=usuario_id,
+            monto=Decimal(rng.randrange(10_000_000, 300_000_000)) / 100,
+            fecha=_fecha(rng, desde, hasta),
+            tipo=rng.choice(Ingreso.Tipo.values),
+        )
+
+
+def _insertar(modelo, filas: Iterator, lote: int) -> None:
+    buffer = []
+    for fila in filas:
+        buffer.append(fila)
+        if len(buffer) >= lote:
+            modelo.objects.bulk_create(buffer)
+            buffer.clear()
+    if buffer:
+        modelo.objects.bulk_create(buffer)
@@ -0,0 +1,124 @@
+"""Per-user cache of derived finance payloads with version-key invalidation.
+
+Every user has a version number stored in the cache. Cached payloads and
+ETags embed that version, so bumping it after a write makes all previous
+entries unreachable without having to know or delete their keys.
+
+The main version covers gastos, ingresos and partidas, which feed each
+other's payloads; collections that do not affect them (``reglas``,
+``recurrencias``, ``importaciones``) keep their own version under the same
+scheme so their writes do not invalidate the dashboard.
+
+A per-process cache (LocMemCache, the default without ``REDIS_URL``) never
+sees the bumps made by the other workers, so there the versions expire
+after ``FINANZAS_CACHE_VERSION_SEGUNDOS``: that bounds how long another
+worker serves a stale payload or answers ``304`` to a stale ETag.
+"""
+from __future__ import annotations
+
+import hashlib
+import time
+from typing import Any
+
+from django.conf import settings
+from django.core.cache import BaseCache, caches
+from django.db import transaction
+from django.utils.http import parse_etags
+
+from core import caches as caches_core
+from core import metricas, replicas
+
+
+def _cache() -> BaseCache:
+    return caches[getattr(settings, "FINANZAS_CACHE_ALIAS", "default")]
+
+
+def _vida_version() -> float | None:
+    """Timeout of the version keys: none in a shared cache, short in a per-process one."""
+
+    if caches_core.compartida(getattr(settings, "FINANZAS_CACHE_ALIAS", "default")):
+        return None
+    return getattr(settings, "FINANZAS_CACHE_VERSION_SEGUNDOS", 30)
+
+
+def _clave_version(usuario_id: int, coleccion: str | None = None) -> str:
+    if coleccion:
+        return f"finanzas:version:{usuario_id}:{coleccion}"
+    return f"finanzas:version:{usuario_id}"
+
+
+def version_usuario(usuario_id: int, coleccion: str | None = None) -> int:
+    """Return the current data version of a user, initialising it if needed."""
+
+    cache = _cache()
+    clave = _clave_version(usuario_id, coleccion)
+    version = cache.get(clave)
+    if version is None:
+        # Seed from the clock so an evicted or expired counter never repeats an old version.
+        cache.add(clave, time.time_ns(), timeout=_vida_version())
+        version = cache.get(clave)
+    return version
+
+
+def invalidar_usuario(usuario_id: int, coleccion: str | None = None) -> None:
+    """Bump the user's version so every cached payload and ETag becomes stale.
+
+    Also keeps the user's reads on the primary database for a while (see
+    :mod:`core.replicas`), since the new rows may not have reached the replicas.
+    """
+
+    replicas.marcar_escritura(usuario_id)
+    cache = _cache()
+    clave = _clave_version(usuario_id, coleccion)
+    try:
+        cache.incr(clave)
+    except ValueError:
+        cache.set(clave, time.time_ns(), timeout=_vida_version())
+
+
+def invalidar_usuario_al_confirmar(usuario_id: int, coleccion: str | None = None) -> None:
+    """Invalidate once the current transaction commits.
+
+    Bumping before the commit would let a concurrent reader cache
+    pre-commit data under the new version.
+    """
+
+    transaction.on_commit(lambda: invalidar_usuario(usuario_id, coleccion))
+
+
+def clave_resumen(usuario_id: int, mes: str, version: int) -> str:
+    return f"finanzas:resumen:{usuario_id}:{mes}:{version}"
+
+
+def clave_tendencias(usuario_id: int, periodo: str, desde, hasta, version: int) -> str:
+    return f"finanzas:tendencias:{usuario_id}:{periodo}:{desde}:{hasta}:{version}"
+
+
+def obtener(clave: str) -> Any:
+    valor = _cache().get(clave)
+    metricas.registrar_cache(clave.split(":", 2)[1], valor is not None)
+    return valor
+
+
+def guardar(clave: str, valor: Any) -> None:
+    _cache().set(clave, valor, timeout=getattr(settings, "FINANZAS_CACHE_TIMEOUT", 60 * 60 * 24))
+
+
+def etag(*partes: object) -> str:
+    """Build a strong ETag from the given parts."""
+
+    digest = hashlib.sha1(":".join(str(parte) for parte in partes).encode()).hexdigest()
+    return f'"{digest}"'
+
+
+def etag_coincide(request, valor: str) -> bool:
+    """Return whether ``If-None-Match`` matches ``valor`` (weak comparison)."""
+
+    encabezado = request.headers.get("If-None-Match")
+    if not encabezado:
+        return False
+    etags = parse_etags(encabezado)
+    if "*" in etags:
+        return True
+    valor = valor.removeprefix("W/")
+    return any(candidato.removeprefix("W/") == valor for candidato in etags)
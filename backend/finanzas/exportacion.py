@@ -0,0 +1,180 @@
+"""Streaming export of a user's ledger as CSV or XLSX.
+
+Rows are read with server-side cursors (``iterator(chunk_size=...)``) and
+written straight to the response, so neither format keeps the ledger in
+memory. XLSX is produced as a zip written to an unseekable stream, with the
+worksheet emitted row by row using inline strings.
+
+CSV text cells that a spreadsheet would read as a formula (leading ``=``,
+``+``, ``-``, ``@``, tab or carriage return) are prefixed with ``'``. XLSX
+inline strings are never evaluated, so they are written as they are.
+"""
+from __future__ import annotations
+
+import csv
+import heapq
+import re
+import zipfile
+from collections.abc import Iterator
+from datetime import date
+from xml.sax.saxutils import escape
+
+from .models import Gasto, Ingreso
+
+TAMANO_CURSOR = 2000
+ENCABEZADOS = ("movimiento", "fecha", "monto", "partida", "categoria", "tipo", "observacion")
+INICIO_FORMULA = ("=", "+", "-", "@", "\t", "\r")
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def filas(usuario, desde: date | None = None, hasta: date | None = None) -> Iterator[tuple]:
+    """Yield gastos and ingresos merged by date, as tuples matching ``ENCABEZADOS``."""
+
+    gastos = Gasto.objects.filter(usuario=usuario)
+    ingresos = Ingreso.objects.filter(usuario=usuario)
+    if desde:
+        gastos = gastos.filter(fecha__gte=desde)
+        ingresos = ingresos.filter(fecha__gte=desde)
+    if hasta:
+        gastos = gastos.filter(fecha__lte=hasta)
+        ingresos = ingresos.filter(fecha__lte=hasta)
+
+    orden = ("fecha", "created_at", "id")
+    filas_gastos = (
+        (fecha, creado, pk, ("gasto", fecha, monto, partida or "", categoria, tipo, observacion))
+        for fecha, creado, pk, monto, partida, categoria, tipo, observacion in gastos.order_by(*orden)
+        .values_list(*orden, "monto", "partida__nombre", "categoria", "tipo", "observacion")
+        .iterator(chunk_size=TAMANO_CURSOR)
+    )
+    filas_ingresos = (
+        (fecha, creado, pk, ("ingreso", fecha, monto, "", "", tipo, observacion))
+        for fecha, creado, pk, monto, tipo, observacion in ingresos.order_by(*orden)
+        .values_list(*orden, "monto", "tipo", "observacion")
+        .iterator(chunk_size=TAMANO_CURSOR)
+    )
+    for *_, fila in heapq.merge(filas_gastos, filas_ingresos, key=lambda item: item[:2]):
+        yield fila
+
+
+class _Eco:
+    """File-like object whose ``write`` returns the value, for ``csv.writer``."""
+
+    def write(self, valor: str) -> str:
+        return valor
+
+
+def _texto_seguro(valor):
+    if isinstance(valor, str) and valor.startswith(INICIO_FORMULA):
+        return "'" + valor
+    return valor
+
+
+def csv_streaming(usuario, desde: date | None = None, hasta: date | None = None) -> Iterator[str]:
+    escritor = csv.writer(_Eco())
+    yield escritor.writerow(ENCABEZADOS)
+    for fila in filas(usuario, desde, hasta):
+        yield escritor.writerow([_texto_seguro(valor) for valor in fila])
+
+
+class _Salida:
+    """Unseekable sink that buffers what ``zipfile`` writes until it is drained."""
+
+    def __init__(self) -> None:
+        self._partes: list[bytes] = []
+
+    def write(self, datos: bytes) -> int:
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def flush(self) -> None:
+        pass
+
+    def vaciar(self) -> bytes:
+        datos = b"".join(self._partes)
+        self._partes.clear()
+        return datos
+
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Movimientos" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+_CARACTERES_INVALIDOS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+
+def _celda(valor) -> str:
+    if isinstance(valor, (int, float)) or (hasattr(valor, "is_finite") and valor.is_finite()):
+        return f"<c><v>{valor}</v></c>"
+    texto = _CARACTERES_INVALIDOS.sub("", str(valor))
+    return f'<c t="inlineStr"><is><t xml:space="preserve">{escape(texto)}</t></is></c>'
+
+
+def _fila_xml(fila) -> str:
+    return "<row>" + "".join(_celda(valor) for valor in fila) + "</row>"
+
+
+def xlsx_streaming(
+    usuario, desde: date | None = None, hasta: date | None = None, *, filas_por_fragmento: int = 500
+) -> Iterator[bytes]:
+    salida = _Salida()
+    with zipfile.ZipFile(salida, "w", compression=zipfile.ZIP_DEFLATED) as archivo:
+        archivo.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        archivo.writestr("_rels/.rels", _RELS)
+        archivo.writestr("xl/workbook.xml", _WORKBOOK)
+        archivo.writestr("xl/_rels/workbook.xml.rels", _WORKBOOK_RELS)
+        with archivo.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as hoja:
+            hoja.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+            )
+            hoja.write(_fila_xml(ENCABEZADOS).encode())
+            for indice, fila in enumerate(filas(usuario, desde, hasta), start=1):
+                hoja.write(_fila_xml((fila[0], fila[1].isoformat(), *fila[2:])).encode())
+                if indice % filas_por_fragmento == 0:
+                    yield salida.vaciar()
+            hoja.write(b"</sheetData></worksheet>")
+        yield salida.vaciar()
+    yield salida.vaciar()
+
+
+def generar(formato: str, usuario, desde: date | None = None, hasta: date | None = None) -> Iterator[bytes]:
+    """Yield the encoded export of ``usuario`` in ``formato`` (``csv`` or ``xlsx``)."""
+
+    if formato == "xlsx":
+        yield from xlsx_streaming(usuario, desde, hasta)
+        return
+    for linea in csv_streaming(usuario, desde, hasta):
+        yield linea.encode("utf-8")
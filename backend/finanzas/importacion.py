@@ -0,0 +1,459 @@
+"""Streaming import of bank statements (CSV and OFX) into the ledger.
+
+Files are read row by row, so memory stays bounded regardless of their
+size: besides the chunk being written, only the occurrence counters of the
+last ``FECHAS_ABIERTAS`` dates are kept. Each movement gets a fingerprint (``huella``) that is looked up in the ``(usuario, huella)``
+unique index to skip rows imported before, and rows are committed in chunks
+so a crash only loses the chunk being written; re-running the import
+resumes thanks to the deduplication.
+"""
+from __future__ import annotations
+
+import csv
+import hashlib
+import io
+import logging
+import re
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import Decimal, InvalidOperation
+from functools import partial
+from itertools import islice
+from pathlib import Path
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, transaction
+from django.utils import timezone
+
+from . import lotes
+from .models import Gasto, Importacion, Ingreso, ReglaPartida
+
+logger = logging.getLogger(__name__)
+
+CATEGORIA_SIN_CLASIFICAR = "Sin clasificar"
+MAX_ERRORES_GUARDADOS = 50
+# Reads of the existing fingerprints retried when a concurrent import wins the insert.
+INTENTOS_GUARDADO = 3
+# Dates whose occurrence counters are kept. Statements are grouped by date,
+# so a row only comes back to one of the most recent dates.
+FECHAS_ABIERTAS = 31
+# Jobs pending or processing for longer than this were lost with their worker.
+MINUTOS_ABANDONO = 30
+
+ALIAS_COLUMNAS = {
+    "fecha": ("fecha", "date", "fecha operacion", "fecha operación", "fecha movimiento"),
+    "descripcion": ("descripcion", "descripción", "glosa", "detalle", "description", "concepto"),
+    "monto": ("monto", "importe", "amount", "valor"),
+    "cargo": ("cargo", "cargos", "debito", "débito", "debit", "egreso"),
+    "abono": ("abono", "abonos", "credito", "crédito", "credit", "ingreso"),
+    # Only a bank transaction id identifies a movement on its own; document
+    # numbers can repeat and are just part of the fingerprint.
+    "referencia": ("fitid",),
+    "documento": ("referencia", "documento", "n° documento", "id"),
+}
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y", "%d/%m/%y", "%Y%m%d")
+
+
+class ErrorFila(ValueError):
+    """A statement row that cannot be mapped to a movement."""
+
+
+@dataclass(frozen=True)
+class Movimiento:
+    """A statement row; negative ``monto`` is an expense, positive an income."""
+
+    fecha: date
+    monto: Decimal
+    descripcion: str
+    referencia: str = ""
+    documento: str = ""
+
+
+@dataclass
+class ResultadoImportacion:
+    filas_leidas: int = 0
+    creados: int = 0
+    duplicados: int = 0
+    total_errores: int = 0
+    errores: list[str] = field(default_factory=list)
+
+    def registrar_error(self, mensaje: str) -> None:
+        self.total_errores += 1
+        if len(self.errores) < MAX_ERRORES_GUARDADOS:
+            self.errores.append(mensaje)
+
+
+def parsear_monto(valor: str) -> Decimal:
+    """Parse amounts like ``-1.234,56``, ``1,234.56`` or ``$ 15.990``."""
+
+    texto = re.sub(r"[^\d,.\-+]", "", valor or "")
+    if not texto or texto in "+-":
+        raise ErrorFila(f"Monto inválido: {valor!r}")
+    if "," in texto and "." in texto:
+        decimal_sep = "," if texto.rfind(",") > texto.rfind(".") else "."
+        miles_sep = "." if decimal_sep == "," else ","
+        texto = texto.replace(miles_sep, "").replace(decimal_sep, ".")
+    elif "," in texto:
+        texto = texto.replace(",", ".") if re.search(r",\d{1,2}$", texto) else texto.replace(",", "")
+    elif re.fullmatch(r"[-+]?\d{1,3}(\.\d{3})+", texto):
+        texto = texto.replace(".", "")
+    try:
+        return Decimal(texto).quantize(Decimal("0.01"))
+    except InvalidOperation as error:
+        raise ErrorFila(f"Monto inválido: {valor!r}") from error
+
+
+def parsear_fecha(valor: str) -> date:
+    texto = (valor or "").strip()[:10]
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ErrorFila(f"Fecha inválida: {valor!r}")
+
+
+def _columnas(encabezado: list[str]) -> dict[str, int]:
+    normalizado = [columna.strip().lower() for columna in encabezado]
+    columnas = {}
+    for campo, alias in ALIAS_COLUMNAS.items():
+        for indice, nombre in enumerate(normalizado):
+            if nombre in alias:
+                columnas[campo] = indice
+                break
+    if "fecha" not in columnas or not ({"monto"} <= columnas.keys() or {"cargo", "abono"} & columnas.keys()):
+        raise ErrorFila("El CSV debe tener columnas de fecha y monto (o cargo/abono).")
+    return columnas
+
+
+def leer_csv(texto: Iterable[str]) -> Iterator[Movimiento | ErrorFila]:
+    """Yield one :class:`Movimiento` (or :class:`ErrorFila`) per CSV data row."""
+
+    lineas = iter(texto)
+    muestra = list(islice(lineas, 5))
+    try:
+        dialecto = csv.Sniffer().sniff("".join(muestra), delimiters=",;\t|")
+    except csv.Error:
+        dialecto = csv.excel
+    lector = csv.reader(_encadenar(muestra, lineas), dialecto)
+    encabezado = next(lector, None)
+    if encabezado is None:
+        return
+    columnas = _columnas(encabezado)
+
+    def celda(fila: list[str], campo: str) -> str:
+        indice = columnas.get(campo)
+        return fila[indice].strip() if indice is not None and indice < len(fila) else ""
+
+    for numero, fila in enumerate(lector, start=2):
+        if not any(valor.strip() for valor in fila):
+            continue
+        try:
+            if "monto" in columnas:
+                monto = parsear_monto(celda(fila, "monto"))
+            else:
+                cargo, abono = celda(fila, "cargo"), celda(fila, "abono")
+                monto = parsear_monto(abono) if abono else -parsear_monto(cargo)
+            yield Movimiento(
+                fecha=parsear_fecha(celda(fila, "fecha")),
+                monto=monto,
+                descripcion=celda(fila, "descripcion"),
+                referencia=celda(fila, "referencia"),
+                documento=celda(fila, "documento"),
+            )
+        except ErrorFila as error:
+            yield ErrorFila(f"Fila {numero}: {error}")
+
+
+def _encadenar(primeras: list[str], resto: Iterator[str]) -> Iterator[str]:
+    yield from primeras
+    yield from resto
+
+
+_TRANSACCION_OFX = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.IGNORECASE | re.DOTALL)
+_ETIQUETA_OFX = re.compile(r"<(\w+)>([^<\r\n]*)")
+
+
+def leer_ofx(fragmentos: Iterable[str]) -> Iterator[Movimiento | ErrorFila]:
+    """Yield the ``<STMTTRN>`` entries of an OFX (SGML or XML) statement.
+
+    ``fragmentos`` are arbitrary chunks of the file; only the text of the
+    transaction being parsed is buffered.
+    """
+
+    buffer = ""
+    for fragmento in fragmentos:
+        buffer += fragmento
+        inicio = 0
+        for coincidencia in _TRANSACCION_OFX.finditer(buffer):
+            yield _movimiento_ofx(coincidencia.group(1))
+            inicio = coincidencia.end()
+        buffer = buffer[inicio:]
+        # Keep at most the (possibly partial) transaction that is still open.
+        abierta = buffer.upper().rfind("<STMTTRN>")
+        buffer = buffer[abierta:] if abierta >= 0 else buffer[-16:]
+
+
+def _movimiento_ofx(bloque: str) -> Movimiento | ErrorFila:
+    etiquetas = {nombre.upper(): valor.strip() for nombre, valor in _ETIQUETA_OFX.findall(bloque)}
+    try:
+        descripcion = " ".join(
+            valor for valor in (etiquetas.get("NAME", ""), etiquetas.get("MEMO", "")) if valor
+        )
+        return Movimiento(
+            fecha=parsear_fecha(etiquetas.get("DTPOSTED", "")[:8]),
+            monto=_monto_ofx(etiquetas.get("TRNAMT", "")),
+            descripcion=descripcion,
+            referencia=etiquetas.get("FITID", ""),
+        )
+    except ErrorFila as error:
+        return ErrorFila(f"Transacción {etiquetas.get('FITID', '?')}: {error}")
+
+
+def _monto_ofx(valor: str) -> Decimal:
+    """OFX amounts always use a decimal point (or comma) and no thousands separator."""
+
+    try:
+        return Decimal(valor.replace(",", ".")).quantize(Decimal("0.01"))
+    except InvalidOperation as error:
+        raise ErrorFila(f"Monto inválido: {valor!r}") from error
+
+
+def _descripcion_normalizada(movimiento: Movimiento) -> str:
+    return " ".join(movimiento.descripcion.lower().split())
+
+
+def huella(usuario_id: int, movimiento: Movimiento, ocurrencia: int) -> str:
+    """Fingerprint of a movement; ``ocurrencia`` separates identical rows of one file.
+
+    A transaction id (OFX ``FITID``) is enough on its own; otherwise the date,
+    amount, description and document number, if any, are combined.
+    """
+
+    if movimiento.referencia:
+        base = f"{usuario_id}|ref|{movimiento.referencia}"
+    else:
+        descripcion = _descripcion_normalizada(movimiento)
+        partes = [str(usuario_id), movimiento.fecha.isoformat(), str(movimiento.monto), descripcion]
+        if movimiento.documento:
+            partes.append(f"doc:{movimiento.documento}")
+        partes.append(str(ocurrencia))
+        base = "|".join(partes)
+    return hashlib.sha256(base.encode()).hexdigest()
+
+
+class Importador:
+    """Map movements to ``Gasto``/``Ingreso`` rows and store them in chunks."""
+
+    def __init__(self, usuario, *, tamano_lote: int | None = None) -> None:
+        self.usuario = usuario
+        self.tamano_lote = tamano_lote or getattr(settings, "FINANZAS_IMPORTACION_LOTE", 1000)
+        self.reglas = [
+            (regla.patron.lower(), regla.partida)
+            for regla in ReglaPartida.objects.filter(usuario=usuario).select_related("partida")
+        ]
+        self._ocurrencias: OrderedDict[date, dict[tuple, int]] = OrderedDict()
+
+    def importar(self, movimientos: Iterable[Movimiento | ErrorFila]) -> ResultadoImportacion:
+        resultado = ResultadoImportacion()
+        lote: list[tuple[str, Movimiento]] = []
+        for movimiento in movimientos:
+            resultado.filas_leidas += 1
+            if isinstance(movimiento, ErrorFila):
+                resultado.registrar_error(str(movimiento))
+                continue
+            lote.append((self._huella(movimiento), movimiento))
+            if len(lote) >= self.tamano_lote:
+                self._guardar(lote, resultado)
+                lote = []
+        if lote:
+            self._guardar(lote, resultado)
+        return resultado
+
+    def _huella(self, movimiento: Movimiento) -> str:
+        if movimiento.referencia:
+            return huella(self.usuario.pk, movimiento, 0)
+        # Identical rows are numbered within their date; the counters of a
+        # date survive while it is among the last FECHAS_ABIERTAS seen, so
+        # files that are not strictly sorted still number every row.
+        contadores = self._ocurrencias.get(movimiento.fecha)
+        if contadores is None:
+            contadores = self._ocurrencias[movimiento.fecha] = {}
+            if len(self._ocurrencias) > FECHAS_ABIERTAS:
+                self._ocurrencias.popitem(last=False)
+        else:
+            self._ocurrencias.move_to_end(movimiento.fecha)
+        clave = (movimiento.monto, _descripcion_normalizada(movimiento), movimiento.documento)
+        ocurrencia = contadores.get(clave, 0)
+        contadores[clave] = ocurrencia + 1
+        return huella(self.usuario.pk, movimiento, ocurrencia)
+
+    def _partida(self, descripcion: str):
+        texto = descripcion.lower()
+        for patron, partida in self.reglas:
+            if patron in texto:
+                return partida
+        return None
+
+    def _guardar(self, lote: list[tuple[str, Movimiento]], resultado: ResultadoImportacion) -> None:
+        for intento in range(INTENTOS_GUARDADO):
+            try:
+                creados, duplicados = self._insertar(lote)
+            except IntegrityError:
+                # Another import of the same file committed some of these rows
+                # after they were looked up: read the fingerprints again.
+                if intento == INTENTOS_GUARDADO - 1:
+                    raise
+                continue
+            resultado.creados += creados
+            resultado.duplicados += duplicados
+            return
+
+    def _insertar(self, lote: list[tuple[str, Movimiento]]) -> tuple[int, int]:
+        huellas = [huella_movimiento for huella_movimiento, _ in lote]
+        existentes = set(
+            Gasto.objects.filter(usuario=self.usuario, huella__in=huellas).values_list("huella", flat=True)
+        ) | set(Ingreso.objects.filter(usuario=self.usuario, huella__in=huellas).values_list("huella", flat=True))
+
+        gastos: list[Gasto] = []
+        ingresos: list[Ingreso] = []
+        duplicados = 0
+        for huella_movimiento, movimiento in lote:
+            if huella_movimiento in existentes:
+                duplicados += 1
+                continue
+            existentes.add(huella_movimiento)
+            if movimiento.monto < 0:
+                partida = self._partida(movimiento.descripcion)
+                gastos.append(
+                    Gasto(
+                        usuario=self.usuario,
+                        partida=partida,
+                        categoria="" if partida else CATEGORIA_SIN_CLASIFICAR,
+                        monto=-movimiento.monto,
+                        fecha=movimiento.fecha,
+                        observacion=movimiento.descripcion,
+                        huella=huella_movimiento,
+                    )
+                )
+            else:
+                ingresos.append(
+                    Ingreso(
+                        usuario=self.usuario,
+                        monto=movimiento.monto,
+                        fecha=movimiento.fecha,
+                        tipo=Ingreso.Tipo.EVENTUAL,
+                        observacion=movimiento.descripcion,
+                        huella=huella_movimiento,
+                    )
+                )
+        with transaction.atomic():
+            if gastos:
+                lotes.insertar(Gasto, gastos)
+            if ingresos:
+                lotes.insertar(Ingreso, ingresos)
+        return len(gastos) + len(ingresos), duplicados
+
+
+def importar_archivo(
+    usuario, archivo: io.IOBase, formato: str, *, codificacion: str = "utf-8-sig", tamano_lote: int | None = None
+) -> ResultadoImportacion:
+    """Import a binary file object in the given ``formato``."""
+
+    texto = io.TextIOWrapper(archivo, encoding=codificacion, errors="replace", newline="")
+    if formato == Importacion.Formato.OFX:
+        movimientos = leer_ofx(iter(partial(texto.read, 64 * 1024), ""))
+    else:
+        movimientos = leer_csv(texto)
+    return Importador(usuario, tamano_lote=tamano_lote).importar(movimientos)
+
+
+def directorio_importaciones() -> Path:
+    directorio = Path(getattr(settings, "FINANZAS_IMPORTACION_DIR", settings.BASE_DIR / "importaciones"))
+    directorio.mkdir(parents=True, exist_ok=True)
+    return directorio
+
+
+def ruta_archivo(importacion: Importacion) -> Path:
+    return directorio_importaciones() / f"{importacion.pk}.{importacion.formato}"
+
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def encolar(importacion: Importacion) -> None:
+    """Process the job in a background worker, or inline when configured for tests."""
+
+    global _executor
+    if getattr(settings, "FINANZAS_IMPORTACION_SINCRONA", False):
+        procesar(importacion.pk)
+        return
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=getattr(settings, "FINANZAS_IMPORTACION_WORKERS", 2),
+            thread_name_prefix="importacion",
+        )
+    _executor.submit(procesar, importacion.pk)
+
+
+def reanudar(minutos: int = MINUTOS_ABANDONO) -> list[int]:
+    """Run again, in this process, the jobs left pending or processing for ``minutos``.
+
+    The in-process executor loses its queue when the worker restarts. Each job
+    is claimed by moving its ``updated_at`` forward, so concurrent sweeps skip
+    it; rows it had already stored are skipped as duplicates, and a job whose
+    file is gone ends as failed. Return the ids of the jobs run.
+    """
+
+    limite = timezone.now() - timedelta(minutes=minutos)
+    abandonadas = Importacion.objects.filter(
+        estado__in=(Importacion.Estado.PENDIENTE, Importacion.Estado.PROCESANDO), updated_at__lt=limite
+    ).values_list("pk", "updated_at")
+    reanudadas = []
+    for importacion_id, actualizada in abandonadas:
+        reclamada = Importacion.objects.filter(pk=importacion_id, updated_at=actualizada).update(
+            updated_at=timezone.now()
+        )
+        if reclamada:
+            _procesar(importacion_id)
+            reanudadas.append(importacion_id)
+    return reanudadas
+
+
+def procesar(importacion_id: int) -> None:
+    """Run a stored import job and record its outcome."""
+
+    en_segundo_plano = not getattr(settings, "FINANZAS_IMPORTACION_SINCRONA", False)
+    if en_segundo_plano:
+        close_old_connections()
+    try:
+        _procesar(importacion_id)
+    finally:
+        if en_segundo_plano:
+            close_old_connections()
+
+
+def _procesar(importacion_id: int) -> None:
+    importacion = Importacion.objects.select_related("usuario").get(pk=importacion_id)
+    importacion.estado = Importacion.Estado.PROCESANDO
+    importacion.save(update_fields=["estado", "updated_at"])
+    ruta = ruta_archivo(importacion)
+    try:
+        with ruta.open("rb") as archivo:
+            resultado = importar_archivo(importacion.usuario, archivo, importacion.formato)
+    except Exception as error:
+        logger.exception("Error al procesar la importación", extra={"importacion_id": importacion_id})
+        importacion.estado = Importacion.Estado.FALLIDA
+        importacion.errores = [str(error)]
+    else:
+        importacion.estado = Importacion.Estado.COMPLETADA
+        importacion.filas_leidas = resultado.filas_leidas
+        importacion.creados = resultado.creados
+        importacion.duplicados = resultado.duplicados
+        importacion.errores = resultado.errores
+    finally:
+        ruta.unlink(missing_ok=True)
+    importacion.save()
@@ -0,0 +1,85 @@
+"""Dashboard bootstrap: profile, ledger and summary of a month in one response.
+
+On load the frontend used to fan out to ``/auth/me/``, ``/partidas/``,
+``/gastos/``, ``/ingresos/`` and ``/resumen/``, each one re-running the same
+month queries and serializing the same rows. :func:`construir` loads the
+month once and serializes every row once: the summary reuses the serialized
+partidas and the first rows of the serialized movement lists, and its totals
+are computed from the loaded movements instead of the rollup table.
+"""
+from __future__ import annotations
+
+from collections.abc import Collection
+from datetime import date
+
+from accounts.serializers import UserSerializer
+
+from . import alertas, resumenes
+from .models import Gasto, Ingreso, Partida, rango_mes
+from .serializers import (
+    GastoSerializer,
+    IngresoSerializer,
+    PartidaSerializer,
+    ResumenFinancieroSerializer,
+    TotalesResumenSerializer,
+)
+
+SECCIONES = ("usuario", "partidas", "gastos", "ingresos", "resumen")
+RECIENTES = 5
+
+
+def construir(request, mes: date, secciones: Collection[str]) -> dict:
+    """Return the requested ``secciones`` for the month of ``mes``."""
+
+    usuario = request.user
+    inicio_mes, siguiente_mes = rango_mes(mes)
+    contexto = {"request": request}
+    data: dict = {"mes": inicio_mes.strftime("%Y-%m")}
+    if "usuario" in secciones:
+        data["usuario"] = UserSerializer(usuario).data
+
+    con_resumen = "resumen" in secciones
+    if "partidas" in secciones or con_resumen:
+        partidas = Partida.objects.filter(usuario=usuario).con_gasto_mes(inicio_mes)
+        data["partidas"] = PartidaSerializer(partidas, many=True, context=contexto).data
+
+    movimientos = {}
+    for nombre, queryset, serializer_class in (
+        ("gastos", Gasto.objects.select_related("partida"), GastoSerializer),
+        ("ingresos", Ingreso.objects.all(), IngresoSerializer),
+    ):
+        queryset = queryset.filter(usuario=usuario, fecha__gte=inicio_mes, fecha__lt=siguiente_mes)
+        if nombre not in secciones:
+            # Only the summary needs them: its latest rows are enough.
+            if not con_resumen:
+                continue
+            queryset = queryset[:RECIENTES]
+        movimientos[nombre] = list(queryset)
+        data[nombre] = serializer_class(movimientos[nombre], many=True, context=contexto).data
+
+    if con_resumen:
+        if "gastos" in secciones and "ingresos" in secciones:
+            totales = resumenes.totales_de(movimientos["gastos"], movimientos["ingresos"])
+        else:
+            totales = resumenes.totales_mes(usuario.pk, inicio_mes)
+        payload = ResumenFinancieroSerializer.build(
+            total_ingresos=totales.total_ingresos,
+            total_gastos=totales.total_gastos,
+            gastos_por_categoria=totales.gastos_por_categoria,
+            partidas=[],
+            sugerencias=[],
+            ingresos_recientes=[],
+            gastos_recientes=[],
+        )
+        data["resumen"] = {
+            **TotalesResumenSerializer(payload).data,
+            "partidas": data["partidas"],
+            "sugerencias": resumenes.sugerencias(totales, alertas.activas(usuario.pk, inicio_mes)),
+            "ingresos_recientes": data["ingresos"][:RECIENTES],
+            "gastos_recientes": data["gastos"][:RECIENTES],
+        }
+
+    for seccion in ("partidas", "gastos", "ingresos"):
+        if seccion not in secciones:
+            data.pop(seccion, None)
+    return data
@@ -0,0 +1,155 @@
+"""Fast read-only serialization of large list responses.
+
+Building a model instance and walking every DRF field for each row dominates
+the CPU time of a list with tens of thousands of gastos. For the serializers
+registered in :data:`CALCULADOS` the list is instead read with
+``values_list()`` and every row is turned into a dict by a plan compiled once
+per serializer and field selection, whose converters reproduce what the DRF
+fields would output. Fields the plan does not know make :func:`lector`
+return ``None`` and the caller falls back to the regular serializer.
+"""
+from __future__ import annotations
+
+from collections.abc import Callable, Collection
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+from operator import itemgetter
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework import relations, serializers
+from rest_framework.settings import ISO_8601, api_settings
+
+from .serializers import GastoSerializer, IngresoSerializer, PartidaSerializer
+
+CENTAVOS = Decimal("0.01")
+
+
+def _partida_nombre(valores: tuple) -> str | None:
+    partida_id, nombre, categoria = valores
+    return nombre if partida_id is not None else (categoria or None)
+
+
+def _gastado_mes(gasto_mes) -> Decimal:
+    if not isinstance(gasto_mes, Decimal):
+        gasto_mes = Decimal(str(gasto_mes))
+    return gasto_mes.quantize(CENTAVOS)
+
+
+def _disponible_mes(valores: tuple) -> Decimal:
+    monto_asignado, gasto_mes = valores
+    return monto_asignado - _gastado_mes(gasto_mes)
+
+
+# Columns and converter of the method fields, which DRF computes from the instance.
+CALCULADOS: dict[type[serializers.Serializer], dict[str, tuple[tuple[str, ...], Callable]]] = {
+    GastoSerializer: {"partida_nombre": (("partida_id", "partida__nombre", "categoria"), _partida_nombre)},
+    IngresoSerializer: {},
+    PartidaSerializer: {
+        "gastado_mes": (("gasto_mes",), _gastado_mes),
+        "disponible_mes": (("monto_asignado", "gasto_mes"), _disponible_mes),
+    },
+}
+
+
+def _identidad(valor):
+    return valor
+
+
+def _sin_nulos(convertir: Callable) -> Callable:
+    # DRF outputs ``None`` for a missing attribute without calling the field.
+    return lambda valor: None if valor is None else convertir(valor)
+
+
+def _fecha_hora(zona) -> Callable:
+    def convertir(valor: datetime) -> str:
+        texto = valor.astimezone(zona).isoformat()
+        return texto[:-6] + "Z" if texto.endswith("+00:00") else texto
+
+    return _sin_nulos(convertir)
+
+
+def _convertidor(campo: serializers.Field, zona) -> Callable | None:
+    if isinstance(campo, (serializers.ChoiceField, serializers.CharField, serializers.IntegerField, serializers.BooleanField)):
+        return _identidad
+    if isinstance(campo, relations.PrimaryKeyRelatedField) and campo.pk_field is None:
+        return _identidad
+    if isinstance(campo, serializers.DateTimeField):
+        formato = getattr(campo, "format", api_settings.DATETIME_FORMAT)
+        if zona is not None and not hasattr(campo, "timezone") and formato and formato.lower() == ISO_8601:
+            # DRF would look the current time zone up again for every value.
+            return _fecha_hora(zona)
+        return _sin_nulos(campo.to_representation)
+    if isinstance(campo, serializers.DateField):
+        formato = getattr(campo, "format", api_settings.DATE_FORMAT)
+        if formato and formato.lower() == ISO_8601:
+            return _sin_nulos(date.isoformat)
+        return _sin_nulos(campo.to_representation)
+    if isinstance(campo, serializers.DecimalField):
+        return _sin_nulos(campo.to_representation)
+    return None
+
+
+@dataclass(frozen=True)
+class Lector:
+    """Compiled plan: the columns to read and how to build each output field."""
+
+    columnas: tuple[str, ...]
+    plan: tuple[tuple[str, Callable, Callable], ...]
+
+    def filas(self, tuplas) -> list[dict]:
+        plan = self.plan
+        return [{nombre: convertir(obtener(fila)) for nombre, obtener, convertir in plan} for fila in tuplas]
+
+
+@lru_cache(maxsize=64)
+def _compilar(serializer_class: type[serializers.Serializer], campos: tuple[str, ...] | None, zona) -> Lector | None:
+    calculados = CALCULADOS.get(serializer_class)
+    if calculados is None:
+        return None
+    columnas: list[str] = ["pk"]
+    plan = []
+    for nombre, campo in serializer_class(campos=campos).fields.items():
+        if campo.write_only:
+            continue
+        if nombre in calculados:
+            fuentes, convertir = calculados[nombre]
+        else:
+            convertir = _convertidor(campo, zona)
+            if convertir is None or campo.source == "*" or "." in campo.source:
+                return None
+            fuentes = ("pk",) if campo.source == "id" else (campo.source,)
+        indices = []
+        for fuente in fuentes:
+            if fuente not in columnas:
+                columnas.append(fuente)
+            indices.append(columnas.index(fuente))
+        plan.append((nombre, itemgetter(*indices), convertir))
+    return Lector(tuple(columnas), tuple(plan))
+
+
+def lector(serializer_class: type[serializers.Serializer], campos: Collection[str] | None = None) -> Lector | None:
+    """Return the compiled plan for ``serializer_class`` or ``None`` when it is not supported."""
+
+    zona = timezone.get_current_timezone() if settings.USE_TZ else None
+    return _compilar(serializer_class, tuple(campos) if campos is not None else None, zona)
+
+
+def listar(request, queryset, serializer_class, *, paginador=None, campos=None):
+    """Serialize ``queryset`` like the list action would; ``None`` if the fast path does not apply."""
+
+    plan = lector(serializer_class, campos)
+    if plan is None:
+        return None
+    if paginador is None:
+        return plan.filas(queryset.values_list(*plan.columnas))
+    # The keyset pagination builds its cursor from the ordering columns of the last row.
+    orden = [campo.lstrip("-") for campo in getattr(paginador, "ordering", ())]
+    tuplas = queryset.values_list(*plan.columnas, *(campo for campo in orden if campo not in plan.columnas), named=True)
+    pagina = paginador.paginate_queryset(tuplas, request)
+    if pagina is not None:
+        return paginador.get_paginated_response(plan.filas(pagina)).data
+    return plan.filas(tuplas)
+
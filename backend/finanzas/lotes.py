@@ -0,0 +1,186 @@
+"""Batch create, update and delete of ledger rows.
+
+Rows are validated in a single pass with the regular serializers, partidas
+referenced by the batch are loaded with one query, and writes go through
+``bulk_create``/``bulk_update``/a single ``DELETE`` inside one transaction.
+Signals are not emitted for the individual rows, so the derived data they
+maintain (monthly rollup, cached payloads) is updated once per batch here.
+"""
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import cache, resumenes, signals, sincronizacion
+from .models import Gasto, Ingreso, Partida
+from .serializers import GastoSerializer, IngresoSerializer
+
+TAMANO_LOTE_SQL = 1000
+
+
+class ErrorLote(Exception):
+    """Raised when some rows of a batch are invalid; nothing is written."""
+
+    def __init__(self, errores: list[dict]) -> None:
+        super().__init__(errores)
+        self.errores = errores
+
+
+class PartidaPrecargadaField(serializers.PrimaryKeyRelatedField):
+    """Resolve partidas from the ``partidas`` dict preloaded in the context."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        partida = self.context["partidas"].get(pk)
+        if partida is None:
+            self.fail("does_not_exist", pk_value=data)
+        return partida
+
+
+class GastoLoteSerializer(GastoSerializer):
+    """Expense serializer that only accepts partidas owned by the user."""
+
+    partida = PartidaPrecargadaField(queryset=Partida.objects.none(), allow_null=True, required=False)
+
+
+SERIALIZERS_LOTE: dict[type, type[serializers.ModelSerializer]] = {
+    Gasto: GastoLoteSerializer,
+    Ingreso: IngresoSerializer,
+}
+
+
+def _a_entero(valor) -> int | None:
+    if isinstance(valor, bool):
+        return None
+    try:
+        return int(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _contexto(modelo, usuario, filas: Sequence, request) -> dict:
+    contexto = {"request": request}
+    if modelo is Gasto:
+        ids = {_a_entero(fila.get("partida")) for fila in filas if isinstance(fila, dict)}
+        ids.discard(None)
+        contexto["partidas"] = Partida.objects.filter(usuario=usuario).in_bulk(ids)
+    return contexto
+
+
+def _validar(modelo, filas: Sequence, contexto: dict, instancias: dict | None = None) -> list[dict]:
+    """Validate every row and raise one error listing the failures by index."""
+
+    serializer_class = SERIALIZERS_LOTE[modelo]
+    validados: list[dict] = []
+    errores: list[dict] = []
+    for indice, fila in enumerate(filas):
+        if not isinstance(fila, dict):
+            errores.append({"indice": indice, "errores": {"non_field_errors": ["Se esperaba un objeto."]}})
+            continue
+        instancia = None
+        if instancias is not None:
+            instancia = instancias.get(_a_entero(fila.get("id")))
+            if instancia is None:
+                errores.append({"indice": indice, "errores": {"id": ["No encontrado."]}})
+                continue
+        serializer = serializer_class(instancia, data=fila, partial=instancia is not None, context=contexto)
+        if serializer.is_valid():
+            validados.append(serializer.validated_data)
+        else:
+            errores.append({"indice": indice, "errores": serializer.errors})
+    if errores:
+        raise ErrorLote(errores)
+    return validados
+
+
+def crear(modelo, filas: Sequence, usuario, request=None) -> list:
+    """Validate and insert ``filas`` for ``usuario``; all or nothing."""
+
+    validados = _validar(modelo, filas, _contexto(modelo, usuario, filas, request))
+    return insertar(modelo, [modelo(usuario=usuario, **datos) for datos in validados])
+
+
+def insertar(modelo, objetos: list) -> list:
+    """Insert already validated ``objetos`` and update derived data of their owners."""
+
+    deltas: dict = {}
+    for objeto in objetos:
+        resumenes.acumular(deltas, modelo, resumenes.valores_de(objeto), 1)
+    with transaction.atomic():
+        modelo.objects.bulk_create(objetos, batch_size=TAMANO_LOTE_SQL)
+        resumenes.aplicar(deltas)
+        for usuario_id in {objeto.usuario_id for objeto in objetos}:
+            cache.invalidar_usuario_al_confirmar(usuario_id)
+    return objetos
+
+
+def actualizar(modelo, filas: Sequence, usuario, request=None) -> list:
+    """Apply partial updates; every row must carry the ``id`` of an owned record."""
+
+    ids = {_a_entero(fila.get("id")) for fila in filas if isinstance(fila, dict)}
+    ids.discard(None)
+    queryset = modelo.objects.filter(usuario=usuario)
+    if modelo is Gasto:
+        queryset = queryset.select_related("partida")
+
+    with transaction.atomic():
+        instancias = queryset.select_for_update().in_bulk(ids)
+        validados = _validar(modelo, filas, _contexto(modelo, usuario, filas, request), instancias)
+
+        deltas: dict = {}
+        campos: set[str] = {"updated_at"}
+        objetos = []
+        ahora = timezone.now()
+        for fila, datos in zip(filas, validados):
+            objeto = instancias[_a_entero(fila["id"])]
+            resumenes.acumular(deltas, modelo, resumenes.valores_de(objeto), -1)
+            for campo, valor in datos.items():
+                setattr(objeto, campo, valor)
+            objeto.updated_at = ahora
+            campos.update(datos)
+            resumenes.acumular(deltas, modelo, resumenes.valores_de(objeto), 1)
+            objetos.append(objeto)
+
+        modelo.objects.bulk_update(objetos, sorted(campos), batch_size=TAMANO_LOTE_SQL)
+        resumenes.aplicar(deltas)
+        cache.invalidar_usuario_al_confirmar(usuario.pk)
+    return objetos
+
+
+def eliminar(modelo, ids: Sequence, usuario) -> int:
+    """Delete the owned records listed in ``ids``; all or nothing."""
+
+    pks = [_a_entero(valor) for valor in ids]
+    queryset = modelo.objects.filter(usuario=usuario)
+    with transaction.atomic():
+        existentes = {
+            fila["id"]: fila
+            for fila in queryset.filter(pk__in=[pk for pk in pks if pk is not None])
+            .select_for_update()
+            .values("id", *resumenes.CAMPOS_MOVIMIENTO[modelo])
+        }
+        errores = [
+            {"indice": indice, "errores": {"id": ["No encontrado."]}}
+            for indice, pk in enumerate(pks)
+            if pk not in existentes
+        ]
+        if errores:
+            raise ErrorLote(errores)
+
+        deltas: dict = {}
+        for valores in existentes.values():
+            resumenes.acumular(deltas, modelo, valores, -1)
+        with signals.en_lote():
+            queryset.filter(pk__in=existentes).delete()
+        resumenes.aplicar(deltas)
+        sincronizacion.registrar_eliminados(modelo, usuario.pk, existentes)
+        cache.invalidar_usuario_al_confirmar(usuario.pk)
+    return len(existentes)
@@ -0,0 +1,123 @@
+"""Measure latency, throughput and SQL queries of every API endpoint against a baseline."""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import override_settings
+
+from finanzas.benchmarking import (
+    CLAVE_BENCHMARK,
+    PerfilDatos,
+    cliente_jwt,
+    comparar,
+    escenarios,
+    generar_datos,
+    medir,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un set de datos determinista, mide percentiles de latencia, solicitudes por segundo y "
+        "consultas SQL de cada endpoint y falla si empeoran respecto de la línea base. "
+        "Las escrituras se revierten al terminar y los límites de solicitudes se desactivan durante la medición."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=5)
+        parser.add_argument("--partidas", type=int, default=8)
+        parser.add_argument("--gastos", type=int, default=5_000, help="Gastos por usuario.")
+        parser.add_argument("--ingresos", type=int, default=60, help="Ingresos por usuario.")
+        parser.add_argument("--anios", type=int, default=5)
+        parser.add_argument("--semilla", type=int, default=1234)
+        parser.add_argument("--prefijo", default="bench_api")
+        parser.add_argument("--repeticiones", type=int, default=20)
+        parser.add_argument("--escenario", action="append", help="Mide solo los escenarios indicados.")
+        parser.add_argument(
+            "--linea-base",
+            default=str(Path(settings.BASE_DIR) / "benchmarks" / "api.json"),
+            help="Archivo JSON con la línea base.",
+        )
+        parser.add_argument("--guardar", action="store_true", help="Escribe los resultados como nueva línea base.")
+        parser.add_argument("--tolerancia", type=float, default=0.5, help="Alza de p95 permitida (0.5 = +50%%).")
+        parser.add_argument(
+            "--solo-consultas",
+            action="store_true",
+            help="Compara solo la cantidad de consultas SQL (útil en CI con hardware variable).",
+        )
+
+    def handle(self, *args, **options):
+        perfil = PerfilDatos(
+            usuarios=options["usuarios"],
+            partidas=options["partidas"],
+            gastos=options["gastos"],
+            ingresos=options["ingresos"],
+            anios=options["anios"],
+            semilla=options["semilla"],
+        )
+        usuarios = generar_datos(perfil, prefijo=options["prefijo"])
+        usuario = get_user_model().objects.get(pk=usuarios[len(usuarios) // 2])
+
+        # Committed: the async login reads the user from a connection of its own.
+        if not usuario.check_password(CLAVE_BENCHMARK):
+            usuario.set_password(CLAVE_BENCHMARK)
+            usuario.save(update_fields=["password"])
+        # Repeated logins would hit the per-user login limit.
+        with override_settings(THROTTLE_TASAS={}), transaction.atomic():
+            cliente = cliente_jwt(usuario)
+            seleccion = [
+                escenario
+                for escenario in escenarios(usuario)
+                if not options["escenario"] or escenario.nombre in options["escenario"]
+            ]
+            mediciones = [medir(cliente, escenario, options["repeticiones"]) for escenario in seleccion]
+            transaction.set_rollback(True)
+
+        self.stdout.write(f"{'escenario':<20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>9} {'SQL':>5}")
+        for medicion in mediciones:
+            self.stdout.write(
+                f"{medicion.nombre:<20} {medicion.p50_ms:>9.2f} {medicion.p95_ms:>9.2f} "
+                f"{medicion.p99_ms:>9.2f} {medicion.solicitudes_por_segundo:>9.1f} {medicion.consultas:>5}"
+            )
+        errores = [error for medicion in mediciones for error in medicion.errores]
+        for error in errores:
+            self.stderr.write(error)
+
+        ruta = Path(options["linea_base"])
+        contenido = {
+            "motor": connection.vendor,
+            "perfil": {clave: valor for clave, valor in vars(perfil).items()},
+            "escenarios": {medicion.nombre: medicion.como_dict() for medicion in mediciones},
+        }
+        if options["guardar"]:
+            if errores:
+                raise CommandError("No se guarda la línea base: hubo respuestas inesperadas.")
+            ruta.parent.mkdir(parents=True, exist_ok=True)
+            ruta.write_text(json.dumps(contenido, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+            self.stdout.write(self.style.SUCCESS(f"Línea base guardada en {ruta}."))
+            return
+
+        if not ruta.exists():
+            self.stdout.write(self.style.WARNING(f"No existe {ruta}; ejecuta con --guardar para crearla."))
+            return
+        linea_base = json.loads(ruta.read_text(encoding="utf-8"))
+        # Latencies are only comparable on the same engine and dataset.
+        solo_consultas = options["solo_consultas"] or (
+            linea_base.get("motor") != contenido["motor"] or linea_base.get("perfil") != contenido["perfil"]
+        )
+        if solo_consultas and not options["solo_consultas"]:
+            self.stdout.write(self.style.WARNING("Motor o perfil distinto a la línea base: se comparan solo consultas."))
+        regresiones = comparar(
+            mediciones,
+            linea_base.get("escenarios", {}),
+            tolerancia=options["tolerancia"],
+            solo_consultas=solo_consultas,
+        )
+        if regresiones or errores:
+            raise CommandError("Regresiones de rendimiento:\n" + "\n".join(regresiones + errores))
+        self.stdout.write(self.style.SUCCESS("Sin regresiones respecto de la línea base."))
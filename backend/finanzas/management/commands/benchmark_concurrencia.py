@@ -0,0 +1,54 @@
+"""Compare throughput of the WSGI deployment against the async endpoints under ASGI."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from finanzas.benchmarking import PerfilDatos, carga_http, generar_datos
+
+RUTAS = ("resumen", "gastos", "ingresos", "partidas")
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide solicitudes por segundo y latencia con N conexiones concurrentes contra dos servidores ya "
+        "levantados sobre la misma base: el despliegue WSGI (p. ej. gunicorn core.wsgi) con las vistas "
+        "DRF y el ASGI (p. ej. uvicorn core.asgi:application) con /api/v1/async/."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--wsgi", default="http://127.0.0.1:8000", help="URL base del servidor WSGI.")
+        parser.add_argument("--asgi", default="http://127.0.0.1:8001", help="URL base del servidor ASGI.")
+        parser.add_argument("--concurrencia", type=int, nargs="+", default=[1, 10, 50])
+        parser.add_argument("--duracion", type=float, default=10.0, help="Segundos por medición.")
+        parser.add_argument("--ruta", choices=RUTAS, action="append", help="Rutas a medir (por defecto todas).")
+        parser.add_argument("--gastos", type=int, default=2_000, help="Gastos del usuario de prueba.")
+        parser.add_argument("--prefijo", default="bench_async")
+
+    def handle(self, *args, **options):
+        usuario_id = generar_datos(PerfilDatos(usuarios=1, gastos=options["gastos"]), prefijo=options["prefijo"])[0]
+        usuario = get_user_model().objects.get(pk=usuario_id)
+        encabezados = {"Authorization": f"Bearer {RefreshToken.for_user(usuario).access_token}"}
+
+        objetivos = [
+            ("wsgi", options["wsgi"].rstrip("/") + "/api/v1/{ruta}/"),
+            ("asgi", options["asgi"].rstrip("/") + "/api/v1/async/{ruta}/"),
+        ]
+        self.stdout.write(
+            f"{'ruta':<10} {'servidor':<8} {'conc.':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errores':>8}"
+        )
+        for ruta in options["ruta"] or RUTAS:
+            for concurrencia in options["concurrencia"]:
+                for servidor, plantilla in objetivos:
+                    resultado = carga_http(
+                        plantilla.format(ruta=ruta),
+                        encabezados,
+                        concurrencia=concurrencia,
+                        duracion=options["duracion"],
+                    )
+                    self.stdout.write(
+                        f"{ruta:<10} {servidor:<8} {concurrencia:>5} {resultado.solicitudes_por_segundo:>9.1f} "
+                        f"{resultado.p50_ms:>9.2f} {resultado.p95_ms:>9.2f} {resultado.p99_ms:>9.2f} "
+                        f"{resultado.errores:>8}"
+                    )
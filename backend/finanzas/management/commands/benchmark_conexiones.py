@@ -0,0 +1,122 @@
+"""Compare request latency with a new connection per request, persistent connections and the psycopg pool."""
+from __future__ import annotations
+
+import copy
+import json
+import time
+from functools import partial
+from importlib.util import find_spec
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import RequestFactory, override_settings
+
+from accounts.tokens import tokens_para
+from core import basedatos
+from finanzas.benchmarking import PerfilDatos, generar_datos, percentil, servidor
+from finanzas.models import Gasto, Partida
+
+MODOS = ("nuevas", "persistentes", "pool")
+
+
+def pool_disponible() -> bool:
+    return connection.vendor == "postgresql" and find_spec("psycopg_pool") is not None
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la latencia de endpoints CRUD cortos pasando por el WSGIHandler, como en gunicorn, con una "
+        "conexión nueva por solicitud, con conexiones persistentes (CONN_MAX_AGE) y con el pool de psycopg 3 "
+        "(solo PostgreSQL), y cuenta las conexiones abiertas en cada caso. Los límites de solicitudes se "
+        "desactivan durante la medición."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modo", choices=MODOS, action="append", help="Modos a medir (por defecto todos).")
+        parser.add_argument("--repeticiones", type=int, default=200)
+        parser.add_argument("--gastos", type=int, default=200, help="Gastos del usuario de prueba.")
+        parser.add_argument("--prefijo", default="bench_conexiones")
+
+    def handle(self, *args, **options):
+        modos = options["modo"] or [modo for modo in MODOS if modo != "pool" or pool_disponible()]
+        if "pool" in modos and not pool_disponible():
+            raise CommandError('El modo pool requiere PostgreSQL y psycopg 3 con el pool ("psycopg[binary,pool]").')
+
+        usuario_id = generar_datos(PerfilDatos(usuarios=1, gastos=options["gastos"]), prefijo=options["prefijo"])[0]
+        usuario = get_user_model().objects.get(pk=usuario_id)
+        gasto = Gasto.objects.filter(usuario=usuario).order_by("pk").values_list("pk", flat=True).first()
+        partida = Partida.objects.filter(usuario=usuario).order_by("pk").values_list("pk", flat=True).first()
+        escenarios = [
+            ("auth_me", "GET", "/api/v1/auth/me/", None),
+            ("partida_detalle", "GET", f"/api/v1/partidas/{partida}/", None),
+            ("gasto_detalle", "GET", f"/api/v1/gastos/{gasto}/", None),
+            ("gasto_editar", "PATCH", f"/api/v1/gastos/{gasto}/", {"observacion": "bench"}),
+        ]
+        autorizacion = f"Bearer {tokens_para(usuario).access_token}"
+
+        handler = WSGIHandler()
+        fabrica = RequestFactory(SERVER_NAME=servidor())
+        original = copy.deepcopy(connection.settings_dict)
+        abiertas = [0]
+
+        def _contar(sender, **kwargs):
+            abiertas[0] += 1
+
+        self.stdout.write(f"{'escenario':<16} {'modo':<13} {'p50 ms':>9} {'p95 ms':>9} {'req/s':>9} {'conexiones':>11}")
+        connection_created.connect(_contar, weak=False)
+        try:
+            with override_settings(THROTTLE_TASAS={}):
+                for nombre, metodo, ruta, datos in escenarios:
+                    for modo in modos:
+                        self._configurar(modo, original)
+                        _llamar = partial(_solicitar, handler, fabrica, nombre, metodo, ruta, datos, autorizacion)
+                        _llamar()
+                        abiertas[0] = 0
+                        tiempos = []
+                        inicio_total = time.perf_counter()
+                        for _ in range(options["repeticiones"]):
+                            inicio = time.perf_counter()
+                            _llamar()
+                            tiempos.append((time.perf_counter() - inicio) * 1000)
+                        total = time.perf_counter() - inicio_total
+                        self.stdout.write(
+                            f"{nombre:<16} {modo:<13} {percentil(tiempos, 50):>9.2f} {percentil(tiempos, 95):>9.2f} "
+                            f"{options['repeticiones'] / total:>9.1f} {abiertas[0]:>11}"
+                        )
+        finally:
+            connection_created.disconnect(_contar)
+            self._configurar(None, original)
+
+    @staticmethod
+    def _configurar(modo: str | None, original: dict) -> None:
+        """Switch the ``default`` connection to ``modo`` (``None`` restores the settings)."""
+
+        connections.close_all()
+        if getattr(connection, "pool", None) is not None:
+            connection.close_pool()
+        # Every wrapper of the alias shares this dict, so the change applies to all threads.
+        ajustes = connection.settings_dict
+        ajustes.clear()
+        ajustes.update(copy.deepcopy(original))
+        if modo is None:
+            return
+        ajustes["OPTIONS"] = {clave: valor for clave, valor in ajustes.get("OPTIONS", {}).items() if clave != "pool"}
+        if modo == "pool":
+            ajustes["CONN_MAX_AGE"] = 0
+            ajustes["OPTIONS"]["pool"] = basedatos.opciones_pool({"DB_POOL_MIN": "1", "DB_POOL_MAX": "4"})
+        else:
+            ajustes["CONN_MAX_AGE"] = 0 if modo == "nuevas" else 600
+
+
+def _solicitar(handler, fabrica, nombre, metodo, ruta, datos, autorizacion) -> None:
+    cuerpo = json.dumps(datos) if datos is not None else ""
+    entorno = fabrica.generic(metodo, ruta, cuerpo, content_type="application/json", HTTP_AUTHORIZATION=autorizacion)
+    respuesta = handler(entorno.environ, lambda estado, encabezados: None)
+    if respuesta.status_code >= 300:
+        raise CommandError(f"{nombre}: HTTP {respuesta.status_code}")
+    b"".join(respuesta)
+    # Fires request_finished, which releases the connection as a server would.
+    respuesta.close()
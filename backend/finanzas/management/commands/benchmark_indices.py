@@ -0,0 +1,90 @@
+"""Compare query plans of the hot ledger queries with and without the composite indexes."""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from finanzas.benchmarking import PerfilDatos, generar_datos
+from finanzas.models import Gasto, Ingreso, Partida, rango_mes
+
+INDICES = ("gasto_usuario_fecha_idx", "gasto_usuario_partida_idx", "ingreso_usuario_fecha_idx")
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera un set de datos determinista y muestra el EXPLAIN de las consultas principales "
+        "con y sin los índices compuestos. No ejecutar contra la base de producción."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuarios", type=int, default=20)
+        parser.add_argument("--partidas", type=int, default=10)
+        parser.add_argument("--gastos", type=int, default=100_000, help="Gastos por usuario.")
+        parser.add_argument("--ingresos", type=int, default=120, help="Ingresos por usuario.")
+        parser.add_argument("--anios", type=int, default=10)
+        parser.add_argument("--semilla", type=int, default=1234)
+        parser.add_argument("--prefijo", default="bench_idx")
+        parser.add_argument(
+            "--analizar",
+            action="store_true",
+            help="Usa EXPLAIN ANALYZE (solo PostgreSQL) para incluir tiempos reales.",
+        )
+
+    def handle(self, *args, **options):
+        perfil = PerfilDatos(
+            usuarios=options["usuarios"],
+            partidas=options["partidas"],
+            gastos=options["gastos"],
+            ingresos=options["ingresos"],
+            anios=options["anios"],
+            semilla=options["semilla"],
+        )
+        usuarios = generar_datos(perfil, prefijo=options["prefijo"])
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE finanzas_gasto, finanzas_ingreso, finanzas_partida")
+
+        usuario_id = usuarios[len(usuarios) // 2]
+        explain_options = {"analyze": True} if options["analizar"] and connection.vendor == "postgresql" else {}
+        consultas = self._consultas(usuario_id)
+
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for nombre in INDICES:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(nombre)}")
+            self.stdout.write(self.style.MIGRATE_HEADING("== Sin índices compuestos =="))
+            self._explicar(consultas, explain_options)
+            transaction.set_rollback(True)
+
+        # Drop the connection so no statement prepared against the index-less
+        # schema (e.g. sqlite3's statement cache) is reused below.
+        connection.close()
+        self.stdout.write(self.style.MIGRATE_HEADING("== Con índices compuestos =="))
+        self._explicar(consultas, explain_options)
+
+    def _consultas(self, usuario_id: int) -> dict:
+        inicio_mes, siguiente_mes = rango_mes(timezone.localdate())
+        partida_id = Partida.objects.filter(usuario_id=usuario_id).values_list("pk", flat=True).first()
+        return {
+            "Gastos recientes del mes (resumen)": Gasto.objects.filter(
+                usuario_id=usuario_id, fecha__gte=inicio_mes, fecha__lt=siguiente_mes
+            )[:5],
+            "Listado de gastos por rango": Gasto.objects.filter(
+                usuario_id=usuario_id, fecha__gte=inicio_mes.replace(year=inicio_mes.year - 1)
+            ),
+            "Listado de gastos por partida": Gasto.objects.filter(usuario_id=usuario_id).filter(
+                Q(partida_id=partida_id) | Q(partida__isnull=True)
+            ),
+            "Gasto del mes por partida": Partida.objects.filter(usuario_id=usuario_id).con_gasto_mes(),
+            "Ingresos del mes": Ingreso.objects.filter(
+                usuario_id=usuario_id, fecha__gte=inicio_mes, fecha__lt=siguiente_mes
+            ),
+        }
+
+    def _explicar(self, consultas: dict, explain_options: dict) -> None:
+        for titulo, queryset in consultas.items():
+            self.stdout.write(self.style.SQL_TABLE(f"-- {titulo}"))
+            self.stdout.write(queryset.explain(**explain_options))
+            self.stdout.write("")
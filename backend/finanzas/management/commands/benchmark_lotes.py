@@ -0,0 +1,73 @@
+"""Compare throughput of per-row POSTs against the batch endpoints."""
+from __future__ import annotations
+
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from finanzas.benchmarking import PerfilDatos, cliente_api, generar_datos
+from finanzas.models import Partida
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide filas por segundo al crear gastos e ingresos fila a fila y mediante /lote/. "
+        "Todo se ejecuta dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=2000)
+        parser.add_argument("--semilla", type=int, default=1234)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            usuario_id = generar_datos(
+                PerfilDatos(usuarios=1, gastos=0, ingresos=0, semilla=options["semilla"]),
+                prefijo="bench_lotes",
+            )[0]
+            usuario = get_user_model().objects.get(pk=usuario_id)
+            cliente = cliente_api(usuario)
+            partidas = list(Partida.objects.filter(usuario=usuario).values_list("pk", flat=True))
+
+            for recurso, generar in (("gastos", self._gastos), ("ingresos", self._ingresos)):
+                rng = random.Random(options["semilla"])
+                filas = [generar(rng, partidas) for _ in range(options["filas"])]
+
+                inicio = time.perf_counter()
+                for fila in filas:
+                    cliente.post(f"/api/v1/{recurso}/", fila, format="json")
+                por_fila = time.perf_counter() - inicio
+
+                inicio = time.perf_counter()
+                respuesta = cliente.post(f"/api/v1/{recurso}/lote/", filas, format="json")
+                por_lote = time.perf_counter() - inicio
+                if respuesta.status_code != 201:
+                    self.stderr.write(respuesta.content.decode())
+                    continue
+
+                self.stdout.write(
+                    f"{recurso}: fila a fila {len(filas) / por_fila:,.0f} filas/s, "
+                    f"lote {len(filas) / por_lote:,.0f} filas/s "
+                    f"(x{por_fila / por_lote:.1f})"
+                )
+            transaction.set_rollback(True)
+
+    def _gastos(self, rng: random.Random, partidas: list[int]) -> dict:
+        return {
+            "partida": rng.choice(partidas),
+            "monto": f"{rng.randrange(100, 500_000) / 100:.2f}",
+            "fecha": str(timezone.localdate() - timedelta(days=rng.randrange(365))),
+            "tipo": "variable",
+        }
+
+    def _ingresos(self, rng: random.Random, partidas: list[int]) -> dict:
+        return {
+            "monto": f"{rng.randrange(10_000, 5_000_000) / 100:.2f}",
+            "fecha": str(timezone.localdate() - timedelta(days=rng.randrange(365))),
+            "tipo": "eventual",
+        }
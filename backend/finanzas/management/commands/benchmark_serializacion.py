@@ -0,0 +1,73 @@
+"""Compare the DRF serializers with the fast list path of ``finanzas.listados``."""
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.renderers import JSONRenderer
+
+from core.renderers import JSONRapidoRenderer
+from finanzas import listados
+from finanzas.benchmarking import PerfilDatos, generar_datos
+from finanzas.models import Gasto, Ingreso, Partida
+from finanzas.serializers import GastoSerializer, IngresoSerializer, PartidaSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide el tiempo de serializar y renderizar a JSON cada 10.000 filas con los serializers de DRF "
+        "y con la ruta rápida basada en values_list(), y verifica que ambas salidas sean idénticas. "
+        "Los datos se generan dentro de una transacción que se revierte al final."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--filas", type=int, default=10_000)
+        parser.add_argument("--repeticiones", type=int, default=3)
+        parser.add_argument("--semilla", type=int, default=1234)
+
+    def handle(self, *args, **options):
+        filas = options["filas"]
+        with transaction.atomic():
+            usuario_id = generar_datos(
+                PerfilDatos(usuarios=1, partidas=filas // 20 or 1, gastos=filas, ingresos=filas, semilla=options["semilla"]),
+                prefijo="bench_serializacion",
+            )[0]
+            usuario = get_user_model().objects.get(pk=usuario_id)
+            request = RequestFactory().get("/")
+            request.user = usuario
+
+            for nombre, queryset, serializer_class in (
+                ("gastos", Gasto.objects.filter(usuario=usuario).select_related("partida"), GastoSerializer),
+                ("ingresos", Ingreso.objects.filter(usuario=usuario), IngresoSerializer),
+                ("partidas", Partida.objects.filter(usuario=usuario).con_gasto_mes(), PartidaSerializer),
+            ):
+                cantidad = queryset.count()
+
+                def drf(queryset=queryset, serializer_class=serializer_class):
+                    datos = serializer_class(queryset.all(), many=True, context={"request": request}).data
+                    return JSONRenderer().render(datos)
+
+                def rapido(queryset=queryset, serializer_class=serializer_class):
+                    return JSONRapidoRenderer().render(listados.listar(request, queryset.all(), serializer_class))
+
+                if drf() != rapido():
+                    raise CommandError(f"{nombre}: la ruta rápida no produce la misma salida que DRF.")
+                tiempos = {
+                    ruta: min(self._medir(funcion) for _ in range(options["repeticiones"]))
+                    for ruta, funcion in (("drf", drf), ("rapido", rapido))
+                }
+                por_10k = {ruta: segundos / cantidad * 10_000 * 1000 for ruta, segundos in tiempos.items()}
+                self.stdout.write(
+                    f"{nombre} ({cantidad} filas): DRF {por_10k['drf']:.1f} ms/10k filas, "
+                    f"rápido {por_10k['rapido']:.1f} ms/10k filas (x{tiempos['drf'] / tiempos['rapido']:.1f})"
+                )
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def _medir(funcion) -> float:
+        inicio = time.perf_counter()
+        funcion()
+        return time.perf_counter() - inicio
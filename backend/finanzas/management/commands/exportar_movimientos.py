@@ -0,0 +1,44 @@
+"""Export a user's gastos and ingresos to a CSV or XLSX file."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from finanzas import exportacion
+
+
+class Command(BaseCommand):
+    help = "Exporta los gastos e ingresos de un usuario a CSV o XLSX sin cargarlos en memoria."
+
+    def add_arguments(self, parser):
+        parser.add_argument("salida", help="Ruta del archivo a escribir.")
+        parser.add_argument("--usuario", required=True, help="Id o nombre de usuario.")
+        parser.add_argument("--formato", choices=sorted(exportacion.CONTENT_TYPES))
+        parser.add_argument("--desde", help="Fecha inicial AAAA-MM-DD.")
+        parser.add_argument("--hasta", help="Fecha final AAAA-MM-DD.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        identificador = options["usuario"]
+        filtro = {"pk": int(identificador)} if identificador.isdigit() else {"username": identificador}
+        try:
+            usuario = User.objects.get(**filtro)
+        except User.DoesNotExist as error:
+            raise CommandError(f"No existe el usuario {identificador}.") from error
+
+        formato = options["formato"] or options["salida"].rsplit(".", 1)[-1].lower()
+        if formato not in exportacion.CONTENT_TYPES:
+            raise CommandError("Indica --formato csv o xlsx.")
+        fechas = {}
+        for parametro in ("desde", "hasta"):
+            valor = options[parametro]
+            fechas[parametro] = parse_date(valor) if valor else None
+            if valor and fechas[parametro] is None:
+                raise CommandError(f"Fecha inválida en --{parametro}, usa AAAA-MM-DD.")
+
+        escritos = 0
+        with open(options["salida"], "wb") as archivo:
+            for fragmento in exportacion.generar(formato, usuario, fechas["desde"], fechas["hasta"]):
+                escritos += archivo.write(fragmento)
+        self.stdout.write(self.style.SUCCESS(f"Exportados {escritos} bytes a {options['salida']}."))
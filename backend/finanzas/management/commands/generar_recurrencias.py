@@ -0,0 +1,35 @@
+"""Generate the gastos and ingresos of every due recurrence."""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from finanzas import recurrencias
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea los gastos e ingresos pendientes de todas las recurrencias. "
+        "Es seguro ejecutarlo varias veces o en paralelo."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hasta", help="Fecha límite AAAA-MM-DD (por defecto, hoy).")
+        parser.add_argument("--lote", type=int, default=recurrencias.TAMANO_LOTE, help="Recurrencias por transacción.")
+
+    def handle(self, *args, **options):
+        hasta = None
+        if options["hasta"]:
+            hasta = parse_date(options["hasta"])
+            if hasta is None:
+                raise CommandError("Fecha inválida en --hasta, usa AAAA-MM-DD.")
+        if options["lote"] < 1:
+            raise CommandError("--lote debe ser mayor que cero.")
+
+        resultado = recurrencias.generar(hasta, tamano_lote=options["lote"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Recurrencias procesadas: {resultado.recurrencias}. "
+                f"Gastos creados: {resultado.gastos}. Ingresos creados: {resultado.ingresos}."
+            )
+        )
@@ -0,0 +1,50 @@
+"""Import a CSV/OFX bank statement for a user from the command line."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from finanzas.importacion import importar_archivo
+from finanzas.models import Importacion
+
+
+class Command(BaseCommand):
+    help = "Importa una cartola CSV u OFX como gastos e ingresos del usuario, omitiendo duplicados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("archivo")
+        parser.add_argument("--usuario", required=True, help="Id o nombre de usuario.")
+        parser.add_argument("--formato", choices=Importacion.Formato.values)
+        parser.add_argument("--codificacion", default="utf-8-sig")
+        parser.add_argument("--lote", type=int, help="Filas por transacción.")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        identificador = options["usuario"]
+        filtro = {"pk": int(identificador)} if identificador.isdigit() else {"username": identificador}
+        try:
+            usuario = User.objects.get(**filtro)
+        except User.DoesNotExist as error:
+            raise CommandError(f"No existe el usuario {identificador}.") from error
+
+        formato = options["formato"] or options["archivo"].rsplit(".", 1)[-1].lower()
+        if formato not in Importacion.Formato.values:
+            raise CommandError("Indica --formato csv u ofx.")
+
+        with open(options["archivo"], "rb") as archivo:
+            resultado = importar_archivo(
+                usuario,
+                archivo,
+                formato,
+                codificacion=options["codificacion"],
+                tamano_lote=options["lote"],
+            )
+
+        for error in resultado.errores:
+            self.stderr.write(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Filas leídas: {resultado.filas_leidas}. Creados: {resultado.creados}. "
+                f"Duplicados: {resultado.duplicados}. Errores: {resultado.total_errores}."
+            )
+        )
@@ -0,0 +1,37 @@
+"""Delete the sync tombstones older than the retention period."""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from finanzas.models import Eliminacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina las marcas de borrado usadas por /api/v1/sincronizar/ más antiguas que la retención. "
+        "Los clientes con un token anterior reciben una copia completa."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dias",
+            type=int,
+            default=getattr(settings, "SINCRONIZACION_RETENCION_DIAS", 90),
+            help="Días de retención; no menos que SINCRONIZACION_RETENCION_DIAS, el valor por defecto.",
+        )
+
+    def handle(self, *args, **options):
+        retencion = getattr(settings, "SINCRONIZACION_RETENCION_DIAS", 90)
+        if options["dias"] < retencion:
+            # Tokens up to the retention age still get deltas, which would miss these deletions.
+            raise CommandError(
+                f"--dias no puede ser menor que SINCRONIZACION_RETENCION_DIAS ({retencion}); "
+                "para purgar antes, reduce esa configuración."
+            )
+        limite = timezone.now() - timedelta(days=options["dias"])
+        eliminadas, _ = Eliminacion.objects.filter(eliminado_en__lt=limite).delete()
+        self.stdout.write(self.style.SUCCESS(f"Marcas de borrado eliminadas: {eliminadas}."))
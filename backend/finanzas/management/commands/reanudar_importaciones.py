@@ -0,0 +1,27 @@
+"""Run again the statement imports lost with a restarted worker."""
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finanzas import importacion
+
+
+class Command(BaseCommand):
+    help = (
+        "Vuelve a procesar las importaciones que quedaron pendientes o en proceso, p. ej. porque el worker "
+        "se reinició. Las filas ya guardadas se omiten como duplicados."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--minutos",
+            type=int,
+            default=importacion.MINUTOS_ABANDONO,
+            help="Minutos sin avance tras los que una importación se considera abandonada.",
+        )
+
+    def handle(self, *args, **options):
+        if options["minutos"] < 1:
+            raise CommandError("--minutos debe ser mayor que cero.")
+        reanudadas = importacion.reanudar(options["minutos"])
+        self.stdout.write(self.style.SUCCESS(f"Importaciones reanudadas: {len(reanudadas)}."))
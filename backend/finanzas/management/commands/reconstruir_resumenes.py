@@ -0,0 +1,50 @@
+"""Rebuild or verify the monthly ledger rollup from the source tables."""
+from __future__ import annotations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from finanzas import resumenes
+
+
+class Command(BaseCommand):
+    help = "Reconstruye (o verifica con --verificar) la tabla de resúmenes mensuales."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--usuario", type=int, help="Procesa solo el usuario con este id.")
+        parser.add_argument(
+            "--verificar",
+            action="store_true",
+            help="Solo compara los resúmenes con los movimientos y reporta las diferencias.",
+        )
+
+    def handle(self, *args, **options):
+        if options["usuario"] is not None:
+            usuarios = [options["usuario"]]
+        else:
+            usuarios = get_user_model().objects.order_by("pk").values_list("pk", flat=True).iterator()
+
+        if options["verificar"]:
+            self._verificar(usuarios)
+            return
+
+        filas = 0
+        for usuario_id in usuarios:
+            filas += resumenes.reconstruir(usuario_id=usuario_id)
+        self.stdout.write(self.style.SUCCESS(f"Resúmenes reconstruidos: {filas} filas."))
+
+    def _verificar(self, usuarios) -> None:
+        diferencias = 0
+        for usuario_id in usuarios:
+            for clave, esperado, almacenado in resumenes.verificar(usuario_id):
+                diferencias += 1
+                _, mes, partida_id, categoria = clave
+                self.stdout.write(
+                    f"usuario={usuario_id} mes={mes:%Y-%m} partida={partida_id} "
+                    f"categoria={categoria!r}: esperado={esperado} almacenado={almacenado}"
+                )
+        if diferencias:
+            raise CommandError(
+                f"Se encontraron {diferencias} diferencias. Ejecuta el comando sin --verificar para repararlas."
+            )
+        self.stdout.write(self.style.SUCCESS("Los resúmenes coinciden con los movimientos."))
@@ -0,0 +1,133 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:55
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+
+def poblar_resumenes(apps, schema_editor):
+    """Backfill the rollup from the rows that existed before this migration."""
+
+    Gasto = apps.get_model("finanzas", "Gasto")
+    Ingreso = apps.get_model("finanzas", "Ingreso")
+    ResumenMensual = apps.get_model("finanzas", "ResumenMensual")
+
+    filas = {}
+    gastos = (
+        Gasto.objects.annotate(
+            mes=TruncMonth("fecha"),
+            categoria_clave=Case(
+                When(partida__isnull=True, then=F("categoria")),
+                default=Value(""),
+                output_field=models.CharField(),
+            ),
+        )
+        .values("usuario_id", "mes", "partida_id", "categoria_clave")
+        .annotate(total=Sum("monto"), cantidad=Count("id"))
+        .order_by()
+    )
+    for fila in gastos:
+        clave = (fila["usuario_id"], fila["mes"], fila["partida_id"], fila["categoria_clave"] or "")
+        resumen = filas.setdefault(
+            clave,
+            ResumenMensual(usuario_id=clave[0], mes=clave[1], partida_id=clave[2], categoria=clave[3]),
+        )
+        resumen.total_gastos += fila["total"]
+        resumen.cantidad_gastos += fila["cantidad"]
+
+    ingresos = (
+        Ingreso.objects.annotate(mes=TruncMonth("fecha"))
+        .values("usuario_id", "mes")
+        .annotate(total=Sum("monto"), cantidad=Count("id"))
+        .order_by()
+    )
+    for fila in ingresos:
+        clave = (fila["usuario_id"], fila["mes"], None, "")
+        resumen = filas.setdefault(
+            clave,
+            ResumenMensual(usuario_id=clave[0], mes=clave[1], partida_id=None, categoria=""),
+        )
+        resumen.total_ingresos += fila["total"]
+        resumen.cantidad_ingresos += fila["cantidad"]
+
+    ResumenMensual.objects.bulk_create(filas.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finanzas", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ResumenMensual",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("mes", models.DateField()),
+                ("categoria", models.CharField(blank=True, max_length=120)),
+                (
+                    "total_gastos",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                ("cantidad_gastos", models.PositiveIntegerField(default=0)),
+                (
+                    "total_ingresos",
+                    models.DecimalField(
+                        decimal_places=2, default=Decimal("0.00"), max_digits=14
+                    ),
+                ),
+                ("cantidad_ingresos", models.PositiveIntegerField(default=0)),
+                (
+                    "partida",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_mensuales",
+                        to="finanzas.partida",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="resumenes_mensuales",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "resumen mensual",
+                "verbose_name_plural": "resúmenes mensuales",
+                "ordering": ["usuario", "mes"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("partida__isnull", False)),
+                        fields=("usuario", "mes", "partida"),
+                        name="resumen_mensual_unico_partida",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("partida__isnull", True)),
+                        fields=("usuario", "mes", "categoria"),
+                        name="resumen_mensual_unico_categoria",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(poblar_resumenes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+from finanzas.operaciones import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("finanzas", "0002_resumen_mensual"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name="gasto",
+            index=models.Index(
+                fields=["usuario", "fecha", "created_at"],
+                include=("monto",),
+                name="gasto_usuario_fecha_idx",
+            ),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name="gasto",
+            index=models.Index(
+                fields=["usuario", "partida", "fecha"],
+                include=("monto",),
+                name="gasto_usuario_partida_idx",
+            ),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name="ingreso",
+            index=models.Index(
+                fields=["usuario", "fecha", "created_at"],
+                include=("monto",),
+                name="ingreso_usuario_fecha_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,125 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finanzas", "0003_indices_usuario_fecha"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Importacion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("nombre_archivo", models.CharField(max_length=255)),
+                (
+                    "formato",
+                    models.CharField(
+                        choices=[("csv", "CSV"), ("ofx", "OFX")], max_length=10
+                    ),
+                ),
+                (
+                    "estado",
+                    models.CharField(
+                        choices=[
+                            ("pendiente", "Pendiente"),
+                            ("procesando", "Procesando"),
+                            ("completada", "Completada"),
+                            ("fallida", "Fallida"),
+                        ],
+                        default="pendiente",
+                        max_length=20,
+                    ),
+                ),
+                ("filas_leidas", models.PositiveIntegerField(default=0)),
+                ("creados", models.PositiveIntegerField(default=0)),
+                ("duplicados", models.PositiveIntegerField(default=0)),
+                ("errores", models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                "verbose_name": "importación",
+                "verbose_name_plural": "importaciones",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ReglaPartida",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("patron", models.CharField(max_length=120)),
+                ("prioridad", models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                "verbose_name": "regla de partida",
+                "verbose_name_plural": "reglas de partida",
+                "ordering": ["prioridad", "id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="gasto",
+            name="huella",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="ingreso",
+            name="huella",
+            field=models.CharField(
+                blank=True, default="", editable=False, max_length=64
+            ),
+        ),
+        migrations.AddField(
+            model_name="importacion",
+            name="usuario",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="importaciones",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddField(
+            model_name="reglapartida",
+            name="partida",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reglas",
+                to="finanzas.partida",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reglapartida",
+            name="usuario",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="reglas_partida",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+    ]
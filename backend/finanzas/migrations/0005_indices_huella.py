@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:20
+
+from django.db import migrations, models
+
+from finanzas.operaciones import AddIndexConcurrentlyIfSupported
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY cannot run inside a transaction.
+    atomic = False
+
+    dependencies = [
+        ("finanzas", "0004_importacion"),
+    ]
+
+    operations = [
+        AddIndexConcurrentlyIfSupported(
+            model_name="gasto",
+            index=models.Index(
+                condition=models.Q(("huella", ""), _negated=True),
+                fields=["usuario", "huella"],
+                name="gasto_usuario_huella_idx",
+            ),
+        ),
+        AddIndexConcurrentlyIfSupported(
+            model_name="ingreso",
+            index=models.Index(
+                condition=models.Q(("huella", ""), _negated=True),
+                fields=["usuario", "huella"],
+                name="ingreso_usuario_huella_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,130 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finanzas", "0005_indices_huella"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Recurrencia",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                (
+                    "movimiento",
+                    models.CharField(
+                        choices=[("gasto", "Gasto"), ("ingreso", "Ingreso")],
+                        max_length=10,
+                    ),
+                ),
+                ("categoria", models.CharField(blank=True, max_length=120)),
+                ("monto", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("observacion", models.TextField(blank=True)),
+                (
+                    "frecuencia",
+                    models.CharField(
+                        choices=[
+                            ("semanal", "Semanal"),
+                            ("mensual", "Mensual"),
+                            ("anual", "Anual"),
+                        ],
+                        default="mensual",
+                        max_length=10,
+                    ),
+                ),
+                ("intervalo", models.PositiveSmallIntegerField(default=1)),
+                ("fecha_inicio", models.DateField()),
+                ("fecha_fin", models.DateField(blank=True, null=True)),
+                ("proxima_fecha", models.DateField()),
+                ("activa", models.BooleanField(default=True)),
+                (
+                    "partida",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="recurrencias",
+                        to="finanzas.partida",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recurrencias",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "recurrencia",
+                "verbose_name_plural": "recurrencias",
+                "ordering": ["proxima_fecha", "id"],
+            },
+        ),
+        migrations.AddField(
+            model_name="gasto",
+            name="recurrencia",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="gastos",
+                to="finanzas.recurrencia",
+            ),
+        ),
+        migrations.AddField(
+            model_name="ingreso",
+            name="recurrencia",
+            field=models.ForeignKey(
+                blank=True,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="ingresos",
+                to="finanzas.recurrencia",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="gasto",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("recurrencia__isnull", False)),
+                fields=("recurrencia", "fecha"),
+                name="gasto_recurrencia_fecha_unica",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ingreso",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("recurrencia__isnull", False)),
+                fields=("recurrencia", "fecha"),
+                name="ingreso_recurrencia_fecha_unica",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="recurrencia",
+            index=models.Index(
+                condition=models.Q(("activa", True)),
+                fields=["proxima_fecha", "usuario"],
+                name="recurrencia_pendiente_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:31
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finanzas", "0006_recurrencias"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Eliminacion",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "modelo",
+                    models.CharField(
+                        choices=[
+                            ("gasto", "Gasto"),
+                            ("ingreso", "Ingreso"),
+                            ("partida", "Partida"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                ("objeto_id", models.BigIntegerField()),
+                (
+                    "eliminado_en",
+                    models.DateTimeField(default=django.utils.timezone.now),
+                ),
+            ],
+            options={
+                "verbose_name": "eliminación",
+                "verbose_name_plural": "eliminaciones",
+                "ordering": ["eliminado_en"],
+            },
+        ),
+        migrations.AddIndex(
+            model_name="gasto",
+            index=models.Index(
+                fields=["usuario", "updated_at"], name="gasto_usuario_actualiz_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="ingreso",
+            index=models.Index(
+                fields=["usuario", "updated_at"], name="ingreso_usuario_actualiz_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="partida",
+            index=models.Index(
+                fields=["usuario", "updated_at"], name="partida_usuario_actualiz_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="eliminacion",
+            name="usuario",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="eliminaciones",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="eliminacion",
+            index=models.Index(
+                fields=["usuario", "eliminado_en"], name="eliminacion_usuario_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:37
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finanzas", "0007_sincronizacion"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="partida",
+            name="umbral_aviso",
+            field=models.PositiveSmallIntegerField(
+                blank=True,
+                help_text="Porcentaje del monto asignado que dispara el aviso; vacío usa ALERTAS_UMBRAL_AVISO.",
+                null=True,
+                validators=[
+                    django.core.validators.MinValueValidator(1),
+                    django.core.validators.MaxValueValidator(100),
+                ],
+            ),
+        ),
+        migrations.CreateModel(
+            name="Alerta",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+                ("mes", models.DateField()),
+                (
+                    "tipo",
+                    models.CharField(
+                        choices=[
+                            ("aviso", "Cerca del límite"),
+                            ("excedido", "Presupuesto excedido"),
+                        ],
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "porcentaje",
+                    models.DecimalField(
+                        blank=True, decimal_places=2, max_digits=9, null=True
+                    ),
+                ),
+                ("gastado", models.DecimalField(decimal_places=2, max_digits=14)),
+                ("asignado", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("activa", models.BooleanField(default=True)),
+                ("leida", models.BooleanField(default=False)),
+                (
+                    "partida",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alertas",
+                        to="finanzas.partida",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="alertas",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "alerta",
+                "verbose_name_plural": "alertas",
+                "ordering": ["-mes", "-created_at", "-id"],
+                "indexes": [
+                    models.Index(
+                        fields=["usuario", "mes", "created_at"],
+                        name="alerta_usuario_mes_idx",
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("partida", "mes", "tipo"),
+                        name="alerta_partida_mes_tipo_unica",
+                    )
+                ],
+            },
+        ),
+    ]
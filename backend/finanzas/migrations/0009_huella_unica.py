@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-17 10:12
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def limpiar_huellas_repetidas(apps, schema_editor):
+    """Keep the fingerprint on the first row only; the others came from concurrent imports."""
+
+    for nombre in ("Gasto", "Ingreso"):
+        modelo = apps.get_model("finanzas", nombre)
+        repetidas = (
+            modelo.objects.exclude(huella="")
+            .values("usuario_id", "huella")
+            .annotate(filas=Count("id"), primera=Min("id"))
+            .filter(filas__gt=1)
+        )
+        for grupo in repetidas:
+            modelo.objects.filter(usuario_id=grupo["usuario_id"], huella=grupo["huella"]).exclude(
+                pk=grupo["primera"]
+            ).update(huella="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finanzas", "0008_alertas"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(limpiar_huellas_repetidas, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name="gasto",
+            name="gasto_usuario_huella_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="ingreso",
+            name="ingreso_usuario_huella_idx",
+        ),
+        migrations.AddConstraint(
+            model_name="gasto",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("huella", ""), _negated=True),
+                fields=("usuario", "huella"),
+                name="gasto_usuario_huella_unica",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ingreso",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("huella", ""), _negated=True),
+                fields=("usuario", "huella"),
+                name="ingreso_usuario_huella_unica",
+            ),
+        ),
+    ]
@@ -5,7 +5,10 @@ from datetime import date
 from decimal import Decimal
 
 from django.conf import settings
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models import Value
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 
@@ -19,6 +22,45 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+def rango_mes(fecha: date | None = None) -> tuple[date, date]:
+    """Return the first day of the month of ``fecha`` and of the following month."""
+
+    fecha = fecha or timezone.localdate()
+    inicio_mes = fecha.replace(day=1)
+    if inicio_mes.month == 12:
+        siguiente_mes = inicio_mes.replace(year=inicio_mes.year + 1, month=1)
+    else:
+        siguiente_mes = inicio_mes.replace(month=inicio_mes.month + 1)
+    return inicio_mes, siguiente_mes
+
+
+class PartidaQuerySet(models.QuerySet["Partida"]):
+    """Query helpers for budget categories."""
+
+    def con_gasto_mes(self, fecha: date | None = None) -> PartidaQuerySet:
+        """Annotate ``gasto_mes`` with the month spend of every partida in one grouped query.
+
+        When no ``fecha`` is given the current month is used, which is what
+        :meth:`Partida.gasto_total_mes` assumes when it reads the annotation.
+        """
+
+        inicio_mes, siguiente_mes = rango_mes(fecha)
+        return self.annotate(
+            gasto_mes=Coalesce(
+                models.Sum(
+                    "gastos__monto",
+                    filter=models.Q(
+                        gastos__fecha__gte=inicio_mes,
+                        gastos__fecha__lt=siguiente_mes,
+                        gastos__usuario=models.F("usuario"),
+                    ),
+                ),
+                Value(Decimal("0.00")),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            )
+        )
+
+
 class Partida(TimeStampedModel):
     """Budget category assigned to a user."""
 
@@ -34,12 +76,23 @@ class Partida(TimeStampedModel):
     nombre = models.CharField(max_length=120)
     tipo = models.CharField(max_length=20, choices=Tipo.choices, default=Tipo.VARIABLE)
     monto_asignado = models.DecimalField(max_digits=12, decimal_places=2)
+    umbral_aviso = models.PositiveSmallIntegerField(
+        null=True,
+        blank=True,
+        validators=[MinValueValidator(1), MaxValueValidator(100)],
+        help_text="Porcentaje del monto asignado que dispara el aviso; vacío usa ALERTAS_UMBRAL_AVISO.",
+    )
+
+    objects = PartidaQuerySet.as_manager()
 
     class Meta:
         ordering = ["nombre"]
         unique_together = ("usuario", "nombre")
         verbose_name = "partida"
         verbose_name_plural = "partidas"
+        indexes = [
+            models.Index(fields=["usuario", "updated_at"], name="partida_usuario_actualiz_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"{self.nombre} ({self.usuario})"
@@ -47,13 +100,10 @@ class Partida(TimeStampedModel):
     def gasto_total_mes(self, fecha: date | None = None) -> Decimal:
         """Return the total spent for the current month."""
 
-        fecha = fecha or timezone.localdate()
-        inicio_mes = fecha.replace(day=1)
-        if inicio_mes.month == 12:
-            siguiente_mes = inicio_mes.replace(year=inicio_mes.year + 1, month=1)
-        else:
-            siguiente_mes = inicio_mes.replace(month=inicio_mes.month + 1)
+        if fecha is None and getattr(self, "gasto_mes", None) is not None:
+            return self.gasto_mes
 
+        inicio_mes, siguiente_mes = rango_mes(fecha)
         return (
             self.gastos.filter(fecha__gte=inicio_mes, fecha__lt=siguiente_mes)
             .aggregate(total=models.Sum("monto"))
@@ -91,9 +141,44 @@ class Gasto(TimeStampedModel):
     tipo = models.CharField(max_length=20, choices=Tipo.choices, default=Tipo.VARIABLE)
     categoria = models.CharField(max_length=120, blank=True)
     observacion = models.TextField(blank=True)
+    huella = models.CharField(max_length=64, blank=True, default="", editable=False)
+    recurrencia = models.ForeignKey(
+        "Recurrencia",
+        on_delete=models.SET_NULL,
+        related_name="gastos",
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         ordering = ["-fecha", "-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recurrencia", "fecha"],
+                condition=models.Q(recurrencia__isnull=False),
+                name="gasto_recurrencia_fecha_unica",
+            ),
+            # Imports look rows up by fingerprint; two concurrent imports cannot both insert one.
+            models.UniqueConstraint(
+                fields=["usuario", "huella"],
+                condition=~models.Q(huella=""),
+                name="gasto_usuario_huella_unica",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["usuario", "fecha", "created_at"],
+                include=["monto"],
+                name="gasto_usuario_fecha_idx",
+            ),
+            models.Index(fields=["usuario", "updated_at"], name="gasto_usuario_actualiz_idx"),
+            models.Index(
+                fields=["usuario", "partida", "fecha"],
+                include=["monto"],
+                name="gasto_usuario_partida_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         categoria = self.partida.nombre if self.partida else (self.categoria or "General")
@@ -116,9 +201,277 @@ class Ingreso(TimeStampedModel):
     fecha = models.DateField(default=timezone.localdate)
     tipo = models.CharField(max_length=20, choices=Tipo.choices, default=Tipo.FIJO)
     observacion = models.TextField(blank=True)
+    huella = models.CharField(max_length=64, blank=True, default="", editable=False)
+    recurrencia = models.ForeignKey(
+        "Recurrencia",
+        on_delete=models.SET_NULL,
+        related_name="ingresos",
+        null=True,
+        blank=True,
+        editable=False,
+    )
 
     class Meta:
         ordering = ["-fecha", "-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["recurrencia", "fecha"],
+                condition=models.Q(recurrencia__isnull=False),
+                name="ingreso_recurrencia_fecha_unica",
+            ),
+            # Imports look rows up by fingerprint; two concurrent imports cannot both insert one.
+            models.UniqueConstraint(
+                fields=["usuario", "huella"],
+                condition=~models.Q(huella=""),
+                name="ingreso_usuario_huella_unica",
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=["usuario", "fecha", "created_at"],
+                include=["monto"],
+                name="ingreso_usuario_fecha_idx",
+            ),
+            models.Index(fields=["usuario", "updated_at"], name="ingreso_usuario_actualiz_idx"),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover - simple representation
         return f"Ingreso {self.monto} ({self.get_tipo_display()})"
+
+
+class ResumenMensual(models.Model):
+    """Pre-aggregated monthly totals per user and budget category.
+
+    Rows are maintained incrementally by :mod:`finanzas.signals` and can be
+    rebuilt from the source tables with the ``reconstruir_resumenes`` command.
+    Expenses linked to a partida are grouped by partida (with an empty
+    ``categoria``); the rest are grouped by their free-text categoría. Incomes
+    are accumulated in the row without partida nor categoría.
+    """
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="resumenes_mensuales",
+    )
+    mes = models.DateField()
+    partida = models.ForeignKey(
+        Partida,
+        on_delete=models.CASCADE,
+        related_name="resumenes_mensuales",
+        null=True,
+        blank=True,
+    )
+    categoria = models.CharField(max_length=120, blank=True)
+    total_gastos = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    cantidad_gastos = models.PositiveIntegerField(default=0)
+    total_ingresos = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+    cantidad_ingresos = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["usuario", "mes"]
+        verbose_name = "resumen mensual"
+        verbose_name_plural = "resúmenes mensuales"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["usuario", "mes", "partida"],
+                condition=models.Q(partida__isnull=False),
+                name="resumen_mensual_unico_partida",
+            ),
+            models.UniqueConstraint(
+                fields=["usuario", "mes", "categoria"],
+                condition=models.Q(partida__isnull=True),
+                name="resumen_mensual_unico_categoria",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.usuario} {self.mes:%Y-%m}: {self.total_gastos} / {self.total_ingresos}"
+
+
+class Eliminacion(models.Model):
+    """Tombstone of a deleted gasto, ingreso or partida, read by the delta sync.
+
+    Rows older than ``SINCRONIZACION_RETENCION_DIAS`` are removed by the
+    ``purgar_eliminaciones`` command; clients whose token is older than that
+    receive a full snapshot instead.
+    """
+
+    class Modelo(models.TextChoices):
+        GASTO = "gasto", "Gasto"
+        INGRESO = "ingreso", "Ingreso"
+        PARTIDA = "partida", "Partida"
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="eliminaciones",
+    )
+    modelo = models.CharField(max_length=10, choices=Modelo.choices)
+    objeto_id = models.BigIntegerField()
+    eliminado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["eliminado_en"]
+        verbose_name = "eliminación"
+        verbose_name_plural = "eliminaciones"
+        indexes = [
+            models.Index(fields=["usuario", "eliminado_en"], name="eliminacion_usuario_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.modelo} {self.objeto_id} ({self.eliminado_en:%Y-%m-%d %H:%M})"
+
+
+class Alerta(TimeStampedModel):
+    """Budget threshold reached by a partida in a month.
+
+    Rows are upserted by :mod:`finanzas.alertas` whenever the month spend of
+    the partida changes, so reading the active alerts is a plain query. At
+    most one ``tipo`` per partida and month is active at a time.
+    """
+
+    class Tipo(models.TextChoices):
+        AVISO = "aviso", "Cerca del límite"
+        EXCEDIDO = "excedido", "Presupuesto excedido"
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="alertas",
+    )
+    partida = models.ForeignKey(Partida, on_delete=models.CASCADE, related_name="alertas")
+    mes = models.DateField()
+    tipo = models.CharField(max_length=10, choices=Tipo.choices)
+    porcentaje = models.DecimalField(max_digits=9, decimal_places=2, null=True, blank=True)
+    gastado = models.DecimalField(max_digits=14, decimal_places=2)
+    asignado = models.DecimalField(max_digits=12, decimal_places=2)
+    activa = models.BooleanField(default=True)
+    leida = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["-mes", "-created_at", "-id"]
+        verbose_name = "alerta"
+        verbose_name_plural = "alertas"
+        constraints = [
+            models.UniqueConstraint(fields=["partida", "mes", "tipo"], name="alerta_partida_mes_tipo_unica"),
+        ]
+        indexes = [
+            models.Index(fields=["usuario", "mes", "created_at"], name="alerta_usuario_mes_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.get_tipo_display()}: {self.partida.nombre} {self.mes:%Y-%m}"
+
+
+class ReglaPartida(TimeStampedModel):
+    """Assigns imported expenses to a partida when their description contains ``patron``."""
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="reglas_partida",
+    )
+    partida = models.ForeignKey(Partida, on_delete=models.CASCADE, related_name="reglas")
+    patron = models.CharField(max_length=120)
+    prioridad = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["prioridad", "id"]
+        verbose_name = "regla de partida"
+        verbose_name_plural = "reglas de partida"
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.patron} → {self.partida.nombre}"
+
+
+class Importacion(TimeStampedModel):
+    """Bank statement import job processed off the request thread."""
+
+    class Formato(models.TextChoices):
+        CSV = "csv", "CSV"
+        OFX = "ofx", "OFX"
+
+    class Estado(models.TextChoices):
+        PENDIENTE = "pendiente", "Pendiente"
+        PROCESANDO = "procesando", "Procesando"
+        COMPLETADA = "completada", "Completada"
+        FALLIDA = "fallida", "Fallida"
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="importaciones",
+    )
+    nombre_archivo = models.CharField(max_length=255)
+    formato = models.CharField(max_length=10, choices=Formato.choices)
+    estado = models.CharField(max_length=20, choices=Estado.choices, default=Estado.PENDIENTE)
+    filas_leidas = models.PositiveIntegerField(default=0)
+    creados = models.PositiveIntegerField(default=0)
+    duplicados = models.PositiveIntegerField(default=0)
+    errores = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "importación"
+        verbose_name_plural = "importaciones"
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.nombre_archivo} ({self.get_estado_display()})"
+
+
+class Recurrencia(TimeStampedModel):
+    """Fixed expense or income that the scheduler turns into ledger rows.
+
+    ``proxima_fecha`` is the next occurrence still to be generated; the
+    ``generar_recurrencias`` command materialises every occurrence up to the
+    current date and moves it forward. Monthly and yearly rules keep the day of
+    ``fecha_inicio``, clamped to the length of shorter months.
+    """
+
+    class Movimiento(models.TextChoices):
+        GASTO = "gasto", "Gasto"
+        INGRESO = "ingreso", "Ingreso"
+
+    class Frecuencia(models.TextChoices):
+        SEMANAL = "semanal", "Semanal"
+        MENSUAL = "mensual", "Mensual"
+        ANUAL = "anual", "Anual"
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recurrencias",
+    )
+    movimiento = models.CharField(max_length=10, choices=Movimiento.choices)
+    partida = models.ForeignKey(
+        Partida,
+        on_delete=models.SET_NULL,
+        related_name="recurrencias",
+        null=True,
+        blank=True,
+    )
+    categoria = models.CharField(max_length=120, blank=True)
+    monto = models.DecimalField(max_digits=12, decimal_places=2)
+    observacion = models.TextField(blank=True)
+    frecuencia = models.CharField(max_length=10, choices=Frecuencia.choices, default=Frecuencia.MENSUAL)
+    intervalo = models.PositiveSmallIntegerField(default=1)
+    fecha_inicio = models.DateField()
+    fecha_fin = models.DateField(null=True, blank=True)
+    proxima_fecha = models.DateField()
+    activa = models.BooleanField(default=True)
+
+    class Meta:
+        ordering = ["proxima_fecha", "id"]
+        verbose_name = "recurrencia"
+        verbose_name_plural = "recurrencias"
+        indexes = [
+            models.Index(
+                fields=["proxima_fecha", "usuario"],
+                condition=models.Q(activa=True),
+                name="recurrencia_pendiente_idx",
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover - simple representation
+        return f"{self.get_movimiento_display()} {self.monto} ({self.get_frecuencia_display()})"
@@ -0,0 +1,115 @@
+"""Keyset (seek) pagination for the ledger list endpoints."""
+from __future__ import annotations
+
+import base64
+import json
+from datetime import date, datetime
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Paginate by ``(fecha, created_at, id)`` descending using opaque cursors.
+
+    Each page is fetched with a ``WHERE (fecha, created_at, id) < cursor``
+    condition instead of an ``OFFSET``, so reading deep into a user's history
+    costs the same as reading the first page.
+
+    Pagination is opt-in while the frontend migrates: it is applied when the
+    request carries ``cursor`` or ``page_size``, or for every request when
+    ``FINANZAS_PAGINACION_POR_DEFECTO`` is enabled, in which case
+    ``?paginar=0`` still returns the legacy unpaginated list. Subclasses for
+    new endpoints set ``opcional = False`` to always paginate, and may order
+    by another ``(date, datetime, id)`` triple.
+    """
+
+    ordering = ("-fecha", "-created_at", "-id")
+    opcional = True
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    disable_query_param = "paginar"
+    invalid_cursor_message = "Cursor inválido."
+
+    def __init__(self) -> None:
+        self.page_size = getattr(settings, "FINANZAS_PAGE_SIZE", 100)
+        self.max_page_size = getattr(settings, "FINANZAS_MAX_PAGE_SIZE", 1000)
+        self.next_cursor: str | None = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self._activa(request):
+            return None
+
+        self.request = request
+        page_size = self._page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded:
+            fecha, created_at, pk = self._decode_cursor(encoded)
+            campo_fecha, campo_momento, _ = self._campos()
+            queryset = queryset.filter(**{f"{campo_fecha}__lte": fecha}).filter(
+                Q(**{f"{campo_fecha}__lt": fecha})
+                | Q(**{campo_fecha: fecha, f"{campo_momento}__lt": created_at})
+                | Q(**{campo_fecha: fecha, campo_momento: created_at, "pk__lt": pk})
+            )
+
+        results = list(queryset[: page_size + 1])
+        if len(results) > page_size:
+            results = results[:page_size]
+            self.next_cursor = self._encode_cursor(results[-1])
+        return results
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_next_link(self) -> str | None:
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def _campos(self) -> list[str]:
+        return [campo.lstrip("-") for campo in self.ordering]
+
+    def _activa(self, request) -> bool:
+        params = request.query_params
+        if not self.opcional or self.cursor_query_param in params or self.page_size_query_param in params:
+            return True
+        if getattr(settings, "FINANZAS_PAGINACION_POR_DEFECTO", False):
+            return params.get(self.disable_query_param) != "0"
+        return False
+
+    def _page_size(self, request) -> int:
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            page_size = self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def _encode_cursor(self, obj) -> str:
+        campo_fecha, campo_momento, _ = self._campos()
+        payload = json.dumps(
+            [getattr(obj, campo_fecha).isoformat(), getattr(obj, campo_momento).isoformat(), obj.pk],
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def _decode_cursor(self, encoded: str) -> tuple[date, datetime, int]:
+        try:
+            padded = encoded + "=" * (-len(encoded) % 4)
+            fecha, created_at, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return date.fromisoformat(fecha), datetime.fromisoformat(created_at), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+
+class AlertaPagination(KeysetPagination):
+    """Always-on keyset pagination of the alerts, newest month first."""
+
+    ordering = ("-mes", "-created_at", "-id")
+    opcional = False
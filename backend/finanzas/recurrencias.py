@@ -0,0 +1,151 @@
+"""Materialisation of recurring expenses and incomes.
+
+The scheduler walks the due :class:`Recurrencia` rows in chunks. Each chunk
+is locked with ``SKIP LOCKED`` (so concurrent runs split the work instead of
+blocking), its occurrences are inserted in bulk and ``proxima_fecha`` is moved
+forward in the same transaction. A crash therefore loses at most the chunk in
+flight, and re-running simply picks it up again; the unique
+``(recurrencia, fecha)`` constraint guards against double generation.
+"""
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from . import cache, lotes
+from .models import Gasto, Ingreso, Recurrencia
+
+TAMANO_LOTE = 500
+# Upper bound of occurrences generated per rule and run, e.g. for a weekly
+# rule created with a start date far in the past.
+MAXIMO_OCURRENCIAS = 520
+# Fields that move the dates of a rule; changing any of them reschedules it.
+CAMPOS_CALENDARIO = ("fecha_inicio", "frecuencia", "intervalo")
+
+
+@dataclass
+class ResultadoRecurrencias:
+    recurrencias: int = 0
+    gastos: int = 0
+    ingresos: int = 0
+
+
+def _con_dia(anio: int, mes: int, dia: int) -> date:
+    return date(anio, mes, min(dia, calendar.monthrange(anio, mes)[1]))
+
+
+def siguiente_fecha(recurrencia: Recurrencia, fecha: date) -> date:
+    """Return the occurrence following ``fecha``."""
+
+    intervalo = recurrencia.intervalo or 1
+    ancla = recurrencia.fecha_inicio
+    if recurrencia.frecuencia == Recurrencia.Frecuencia.SEMANAL:
+        return fecha + timedelta(weeks=intervalo)
+    if recurrencia.frecuencia == Recurrencia.Frecuencia.ANUAL:
+        return _con_dia(fecha.year + intervalo, ancla.month, ancla.day)
+    meses = fecha.year * 12 + fecha.month - 1 + intervalo
+    return _con_dia(meses // 12, meses % 12 + 1, ancla.day)
+
+
+def reprogramar(recurrencia: Recurrencia) -> date:
+    """Return the ``proxima_fecha`` of a rule whose schedule changed.
+
+    That is its first date after the last occurrence already generated, or
+    ``fecha_inicio`` when there is none.
+    """
+
+    modelo = Gasto if recurrencia.movimiento == Recurrencia.Movimiento.GASTO else Ingreso
+    ultima = modelo.objects.filter(recurrencia_id=recurrencia.pk).aggregate(ultima=Max("fecha"))["ultima"]
+    fecha = recurrencia.fecha_inicio
+    while ultima is not None and fecha <= ultima:
+        fecha = siguiente_fecha(recurrencia, fecha)
+    return fecha
+
+
+def ocurrencias(recurrencia: Recurrencia, hasta: date) -> tuple[list[date], date]:
+    """Return the due dates up to ``hasta`` and the new ``proxima_fecha``."""
+
+    fechas: list[date] = []
+    fecha = recurrencia.proxima_fecha
+    while fecha <= hasta and len(fechas) < MAXIMO_OCURRENCIAS:
+        if recurrencia.fecha_fin and fecha > recurrencia.fecha_fin:
+            break
+        fechas.append(fecha)
+        fecha = siguiente_fecha(recurrencia, fecha)
+    return fechas, fecha
+
+
+def _movimiento(recurrencia: Recurrencia, fecha: date) -> Gasto | Ingreso:
+    if recurrencia.movimiento == Recurrencia.Movimiento.GASTO:
+        return Gasto(
+            usuario_id=recurrencia.usuario_id,
+            partida_id=recurrencia.partida_id,
+            categoria="" if recurrencia.partida_id else recurrencia.categoria,
+            monto=recurrencia.monto,
+            fecha=fecha,
+            tipo=Gasto.Tipo.FIJO,
+            observacion=recurrencia.observacion,
+            recurrencia=recurrencia,
+        )
+    return Ingreso(
+        usuario_id=recurrencia.usuario_id,
+        monto=recurrencia.monto,
+        fecha=fecha,
+        tipo=Ingreso.Tipo.FIJO,
+        observacion=recurrencia.observacion,
+        recurrencia=recurrencia,
+    )
+
+
+def _procesar_lote(hasta: date, tamano_lote: int, resultado: ResultadoRecurrencias) -> int:
+    with transaction.atomic():
+        recurrencias = list(
+            Recurrencia.objects.filter(activa=True, proxima_fecha__lte=hasta)
+            .order_by("usuario_id", "id")
+            .select_for_update(skip_locked=True)[:tamano_lote]
+        )
+        if not recurrencias:
+            return 0
+
+        ids = [recurrencia.pk for recurrencia in recurrencias]
+        existentes = set(
+            Gasto.objects.filter(recurrencia_id__in=ids).values_list("recurrencia_id", "fecha")
+        ) | set(Ingreso.objects.filter(recurrencia_id__in=ids).values_list("recurrencia_id", "fecha"))
+
+        nuevos: dict[type, list] = {Gasto: [], Ingreso: []}
+        for recurrencia in recurrencias:
+            fechas, proxima = ocurrencias(recurrencia, hasta)
+            for fecha in fechas:
+                if (recurrencia.pk, fecha) not in existentes:
+                    movimiento = _movimiento(recurrencia, fecha)
+                    nuevos[type(movimiento)].append(movimiento)
+            recurrencia.proxima_fecha = proxima
+            recurrencia.activa = not (recurrencia.fecha_fin and proxima > recurrencia.fecha_fin)
+            recurrencia.updated_at = timezone.now()
+
+        for modelo, objetos in nuevos.items():
+            if objetos:
+                lotes.insertar(modelo, objetos)
+        Recurrencia.objects.bulk_update(recurrencias, ["proxima_fecha", "activa", "updated_at"])
+        for usuario_id in {recurrencia.usuario_id for recurrencia in recurrencias}:
+            cache.invalidar_usuario_al_confirmar(usuario_id, "recurrencias")
+
+    resultado.recurrencias += len(recurrencias)
+    resultado.gastos += len(nuevos[Gasto])
+    resultado.ingresos += len(nuevos[Ingreso])
+    return len(recurrencias)
+
+
+def generar(hasta: date | None = None, *, tamano_lote: int = TAMANO_LOTE) -> ResultadoRecurrencias:
+    """Create every occurrence due up to ``hasta`` (today by default) for all users."""
+
+    hasta = hasta or timezone.localdate()
+    resultado = ResultadoRecurrencias()
+    while _procesar_lote(hasta, tamano_lote, resultado):
+        pass
+    return resultado
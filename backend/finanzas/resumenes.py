@@ -0,0 +1,304 @@
+"""Maintenance of the monthly ledger rollup stored in :class:`ResumenMensual`."""
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, Count, F, Sum, Value, When
+from django.db.models.functions import TruncMonth
+
+from . import alertas
+from .models import Alerta, Gasto, Ingreso, ResumenMensual
+
+CERO = Decimal("0.00")
+
+# (usuario_id, mes, partida_id, categoria)
+Clave = tuple[int, date, "int | None", str]
+
+CAMPOS_MOVIMIENTO: dict[type[models.Model], tuple[str, ...]] = {
+    Gasto: ("usuario_id", "fecha", "partida_id", "categoria", "monto"),
+    Ingreso: ("usuario_id", "fecha", "monto"),
+}
+
+
+@dataclass
+class Delta:
+    """Change to apply on a single rollup row."""
+
+    total_gastos: Decimal = CERO
+    cantidad_gastos: int = 0
+    total_ingresos: Decimal = CERO
+    cantidad_ingresos: int = 0
+
+    def vacio(self) -> bool:
+        return not (self.total_gastos or self.cantidad_gastos or self.total_ingresos or self.cantidad_ingresos)
+
+    def resta(self) -> bool:
+        return self.cantidad_gastos < 0 or self.cantidad_ingresos < 0
+
+
+def inicio_mes(fecha: date) -> date:
+    """Return the first day of the month of ``fecha``."""
+
+    return fecha.replace(day=1)
+
+
+def clave_gasto(usuario_id: int, fecha: date, partida_id: int | None, categoria: str | None) -> Clave:
+    """Return the rollup key an expense contributes to."""
+
+    if partida_id is not None:
+        categoria = ""
+    return (usuario_id, inicio_mes(fecha), partida_id, categoria or "")
+
+
+def clave_ingreso(usuario_id: int, fecha: date) -> Clave:
+    """Return the rollup key an income contributes to."""
+
+    return (usuario_id, inicio_mes(fecha), None, "")
+
+
+def valores_de(instancia: Gasto | Ingreso) -> dict:
+    """Extract the fields relevant to the rollup, coerced to Python types."""
+
+    opts = instancia._meta
+    return {
+        campo: opts.get_field(campo).to_python(getattr(instancia, campo))
+        for campo in CAMPOS_MOVIMIENTO[type(instancia)]
+    }
+
+
+def acumular(deltas: dict[Clave, Delta], modelo: type[models.Model], valores: Mapping, signo: int) -> None:
+    """Add (``signo=1``) or remove (``signo=-1``) one movement from ``deltas``."""
+
+    monto = Decimal(str(valores["monto"]))
+    if modelo is Gasto:
+        clave = clave_gasto(valores["usuario_id"], valores["fecha"], valores["partida_id"], valores["categoria"])
+        delta = deltas.setdefault(clave, Delta())
+        delta.total_gastos += signo * monto
+        delta.cantidad_gastos += signo
+    else:
+        clave = clave_ingreso(valores["usuario_id"], valores["fecha"])
+        delta = deltas.setdefault(clave, Delta())
+        delta.total_ingresos += signo * monto
+        delta.cantidad_ingresos += signo
+
+
+def aplicar(deltas: Mapping[Clave, Delta]) -> None:
+    """Apply accumulated deltas to the rollup table and re-evaluate the touched partidas' alerts."""
+
+    with transaction.atomic():
+        presupuestos = set()
+        for clave, delta in deltas.items():
+            if not delta.vacio():
+                _aplicar_delta(clave, delta)
+                if clave[2] is not None and delta.total_gastos:
+                    presupuestos.add((clave[2], clave[1]))
+        alertas.evaluar(presupuestos)
+
+
+def _aplicar_delta(clave: Clave, delta: Delta) -> None:
+    usuario_id, mes, partida_id, categoria = clave
+    filas = ResumenMensual.objects.filter(
+        usuario_id=usuario_id, mes=mes, partida_id=partida_id, categoria=categoria
+    )
+    cambios = {
+        "total_gastos": F("total_gastos") + delta.total_gastos,
+        "cantidad_gastos": F("cantidad_gastos") + delta.cantidad_gastos,
+        "total_ingresos": F("total_ingresos") + delta.total_ingresos,
+        "cantidad_ingresos": F("cantidad_ingresos") + delta.cantidad_ingresos,
+    }
+    if filas.update(**cambios):
+        if delta.resta():
+            filas.filter(cantidad_gastos=0, cantidad_ingresos=0).delete()
+        return
+    if delta.resta():
+        # The row is already gone (e.g. removed by a cascade); nothing to subtract.
+        return
+    try:
+        with transaction.atomic():
+            ResumenMensual.objects.create(
+                usuario_id=usuario_id,
+                mes=mes,
+                partida_id=partida_id,
+                categoria=categoria,
+                total_gastos=delta.total_gastos,
+                cantidad_gastos=delta.cantidad_gastos,
+                total_ingresos=delta.total_ingresos,
+                cantidad_ingresos=delta.cantidad_ingresos,
+            )
+    except IntegrityError:
+        # A concurrent writer created the row first.
+        filas.update(**cambios)
+
+
+def calcular(usuario_id: int | None = None, meses: Iterable[date] | None = None) -> dict[Clave, Delta]:
+    """Compute the expected rollup rows straight from the source tables."""
+
+    gastos = Gasto.objects.annotate(
+        mes=TruncMonth("fecha"),
+        categoria_clave=Case(
+            When(partida__isnull=True, then=F("categoria")),
+            default=Value(""),
+            output_field=models.CharField(),
+        ),
+    )
+    ingresos = Ingreso.objects.annotate(mes=TruncMonth("fecha"))
+    if usuario_id is not None:
+        gastos = gastos.filter(usuario_id=usuario_id)
+        ingresos = ingresos.filter(usuario_id=usuario_id)
+    if meses is not None:
+        meses = list(meses)
+        gastos = gastos.filter(mes__in=meses)
+        ingresos = ingresos.filter(mes__in=meses)
+
+    esperado: dict[Clave, Delta] = {}
+    for fila in (
+        gastos.values("usuario_id", "mes", "partida_id", "categoria_clave")
+        .annotate(total=Sum("monto"), cantidad=Count("id"))
+        .order_by()
+    ):
+        clave = (fila["usuario_id"], fila["mes"], fila["partida_id"], fila["categoria_clave"] or "")
+        delta = esperado.setdefault(clave, Delta())
+        delta.total_gastos += fila["total"]
+        delta.cantidad_gastos += fila["cantidad"]
+    for fila in ingresos.values("usuario_id", "mes").annotate(total=Sum("monto"), cantidad=Count("id")).order_by():
+        delta = esperado.setdefault((fila["usuario_id"], fila["mes"], None, ""), Delta())
+        delta.total_ingresos += fila["total"]
+        delta.cantidad_ingresos += fila["cantidad"]
+    return esperado
+
+
+def _almacenado(usuario_id: int | None, meses: list[date] | None) -> models.QuerySet[ResumenMensual]:
+    queryset = ResumenMensual.objects.all()
+    if usuario_id is not None:
+        queryset = queryset.filter(usuario_id=usuario_id)
+    if meses is not None:
+        queryset = queryset.filter(mes__in=meses)
+    return queryset
+
+
+def reconstruir(usuario_id: int | None = None, meses: Iterable[date] | None = None) -> int:
+    """Replace the stored rollup rows with freshly computed ones; return the row count.
+
+    The alerts of the rebuilt months are re-evaluated against the new totals.
+    """
+
+    meses = list(meses) if meses is not None else None
+    with transaction.atomic():
+        esperado = calcular(usuario_id, meses)
+        _almacenado(usuario_id, meses).delete()
+        ResumenMensual.objects.bulk_create(
+            ResumenMensual(
+                usuario_id=clave[0],
+                mes=clave[1],
+                partida_id=clave[2],
+                categoria=clave[3],
+                total_gastos=delta.total_gastos,
+                cantidad_gastos=delta.cantidad_gastos,
+                total_ingresos=delta.total_ingresos,
+                cantidad_ingresos=delta.cantidad_ingresos,
+            )
+            for clave, delta in esperado.items()
+        )
+        alertas.reevaluar(usuario_id, meses)
+    return len(esperado)
+
+
+def verificar(usuario_id: int | None = None) -> list[tuple[Clave, Delta | None, Delta | None]]:
+    """Return ``(clave, esperado, almacenado)`` for every drifted rollup row."""
+
+    esperado = calcular(usuario_id)
+    almacenado = {
+        (fila.usuario_id, fila.mes, fila.partida_id, fila.categoria): Delta(
+            fila.total_gastos, fila.cantidad_gastos, fila.total_ingresos, fila.cantidad_ingresos
+        )
+        for fila in _almacenado(usuario_id, None)
+    }
+    return [
+        (clave, esperado.get(clave), almacenado.get(clave))
+        for clave in esperado.keys() | almacenado.keys()
+        if esperado.get(clave) != almacenado.get(clave)
+    ]
+
+
+@dataclass
+class TotalesMes:
+    """Month totals read from the rollup table."""
+
+    total_ingresos: Decimal
+    total_gastos: Decimal
+    gastos_por_categoria: dict[str, Decimal]
+
+
+def totales_mes(usuario_id: int, mes: date) -> TotalesMes:
+    """Read the month totals of a user from the pre-aggregated rows."""
+
+    filas = ResumenMensual.objects.filter(usuario_id=usuario_id, mes=inicio_mes(mes)).select_related("partida")
+    total_ingresos = CERO
+    total_gastos = CERO
+    categorias: dict[str, Decimal] = {}
+    for fila in filas:
+        total_ingresos += fila.total_ingresos
+        total_gastos += fila.total_gastos
+        if fila.cantidad_gastos:
+            key = fila.partida.nombre if fila.partida else (fila.categoria or "Otros")
+            categorias[key] = categorias.get(key, CERO) + fila.total_gastos
+    return TotalesMes(total_ingresos, total_gastos, categorias)
+
+
+def totales_de(gastos: Iterable[Gasto], ingresos: Iterable[Ingreso]) -> TotalesMes:
+    """Compute the same totals as :func:`totales_mes` from already loaded movements."""
+
+    total_ingresos = sum((ingreso.monto for ingreso in ingresos), CERO)
+    total_gastos = CERO
+    categorias: dict[str, Decimal] = {}
+    for gasto in gastos:
+        total_gastos += gasto.monto
+        key = gasto.partida.nombre if gasto.partida_id else (gasto.categoria or "Otros")
+        categorias[key] = categorias.get(key, CERO) + gasto.monto
+    return TotalesMes(total_ingresos, total_gastos, categorias)
+
+
+def sugerencias(totales: TotalesMes, alertas_mes: Iterable) -> list[str]:
+    """Return the dashboard advice for the month ``totales`` and its active ``alertas_mes``."""
+
+    resultado: list[str] = []
+    total_ingresos = totales.total_ingresos
+    total_gastos = totales.total_gastos
+    saldo = total_ingresos - total_gastos
+
+    if total_ingresos > 0:
+        porcentaje_uso = (total_gastos / total_ingresos * Decimal("100")).quantize(Decimal("0.01"))
+        if porcentaje_uso <= Decimal("85"):
+            resultado.append(
+                "Vas administrando bien tu dinero. Considera destinar parte del excedente a un fondo de inversión."
+            )
+        elif porcentaje_uso > Decimal("100"):
+            resultado.append(
+                "Has gastado más de lo que ingresó este mes. Revisa tus gastos variables para realizar ajustes."
+            )
+    else:
+        resultado.append("Aún no registras ingresos este mes. Recuerda ingresarlos para obtener un balance realista.")
+
+    if saldo > Decimal("0"):
+        resultado.append(
+            "Excelente, tienes un saldo positivo. Define un objetivo de ahorro para mantener esta tendencia."
+        )
+    elif saldo < Decimal("0"):
+        resultado.append(
+            "Tu saldo es negativo. Intenta posponer compras no esenciales para equilibrar tus finanzas."
+        )
+
+    for alerta in alertas_mes:
+        if alerta.tipo == Alerta.Tipo.EXCEDIDO:
+            resultado.append(
+                f"Has superado el presupuesto de {alerta.partida.nombre} en ${alerta.gastado - alerta.asignado:,.2f}. Considera reducir gastos en esta categoría."
+            )
+        else:
+            resultado.append(
+                f"Estás por alcanzar el límite de {alerta.partida.nombre}. Monitorea tus próximos gastos en esta partida."
+            )
+    return resultado
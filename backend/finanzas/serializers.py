@@ -1,22 +1,57 @@
 """Serializers for finance API endpoints."""
 from __future__ import annotations
 
-from collections import defaultdict
-from datetime import date
+from collections.abc import Collection
 from decimal import Decimal
 
+from django.core.exceptions import FieldDoesNotExist
 from django.db.models import Sum
-from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Gasto, Ingreso, Partida
+from .models import Alerta, Gasto, Importacion, Ingreso, Partida, Recurrencia, ReglaPartida, rango_mes
 
 
-class PartidaSerializer(serializers.ModelSerializer[Partida]):
+class CamposDinamicosMixin:
+    """Keep only the fields listed in ``campos`` and report the columns they read.
+
+    ``columnas_campos`` maps the fields that are not a plain model field (method
+    fields, mostly) to the columns they use, so :meth:`columnas` can build the
+    ``.only()`` set of a sparse request.
+    """
+
+    columnas_campos: dict[str, tuple[str, ...]] = {}
+
+    def __init__(self, *args, campos: Collection[str] | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if campos is not None:
+            for nombre in set(self.fields) - set(campos):
+                self.fields.pop(nombre)
+
+    def columnas(self) -> set[str] | None:
+        """Return the columns read by the kept fields, or ``None`` if one is unknown."""
+
+        columnas: set[str] = set()
+        for nombre, campo in self.fields.items():
+            if campo.write_only:
+                continue
+            if nombre in self.columnas_campos:
+                columnas.update(self.columnas_campos[nombre])
+                continue
+            try:
+                self.Meta.model._meta.get_field(campo.source.split(".")[0])
+            except FieldDoesNotExist:
+                return None
+            columnas.add(campo.source.replace(".", "__"))
+        return columnas
+
+
+class PartidaSerializer(CamposDinamicosMixin, serializers.ModelSerializer[Partida]):
     """Serializer for budget items including calculated monthly amounts."""
 
     gastado_mes = serializers.SerializerMethodField()
     disponible_mes = serializers.SerializerMethodField()
+    # ``gasto_mes`` is an annotation, see ``PartidaViewSet.get_queryset``.
+    columnas_campos = {"gastado_mes": (), "disponible_mes": ("monto_asignado",)}
 
     class Meta:
         model = Partida
@@ -25,6 +60,7 @@ class PartidaSerializer(serializers.ModelSerializer[Partida]):
             "nombre",
             "tipo",
             "monto_asignado",
+            "umbral_aviso",
             "gastado_mes",
             "disponible_mes",
             "created_at",
@@ -32,38 +68,35 @@ class PartidaSerializer(serializers.ModelSerializer[Partida]):
         ]
         read_only_fields = ("created_at", "updated_at", "gastado_mes", "disponible_mes")
 
-    def _rango_mes(self, referencia: date | None = None) -> tuple[date, date]:
-        referencia = referencia or timezone.localdate()
-        inicio = referencia.replace(day=1)
-        if inicio.month == 12:
-            fin = inicio.replace(year=inicio.year + 1, month=1)
-        else:
-            fin = inicio.replace(month=inicio.month + 1)
-        return inicio, fin
-
     def get_gastado_mes(self, obj: Partida) -> Decimal:
+        total = getattr(obj, "gasto_mes", None)
+        if total is None:
+            total = obj.gasto_mes = self._consultar_gastado_mes(obj) or Decimal("0.00")
+        if not isinstance(total, Decimal):
+            total = Decimal(str(total))
+        return total.quantize(Decimal("0.01"))
+
+    def _consultar_gastado_mes(self, obj: Partida) -> Decimal | None:
+        """Fallback for instances that were not loaded through ``con_gasto_mes``."""
+
         request = self.context.get("request")
         usuario = getattr(request, "user", None)
-        inicio, fin = self._rango_mes()
+        inicio, fin = rango_mes()
         queryset = obj.gastos.filter(fecha__gte=inicio, fecha__lt=fin)
         if usuario is not None and usuario.is_authenticated:
             queryset = queryset.filter(usuario=usuario)
-        total = queryset.aggregate(total=Sum("monto")).get("total")
-        if total is None:
-            return Decimal("0.00")
-        if not isinstance(total, Decimal):
-            total = Decimal(str(total))
-        return total.quantize(Decimal("0.01"))
+        return queryset.aggregate(total=Sum("monto")).get("total")
 
     def get_disponible_mes(self, obj: Partida) -> Decimal:
         gastado = self.get_gastado_mes(obj)
         return obj.monto_asignado - gastado
 
 
-class GastoSerializer(serializers.ModelSerializer[Gasto]):
+class GastoSerializer(CamposDinamicosMixin, serializers.ModelSerializer[Gasto]):
     """Serializer for expense records."""
 
     partida_nombre = serializers.SerializerMethodField()
+    columnas_campos = {"partida_nombre": ("partida__nombre", "categoria")}
     categoria = serializers.CharField(
         allow_blank=True, allow_null=True, required=False
     )
@@ -115,7 +148,7 @@ class GastoSerializer(serializers.ModelSerializer[Gasto]):
         return super().validate(attrs)
 
 
-class IngresoSerializer(serializers.ModelSerializer[Ingreso]):
+class IngresoSerializer(CamposDinamicosMixin, serializers.ModelSerializer[Ingreso]):
     """Serializer for income records."""
 
     observacion = serializers.CharField(
@@ -141,8 +174,171 @@ class IngresoSerializer(serializers.ModelSerializer[Ingreso]):
         return super().validate(attrs)
 
 
-class ResumenFinancieroSerializer(serializers.Serializer):
-    """Serializer that structures the dashboard summary response."""
+class ReglaPartidaSerializer(CamposDinamicosMixin, serializers.ModelSerializer[ReglaPartida]):
+    """Serializer for the rules that assign imported expenses to partidas."""
+
+    class Meta:
+        model = ReglaPartida
+        fields = ["id", "partida", "patron", "prioridad", "created_at", "updated_at"]
+        read_only_fields = ("created_at", "updated_at")
+
+    def validate_partida(self, value: Partida) -> Partida:
+        request = self.context.get("request")
+        if request is not None and value.usuario_id != request.user.pk:
+            raise serializers.ValidationError("La partida no existe.")
+        return value
+
+
+class RecurrenciaSerializer(CamposDinamicosMixin, serializers.ModelSerializer[Recurrencia]):
+    """Serializer for recurring expenses and incomes."""
+
+    class Meta:
+        model = Recurrencia
+        fields = [
+            "id",
+            "movimiento",
+            "partida",
+            "categoria",
+            "monto",
+            "observacion",
+            "frecuencia",
+            "intervalo",
+            "fecha_inicio",
+            "fecha_fin",
+            "proxima_fecha",
+            "activa",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = ("proxima_fecha", "created_at", "updated_at")
+
+    def validate_partida(self, value: Partida | None) -> Partida | None:
+        request = self.context.get("request")
+        if value is not None and request is not None and value.usuario_id != request.user.pk:
+            raise serializers.ValidationError("La partida no existe.")
+        return value
+
+    def validate_intervalo(self, value: int) -> int:
+        if value < 1:
+            raise serializers.ValidationError("Debe ser mayor o igual a 1.")
+        return value
+
+    def validate(self, attrs: dict) -> dict:
+        movimiento = attrs.get("movimiento", getattr(self.instance, "movimiento", None))
+        if movimiento == Recurrencia.Movimiento.INGRESO and attrs.get("partida"):
+            raise serializers.ValidationError({"partida": "Los ingresos no se asignan a partidas."})
+        partida = attrs.get("partida", getattr(self.instance, "partida", None))
+        categoria = attrs.get("categoria", getattr(self.instance, "categoria", ""))
+        if movimiento == Recurrencia.Movimiento.GASTO and not partida and not categoria:
+            raise serializers.ValidationError(
+                "Debes seleccionar una partida o indicar una categoría para el gasto."
+            )
+        fecha_inicio = attrs.get("fecha_inicio", getattr(self.instance, "fecha_inicio", None))
+        fecha_fin = attrs.get("fecha_fin", getattr(self.instance, "fecha_fin", None))
+        if fecha_inicio and fecha_fin and fecha_fin < fecha_inicio:
+            raise serializers.ValidationError({"fecha_fin": "Debe ser posterior a la fecha de inicio."})
+        return super().validate(attrs)
+
+    def create(self, validated_data: dict) -> Recurrencia:
+        validated_data["proxima_fecha"] = validated_data["fecha_inicio"]
+        return super().create(validated_data)
+
+
+class ImportacionSerializer(CamposDinamicosMixin, serializers.ModelSerializer[Importacion]):
+    """Serializer for bank statement uploads and their processing status."""
+
+    archivo = serializers.FileField(write_only=True)
+    formato = serializers.ChoiceField(choices=Importacion.Formato.choices, required=False)
+
+    class Meta:
+        model = Importacion
+        fields = [
+            "id",
+            "archivo",
+            "nombre_archivo",
+            "formato",
+            "estado",
+            "filas_leidas",
+            "creados",
+            "duplicados",
+            "errores",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = (
+            "nombre_archivo",
+            "estado",
+            "filas_leidas",
+            "creados",
+            "duplicados",
+            "errores",
+            "created_at",
+            "updated_at",
+        )
+
+    def validate(self, attrs: dict) -> dict:
+        if not attrs.get("formato"):
+            extension = attrs["archivo"].name.rsplit(".", 1)[-1].lower()
+            if extension not in Importacion.Formato.values:
+                raise serializers.ValidationError({"formato": "Indica el formato del archivo (csv u ofx)."})
+            attrs["formato"] = extension
+        return super().validate(attrs)
+
+
+class AlertaSerializer(CamposDinamicosMixin, serializers.ModelSerializer[Alerta]):
+    """Serializer for budget alerts; only ``leida`` can be changed by the user."""
+
+    partida_nombre = serializers.CharField(source="partida.nombre", read_only=True)
+    mes = serializers.DateField(format="%Y-%m", read_only=True)
+    columnas_campos = {"partida_nombre": ("partida__nombre",)}
+
+    class Meta:
+        model = Alerta
+        fields = [
+            "id",
+            "partida",
+            "partida_nombre",
+            "mes",
+            "tipo",
+            "porcentaje",
+            "gastado",
+            "asignado",
+            "activa",
+            "leida",
+            "created_at",
+            "updated_at",
+        ]
+        read_only_fields = (
+            "partida",
+            "tipo",
+            "porcentaje",
+            "gastado",
+            "asignado",
+            "activa",
+            "created_at",
+            "updated_at",
+        )
+
+
+class GastoPartidaSerializer(serializers.Serializer):
+    """Spend of one partida (``null`` for expenses without partida) in a bucket."""
+
+    partida = serializers.IntegerField(allow_null=True)
+    total = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+
+class TramoTendenciaSerializer(serializers.Serializer):
+    """One bucket of the trends response."""
+
+    inicio = serializers.DateField()
+    ingresos = serializers.DecimalField(max_digits=14, decimal_places=2)
+    gastos = serializers.DecimalField(max_digits=14, decimal_places=2)
+    saldo = serializers.DecimalField(max_digits=14, decimal_places=2)
+    partidas = GastoPartidaSerializer(many=True, source="gastos_por_partida")
+
+
+class TotalesResumenSerializer(serializers.Serializer):
+    """Scalar part of the dashboard summary, shared with the bootstrap endpoint."""
 
     total_ingresos = serializers.DecimalField(max_digits=12, decimal_places=2)
     total_gastos = serializers.DecimalField(max_digits=12, decimal_places=2)
@@ -151,6 +347,11 @@ class ResumenFinancieroSerializer(serializers.Serializer):
     gastos_por_categoria = serializers.DictField(
         child=serializers.DecimalField(max_digits=12, decimal_places=2)
     )
+
+
+class ResumenFinancieroSerializer(TotalesResumenSerializer):
+    """Serializer that structures the dashboard summary response."""
+
     partidas = PartidaSerializer(many=True)
     sugerencias = serializers.ListField(child=serializers.CharField())
     ingresos_recientes = IngresoSerializer(many=True)
@@ -159,31 +360,27 @@ class ResumenFinancieroSerializer(serializers.Serializer):
     @staticmethod
     def build(
         *,
-        ingresos: list[Ingreso],
-        gastos: list[Gasto],
+        total_ingresos: Decimal,
+        total_gastos: Decimal,
+        gastos_por_categoria: dict[str, Decimal],
         partidas: list[Partida],
         sugerencias: list[str],
+        ingresos_recientes: list[Ingreso],
+        gastos_recientes: list[Gasto],
     ) -> dict:
-        total_ingresos = sum((ingreso.monto for ingreso in ingresos), Decimal("0.00"))
-        total_gastos = sum((gasto.monto for gasto in gastos), Decimal("0.00"))
         saldo = total_ingresos - total_gastos
         ahorro_porcentaje = Decimal("0.00")
         if total_ingresos > 0:
             ahorro_porcentaje = (saldo / total_ingresos * Decimal("100")).quantize(Decimal("0.01"))
 
-        categorias: dict[str, Decimal] = defaultdict(lambda: Decimal("0.00"))
-        for gasto in gastos:
-            key = gasto.partida.nombre if gasto.partida else (gasto.categoria or "Otros")
-            categorias[key] += gasto.monto
-
         return {
             "total_ingresos": total_ingresos,
             "total_gastos": total_gastos,
             "saldo": saldo,
             "ahorro_porcentaje": ahorro_porcentaje,
-            "gastos_por_categoria": dict(categorias),
+            "gastos_por_categoria": gastos_por_categoria,
             "partidas": partidas,
             "sugerencias": sugerencias,
-            "ingresos_recientes": ingresos[:5],
-            "gastos_recientes": gastos[:5],
+            "ingresos_recientes": ingresos_recientes,
+            "gastos_recientes": gastos_recientes,
         }
@@ -0,0 +1,136 @@
+"""Signal handlers that keep derived finance data in sync with the ledger."""
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from . import alertas, cache, resumenes, sincronizacion
+from .models import Alerta, Gasto, Importacion, Ingreso, Partida, Recurrencia, ReglaPartida
+
+_en_lote: ContextVar[bool] = ContextVar("finanzas_en_lote", default=False)
+
+
+@contextmanager
+def en_lote() -> Iterator[None]:
+    """Skip the per-row handlers; the caller updates derived data for the whole batch."""
+
+    token = _en_lote.set(True)
+    try:
+        yield
+    finally:
+        _en_lote.reset(token)
+
+
+@receiver(pre_save, sender=Gasto)
+@receiver(pre_save, sender=Ingreso)
+def capturar_estado_previo(sender, instance, raw=False, **kwargs):
+    """Remember the stored version of a movement so updates can be diffed."""
+
+    instance._resumen_previo = None
+    if raw or _en_lote.get() or instance._state.adding or instance.pk is None:
+        return
+    instance._resumen_previo = (
+        sender.objects.filter(pk=instance.pk).values(*resumenes.CAMPOS_MOVIMIENTO[sender]).first()
+    )
+
+
+@receiver(post_save, sender=Gasto)
+@receiver(post_save, sender=Ingreso)
+def actualizar_resumen_guardado(sender, instance, raw=False, **kwargs):
+    if raw or _en_lote.get():
+        return
+    deltas: dict = {}
+    previo = getattr(instance, "_resumen_previo", None)
+    if previo is not None:
+        resumenes.acumular(deltas, sender, previo, -1)
+    resumenes.acumular(deltas, sender, resumenes.valores_de(instance), 1)
+    resumenes.aplicar(deltas)
+    instance._resumen_previo = None
+
+
+@receiver(post_delete, sender=Gasto)
+@receiver(post_delete, sender=Ingreso)
+def actualizar_resumen_eliminado(sender, instance, **kwargs):
+    if _en_lote.get():
+        return
+    deltas: dict = {}
+    resumenes.acumular(deltas, sender, resumenes.valores_de(instance), -1)
+    resumenes.aplicar(deltas)
+
+
+@receiver(pre_delete, sender=Partida)
+def capturar_meses_partida(sender, instance, **kwargs):
+    """Record the months whose rollup changes once the partida's gastos are unlinked."""
+
+    instance._meses_resumen = list(Gasto.objects.filter(partida=instance).dates("fecha", "month"))
+
+
+@receiver(pre_delete, sender=Partida)
+def marcar_gastos_partida(sender, instance, **kwargs):
+    """Touch the partida's gastos: the delete unlinks them with an UPDATE that keeps ``updated_at``."""
+
+    Gasto.objects.filter(partida=instance).update(updated_at=timezone.now())
+
+
+@receiver(post_delete, sender=Partida)
+def reconstruir_meses_partida(sender, instance, **kwargs):
+    meses = getattr(instance, "_meses_resumen", None)
+    if meses:
+        resumenes.reconstruir(usuario_id=instance.usuario_id, meses=meses)
+
+
+@receiver(post_save, sender=Partida)
+def evaluar_alertas_partida(sender, instance, created=False, raw=False, **kwargs):
+    """Re-evaluate the alerts of a partida whose budget or threshold may have changed."""
+
+    if raw or created:
+        return
+    alertas.evaluar_partida(instance)
+
+
+@receiver(post_delete, sender=Gasto)
+@receiver(post_delete, sender=Ingreso)
+@receiver(post_delete, sender=Partida)
+def registrar_eliminacion(sender, instance, origin=None, **kwargs):
+    """Leave the tombstone read by the delta sync."""
+
+    if _en_lote.get() or sincronizacion.eliminado_por_usuario(origin):
+        return
+    sincronizacion.registrar_eliminados(sender, instance.usuario_id, [instance.pk])
+
+
+@receiver(post_save, sender=Gasto)
+@receiver(post_save, sender=Ingreso)
+@receiver(post_save, sender=Partida)
+@receiver(post_save, sender=Alerta)
+@receiver(post_delete, sender=Gasto)
+@receiver(post_delete, sender=Ingreso)
+@receiver(post_delete, sender=Partida)
+def invalidar_cache_usuario(sender, instance, raw=False, **kwargs):
+    """Drop the cached dashboard payloads of the owner of a changed row."""
+
+    if raw or _en_lote.get():
+        return
+    cache.invalidar_usuario_al_confirmar(instance.usuario_id)
+
+
+COLECCIONES = {ReglaPartida: "reglas", Recurrencia: "recurrencias", Importacion: "importaciones"}
+
+
+@receiver(post_save, sender=ReglaPartida)
+@receiver(post_save, sender=Recurrencia)
+@receiver(post_save, sender=Importacion)
+@receiver(post_delete, sender=ReglaPartida)
+@receiver(post_delete, sender=Recurrencia)
+@receiver(post_delete, sender=Importacion)
+def invalidar_coleccion_usuario(sender, instance, raw=False, **kwargs):
+    """Stale the ETags of the owner's collection of a changed rule, recurrence or import."""
+
+    if raw:
+        return
+    cache.invalidar_usuario_al_confirmar(instance.usuario_id, COLECCIONES[sender])
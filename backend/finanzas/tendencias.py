@@ -0,0 +1,127 @@
+"""Income and expense trends bucketed by week, month or year in the database.
+
+Monthly and yearly buckets are read from the :class:`ResumenMensual` rollup
+with a single grouped query. Weekly buckets do not line up with the rollup,
+so they are grouped with ``TruncWeek`` over the source tables instead.
+"""
+from __future__ import annotations
+
+import calendar
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db.models import F, Sum
+from django.db.models.functions import TruncWeek, TruncYear
+
+from .models import Gasto, Ingreso, ResumenMensual
+from .resumenes import CERO
+
+PERIODOS = ("semana", "mes", "anio")
+# Buckets built per request; longer ranges are rejected rather than filled in Python.
+MAXIMO_TRAMOS = {"semana": 262, "mes": 240, "anio": 100}
+# The bucket after the last one must still be a valid date.
+ULTIMA_FECHA = date(date.max.year - 1, 12, 31)
+
+
+@dataclass
+class Tramo:
+    """Totals of one bucket; ``partidas`` maps partida id (or ``None``) to spend."""
+
+    inicio: date
+    ingresos: Decimal = CERO
+    gastos: Decimal = CERO
+    partidas: dict[int | None, Decimal] = field(default_factory=dict)
+
+    @property
+    def saldo(self) -> Decimal:
+        return self.ingresos - self.gastos
+
+    @property
+    def gastos_por_partida(self) -> list[dict]:
+        return [{"partida": partida, "total": total} for partida, total in self.partidas.items()]
+
+
+def cantidad_tramos(periodo: str, desde: date, hasta: date) -> int:
+    """Return how many buckets cover ``desde``..``hasta``, without building them."""
+
+    if periodo == "semana":
+        return (hasta - (desde - timedelta(days=desde.weekday()))).days // 7 + 1
+    if periodo == "mes":
+        return (hasta.year - desde.year) * 12 + hasta.month - desde.month + 1
+    return hasta.year - desde.year + 1
+
+
+def ajustar_rango(periodo: str, desde: date, hasta: date) -> tuple[date, date]:
+    """Widen ``desde``/``hasta`` so the range covers whole buckets."""
+
+    if periodo == "semana":
+        return desde - timedelta(days=desde.weekday()), hasta + timedelta(days=6 - hasta.weekday())
+    if periodo == "mes":
+        return desde.replace(day=1), hasta.replace(day=calendar.monthrange(hasta.year, hasta.month)[1])
+    return desde.replace(month=1, day=1), hasta.replace(month=12, day=31)
+
+
+def _siguiente(periodo: str, inicio: date) -> date:
+    if periodo == "semana":
+        return inicio + timedelta(days=7)
+    if periodo == "mes":
+        return (inicio.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return inicio.replace(year=inicio.year + 1)
+
+
+def calcular(usuario_id: int, periodo: str, desde: date, hasta: date) -> list[Tramo]:
+    """Return one :class:`Tramo` per bucket between ``desde`` and ``hasta``, empty ones included."""
+
+    desde, hasta = ajustar_rango(periodo, desde, hasta)
+    tramos: dict[date, Tramo] = {}
+    inicio = desde
+    while inicio <= hasta:
+        tramos[inicio] = Tramo(inicio)
+        inicio = _siguiente(periodo, inicio)
+
+    if periodo == "semana":
+        _desde_movimientos(tramos, usuario_id, desde, hasta)
+    else:
+        _desde_resumen(tramos, usuario_id, periodo, desde, hasta)
+    for tramo in tramos.values():
+        tramo.partidas = {partida: total for partida, total in tramo.partidas.items() if total}
+    return list(tramos.values())
+
+
+def _desde_resumen(tramos: dict[date, Tramo], usuario_id: int, periodo: str, desde: date, hasta: date) -> None:
+    filas = (
+        ResumenMensual.objects.filter(usuario_id=usuario_id, mes__gte=desde, mes__lte=hasta)
+        .annotate(tramo=F("mes") if periodo == "mes" else TruncYear("mes"))
+        .values("tramo", "partida_id")
+        .annotate(gastos=Sum("total_gastos"), ingresos=Sum("total_ingresos"))
+        .order_by()
+    )
+    for fila in filas:
+        tramo = tramos[fila["tramo"]]
+        tramo.ingresos += fila["ingresos"]
+        tramo.gastos += fila["gastos"]
+        tramo.partidas[fila["partida_id"]] = tramo.partidas.get(fila["partida_id"], CERO) + fila["gastos"]
+
+
+def _desde_movimientos(tramos: dict[date, Tramo], usuario_id: int, desde: date, hasta: date) -> None:
+    gastos = (
+        Gasto.objects.filter(usuario_id=usuario_id, fecha__gte=desde, fecha__lte=hasta)
+        .annotate(tramo=TruncWeek("fecha"))
+        .values("tramo", "partida_id")
+        .annotate(total=Sum("monto"))
+        .order_by()
+    )
+    for fila in gastos:
+        tramo = tramos[fila["tramo"]]
+        tramo.gastos += fila["total"]
+        tramo.partidas[fila["partida_id"]] = tramo.partidas.get(fila["partida_id"], CERO) + fila["total"]
+    ingresos = (
+        Ingreso.objects.filter(usuario_id=usuario_id, fecha__gte=desde, fecha__lte=hasta)
+        .annotate(tramo=TruncWeek("fecha"))
+        .values("tramo")
+        .annotate(total=Sum("monto"))
+        .order_by()
+    )
+    for fila in ingresos:
+        tramos[fila["tramo"]].ingresos += fila["total"]
@@ -4,14 +4,40 @@ from __future__ import annotations
 from django.urls import include, path
 from rest_framework import routers
 
-from .views import GastoViewSet, IngresoViewSet, PartidaViewSet, ResumenFinancieroView
+from . import views_async
+from .views import (
+    AlertaViewSet,
+    ExportacionView,
+    GastoViewSet,
+    ImportacionViewSet,
+    InicioView,
+    IngresoViewSet,
+    PartidaViewSet,
+    RecurrenciaViewSet,
+    ReglaPartidaViewSet,
+    ResumenFinancieroView,
+    SincronizacionView,
+    TendenciasView,
+)
 
 router = routers.DefaultRouter()
 router.register(r"gastos", GastoViewSet, basename="gasto")
 router.register(r"ingresos", IngresoViewSet, basename="ingreso")
 router.register(r"partidas", PartidaViewSet, basename="partida")
+router.register(r"reglas-partida", ReglaPartidaViewSet, basename="regla-partida")
+router.register(r"recurrencias", RecurrenciaViewSet, basename="recurrencia")
+router.register(r"importaciones", ImportacionViewSet, basename="importacion")
+router.register(r"alertas", AlertaViewSet, basename="alerta")
 
 urlpatterns = [
     path("", include(router.urls)),
+    path("exportar/", ExportacionView.as_view(), name="exportar_movimientos"),
+    path("inicio/", InicioView.as_view(), name="inicio"),
     path("resumen/", ResumenFinancieroView.as_view(), name="resumen_financiero"),
+    path("sincronizar/", SincronizacionView.as_view(), name="sincronizar"),
+    path("tendencias/", TendenciasView.as_view(), name="tendencias"),
+    path("async/resumen/", views_async.resumen, name="async_resumen"),
+    path("async/gastos/", views_async.gastos, name="async_gastos"),
+    path("async/ingresos/", views_async.ingresos, name="async_ingresos"),
+    path("async/partidas/", views_async.partidas, name="async_partidas"),
 ]
@@ -2,27 +2,175 @@
 from __future__ import annotations
 
 import logging
-from decimal import Decimal
+from collections.abc import Callable
+from datetime import timedelta
+from typing import Any
 
+from django.conf import settings
+from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.functional import cached_property
 from rest_framework import permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Gasto, Ingreso, Partida
+from . import (
+    alertas,
+    cache,
+    exportacion,
+    importacion,
+    inicio,
+    listados,
+    lotes,
+    recurrencias,
+    resumenes,
+    sincronizacion,
+    tendencias,
+)
+from .models import Alerta, Gasto, Importacion, Ingreso, Partida, Recurrencia, ReglaPartida, rango_mes
+from .pagination import AlertaPagination, KeysetPagination
 from .serializers import (
+    AlertaSerializer,
     GastoSerializer,
+    ImportacionSerializer,
     IngresoSerializer,
     PartidaSerializer,
+    RecurrenciaSerializer,
+    ReglaPartidaSerializer,
     ResumenFinancieroSerializer,
+    TramoTendenciaSerializer,
 )
 
 
 logger = logging.getLogger(__name__)
 
 
-class BaseOwnerViewSet(viewsets.ModelViewSet):
+def campos_solicitados(request, serializer_class) -> list[str] | None:
+    """Return the fields kept by ``?fields``/``?omit`` on a read, or ``None`` without them."""
+
+    params = request.query_params
+    if request.method not in permissions.SAFE_METHODS or not ("fields" in params or "omit" in params):
+        return None
+    disponibles = list(serializer_class().fields)
+    seleccion = {}
+    for parametro in ("fields", "omit"):
+        seleccion[parametro] = {campo for campo in params.get(parametro, "").split(",") if campo}
+        desconocidos = seleccion[parametro] - set(disponibles)
+        if desconocidos:
+            raise ValidationError({parametro: f"Campos desconocidos: {', '.join(sorted(desconocidos))}."})
+    return [
+        campo
+        for campo in disponibles
+        if (not seleccion["fields"] or campo in seleccion["fields"]) and campo not in seleccion["omit"]
+    ]
+
+
+def solo_columnas(queryset, serializer_class, campos: list[str] | None, orden=()):
+    """Load only the columns read by ``campos``, plus the ``orden`` ones a keyset cursor needs."""
+
+    if campos is None:
+        return queryset
+    columnas = serializer_class(campos=campos).columnas()
+    if columnas is None:
+        return queryset
+    columnas.update(campo.lstrip("-") for campo in orden)
+    if not any("__" in columna for columna in columnas):
+        queryset = queryset.select_related(None)
+    return queryset.only(*columnas)
+
+
+class CamposMixin:
+    """Sparse fieldsets on reads: ``?fields=a,b`` keeps and ``?omit=c`` drops fields.
+
+    The serializer only builds the selected fields, so method fields that are
+    not requested never run, and the queryset loads just the columns they read.
+    """
+
+    @cached_property
+    def campos(self) -> list[str] | None:
+        return campos_solicitados(self.request, self.get_serializer_class())
+
+    def get_serializer(self, *args, **kwargs):
+        if self.campos is not None:
+            kwargs.setdefault("campos", self.campos)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        # The pagination reads its ordering columns to build the cursor.
+        orden = getattr(self.pagination_class, "ordering", ())
+        return solo_columnas(queryset, self.get_serializer_class(), self.campos, orden)
+
+
+class ListaRapidaMixin:
+    """Serve ``list`` from ``values_list()`` rows through :mod:`finanzas.listados` when possible."""
+
+    def list(self, request, *args, **kwargs):
+        if listados.lector(self.get_serializer_class(), self.campos) is None:
+            return super().list(request, *args, **kwargs)
+        data = listados.listar(
+            request,
+            self.filter_queryset(self.get_queryset()),
+            self.get_serializer_class(),
+            paginador=self.paginator,
+            campos=self.campos,
+        )
+        return Response(data)
+
+
+def encabezados_condicionales(request, nombre: str, coleccion: str | None, tipo: str) -> dict[str, str]:
+    """``ETag`` and ``Cache-Control`` of a read of ``nombre`` rendered as ``tipo``."""
+
+    version = cache.version_usuario(request.user.pk, coleccion)
+    return {
+        "ETag": cache.etag(
+            nombre,
+            request.user.pk,
+            version,
+            # Partidas report the spend of the current month.
+            timezone.localdate().strftime("%Y-%m"),
+            tipo,
+            request.get_full_path(),
+        ),
+        "Cache-Control": "private, no-cache",
+    }
+
+
+class CondicionalMixin:
+    """``ETag`` and ``If-None-Match`` on list and retrieve.
+
+    The ETag is derived from the owner's data version kept in
+    :mod:`finanzas.cache` (``coleccion`` selects which one), so a matching
+    request is answered with a 304 before the queryset is built.
+    """
+
+    coleccion: str | None = None
+
+    def _condicional(self, request, responder):
+        encabezados = encabezados_condicionales(request, self.basename, self.coleccion, request.accepted_media_type)
+        if cache.etag_coincide(request, encabezados["ETag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=encabezados)
+        respuesta = responder()
+        if respuesta.status_code == status.HTTP_200_OK:
+            for encabezado, valor in encabezados.items():
+                respuesta[encabezado] = valor
+        return respuesta
+
+    def list(self, request, *args, **kwargs):
+        listar = super().list
+        return self._condicional(request, lambda: listar(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        obtener = super().retrieve
+        return self._condicional(request, lambda: obtener(request, *args, **kwargs))
+
+
+class BaseOwnerViewSet(CondicionalMixin, ListaRapidaMixin, CamposMixin, viewsets.ModelViewSet):
     """Base viewset that restricts access to the authenticated user's records."""
 
     permission_classes = [permissions.IsAuthenticated]
@@ -38,137 +186,373 @@ class BaseOwnerViewSet(viewsets.ModelViewSet):
         serializer.save(usuario=self.request.user)
 
 
+class LoteMixin:
+    """Adds ``/lote/`` to create (POST), update (PATCH) or delete (DELETE) many rows at once."""
+
+    @action(detail=False, methods=["post", "patch", "delete"], url_path="lote")
+    def lote(self, request):
+        filas = request.data
+        if not isinstance(filas, list):
+            raise ValidationError({"detail": "Se esperaba una lista."})
+        maximo = getattr(settings, "FINANZAS_LOTE_MAXIMO", 5000)
+        if len(filas) > maximo:
+            raise ValidationError({"detail": f"El lote admite como máximo {maximo} filas."})
+
+        modelo = self.queryset.model
+        try:
+            if request.method == "DELETE":
+                eliminados = lotes.eliminar(modelo, filas, request.user)
+                return Response({"eliminados": eliminados}, status=status.HTTP_200_OK)
+            if request.method == "PATCH":
+                objetos = lotes.actualizar(modelo, filas, request.user, request)
+                return Response(self.get_serializer(objetos, many=True).data, status=status.HTTP_200_OK)
+            objetos = lotes.crear(modelo, filas, request.user, request)
+        except lotes.ErrorLote as error:
+            return Response({"errores": error.errores}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(objetos, many=True).data, status=status.HTTP_201_CREATED)
+
+
 class PartidaViewSet(BaseOwnerViewSet):
     """CRUD for budget categories."""
 
     serializer_class = PartidaSerializer
     queryset = Partida.objects.all()
 
+    def get_queryset(self):  # type: ignore[override]
+        queryset = super().get_queryset()
+        if self.campos is None or {"gastado_mes", "disponible_mes"} & set(self.campos):
+            queryset = queryset.con_gasto_mes()
+        return queryset
+
     def get_serializer_context(self):  # type: ignore[override]
         context = super().get_serializer_context()
         context["request"] = self.request
         return context
 
 
-class GastoViewSet(BaseOwnerViewSet):
+def filtrar_por_fecha(queryset, params):
+    """Apply the ``desde``/``hasta`` query parameters of the ledger lists."""
+
+    fecha_desde = params.get("desde")
+    fecha_hasta = params.get("hasta")
+    if fecha_desde:
+        queryset = queryset.filter(fecha__gte=fecha_desde)
+    if fecha_hasta:
+        queryset = queryset.filter(fecha__lte=fecha_hasta)
+    return queryset
+
+
+def filtrar_gastos(queryset, params):
+    """Apply the date range and ``partida`` query parameters of the expense list."""
+
+    queryset = filtrar_por_fecha(queryset, params)
+    partida_id = params.get("partida")
+    if partida_id:
+        queryset = queryset.filter(Q(partida_id=partida_id) | Q(partida__isnull=True))
+    return queryset
+
+
+class GastoViewSet(LoteMixin, BaseOwnerViewSet):
     """CRUD for expenses."""
 
     serializer_class = GastoSerializer
     queryset = Gasto.objects.select_related("partida")
+    pagination_class = KeysetPagination
 
     def get_queryset(self):  # type: ignore[override]
-        queryset = super().get_queryset().select_related("partida")
-        fecha_desde = self.request.query_params.get("desde")
-        fecha_hasta = self.request.query_params.get("hasta")
-        if fecha_desde:
-            queryset = queryset.filter(fecha__gte=fecha_desde)
-        if fecha_hasta:
-            queryset = queryset.filter(fecha__lte=fecha_hasta)
-        partida_id = self.request.query_params.get("partida")
-        if partida_id:
-            queryset = queryset.filter(Q(partida_id=partida_id) | Q(partida__isnull=True))
-        return queryset
+        return filtrar_gastos(super().get_queryset().select_related("partida"), self.request.query_params)
 
 
-class IngresoViewSet(BaseOwnerViewSet):
+class IngresoViewSet(LoteMixin, BaseOwnerViewSet):
     """CRUD for incomes."""
 
     serializer_class = IngresoSerializer
     queryset = Ingreso.objects.all()
+    pagination_class = KeysetPagination
+
+    def get_queryset(self):  # type: ignore[override]
+        return filtrar_por_fecha(super().get_queryset(), self.request.query_params)
+
+
+class ReglaPartidaViewSet(BaseOwnerViewSet):
+    """CRUD for the rules used to assign imported expenses to partidas."""
+
+    serializer_class = ReglaPartidaSerializer
+    queryset = ReglaPartida.objects.select_related("partida")
+    coleccion = "reglas"
+
+
+class RecurrenciaViewSet(BaseOwnerViewSet):
+    """CRUD for recurring expenses and incomes generated by ``generar_recurrencias``."""
+
+    serializer_class = RecurrenciaSerializer
+    queryset = Recurrencia.objects.all()
+    coleccion = "recurrencias"
+
+    def perform_update(self, serializer):  # type: ignore[override]
+        instancia = serializer.instance
+        datos = serializer.validated_data
+        calendario = {campo: datos.get(campo, getattr(instancia, campo)) for campo in recurrencias.CAMPOS_CALENDARIO}
+        extra = {}
+        if any(valor != getattr(instancia, campo) for campo, valor in calendario.items()):
+            extra["proxima_fecha"] = recurrencias.reprogramar(
+                Recurrencia(pk=instancia.pk, movimiento=instancia.movimiento, **calendario)
+            )
+        serializer.save(usuario=self.request.user, **extra)
+
+
+class ImportacionViewSet(BaseOwnerViewSet):
+    """Upload bank statements and follow their processing status."""
+
+    serializer_class = ImportacionSerializer
+    queryset = Importacion.objects.all()
+    coleccion = "importaciones"
+    http_method_names = ["get", "post", "head", "options"]
+
+    def perform_create(self, serializer):  # type: ignore[override]
+        archivo = serializer.validated_data.pop("archivo")
+        trabajo = serializer.save(usuario=self.request.user, nombre_archivo=archivo.name[:255])
+        with importacion.ruta_archivo(trabajo).open("wb") as destino:
+            for fragmento in archivo.chunks():
+                destino.write(fragmento)
+        transaction.on_commit(lambda: importacion.encolar(trabajo))
+
+    def create(self, request, *args, **kwargs):  # type: ignore[override]
+        response = super().create(request, *args, **kwargs)
+        response.status_code = status.HTTP_202_ACCEPTED
+        return response
+
+
+class AlertaViewSet(BaseOwnerViewSet):
+    """Budget alerts raised by :mod:`finanzas.alertas`; they can only be marked as read.
+
+    ``?activas=1`` (or ``0``) filters by state and ``?mes=AAAA-MM`` by month.
+    """
+
+    serializer_class = AlertaSerializer
+    queryset = Alerta.objects.select_related("partida")
+    pagination_class = AlertaPagination
+    http_method_names = ["get", "patch", "head", "options"]
 
     def get_queryset(self):  # type: ignore[override]
         queryset = super().get_queryset()
-        fecha_desde = self.request.query_params.get("desde")
-        fecha_hasta = self.request.query_params.get("hasta")
-        if fecha_desde:
-            queryset = queryset.filter(fecha__gte=fecha_desde)
-        if fecha_hasta:
-            queryset = queryset.filter(fecha__lte=fecha_hasta)
+        params = self.request.query_params
+        activas = params.get("activas")
+        if activas is not None:
+            if activas not in ("0", "1"):
+                raise ValidationError({"activas": "Usa 1 o 0."})
+            queryset = queryset.filter(activa=activas == "1")
+        valor = params.get("mes")
+        if valor:
+            try:
+                mes = parse_date(f"{valor}-01")
+            except ValueError:
+                mes = None
+            if mes is None:
+                raise ValidationError({"mes": "Mes inválido, usa AAAA-MM."})
+            queryset = queryset.filter(mes=mes)
         return queryset
 
 
+class ExportacionView(APIView):
+    """Stream the user's gastos and ingresos as a CSV or XLSX download."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        formato = request.query_params.get("formato", "csv")
+        if formato not in exportacion.CONTENT_TYPES:
+            raise ValidationError({"formato": "Usa csv o xlsx."})
+        fechas = {}
+        for parametro in ("desde", "hasta"):
+            valor = request.query_params.get(parametro)
+            fechas[parametro] = parse_date(valor) if valor else None
+            if valor and fechas[parametro] is None:
+                raise ValidationError({parametro: "Fecha inválida, usa AAAA-MM-DD."})
+
+        respuesta = StreamingHttpResponse(
+            exportacion.generar(formato, request.user, fechas["desde"], fechas["hasta"]),
+            content_type=exportacion.CONTENT_TYPES[formato],
+        )
+        respuesta["Content-Disposition"] = f'attachment; filename="movimientos.{formato}"'
+        respuesta["Cache-Control"] = "private, no-store"
+        return respuesta
+
+
+class TendenciasView(APIView):
+    """Return income, expenses and spend per partida bucketed by week, month or year."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        periodo = request.query_params.get("periodo", "mes")
+        if periodo not in tendencias.PERIODOS:
+            raise ValidationError({"periodo": "Usa semana, mes o anio."})
+        fechas = {}
+        for parametro in ("desde", "hasta"):
+            valor = request.query_params.get(parametro)
+            fechas[parametro] = parse_date(valor) if valor else None
+            if valor and fechas[parametro] is None:
+                raise ValidationError({parametro: "Fecha inválida, usa AAAA-MM-DD."})
+        hasta = fechas["hasta"] or timezone.localdate()
+        desde = fechas["desde"] or hasta - timedelta(days=365)
+        if desde > hasta:
+            raise ValidationError({"desde": "Debe ser anterior a hasta."})
+        if hasta > tendencias.ULTIMA_FECHA:
+            raise ValidationError({"hasta": f"Debe ser anterior a {tendencias.ULTIMA_FECHA.isoformat()}."})
+        maximo = tendencias.MAXIMO_TRAMOS[periodo]
+        if tendencias.cantidad_tramos(periodo, desde, hasta) > maximo:
+            raise ValidationError({"desde": f"El rango admite como máximo {maximo} tramos por {periodo}."})
+        desde, hasta = tendencias.ajustar_rango(periodo, desde, hasta)
+
+        version = cache.version_usuario(request.user.pk)
+        encabezados = {
+            "ETag": cache.etag("tendencias", request.user.pk, periodo, desde, hasta, version),
+            "Cache-Control": "private, no-cache",
+        }
+        if cache.etag_coincide(request, encabezados["ETag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=encabezados)
+
+        clave = cache.clave_tendencias(request.user.pk, periodo, desde, hasta, version)
+        data = cache.obtener(clave)
+        if data is None:
+            tramos = tendencias.calcular(request.user.pk, periodo, desde, hasta)
+            data = {
+                "periodo": periodo,
+                "desde": desde.isoformat(),
+                "hasta": hasta.isoformat(),
+                "resultados": TramoTendenciaSerializer(tramos, many=True).data,
+            }
+            cache.guardar(clave, data)
+        return Response(data, status=status.HTTP_200_OK, headers=encabezados)
+
+
+class InicioView(APIView):
+    """Return the profile, partidas, movements and summary of a month in a single response."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        valor = request.query_params.get("mes")
+        try:
+            mes = parse_date(f"{valor}-01") if valor else timezone.localdate()
+        except ValueError:
+            mes = None
+        if mes is None:
+            raise ValidationError({"mes": "Mes inválido, usa AAAA-MM."})
+        incluir = request.query_params.get("incluir")
+        secciones = [seccion for seccion in inicio.SECCIONES if not incluir or seccion in incluir.split(",")]
+        if not secciones:
+            raise ValidationError({"incluir": f"Usa {', '.join(inicio.SECCIONES)}."})
+
+        usuario = request.user
+        perfil = (usuario.username, usuario.email, usuario.first_name, usuario.last_name) if "usuario" in secciones else ()
+        version = cache.version_usuario(usuario.pk)
+        encabezados = {
+            "ETag": cache.etag("inicio", usuario.pk, mes.strftime("%Y-%m"), ",".join(secciones), version, *perfil),
+            "Cache-Control": "private, no-cache",
+        }
+        if cache.etag_coincide(request, encabezados["ETag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=encabezados)
+        return Response(inicio.construir(request, mes, secciones), status=status.HTTP_200_OK, headers=encabezados)
+
+
+class SincronizacionView(APIView):
+    """Return the gastos, ingresos and partidas changed or deleted since a sync token."""
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        token = request.query_params.get("token")
+        desde = None
+        if token:
+            try:
+                desde = sincronizacion.decodificar_token(token)
+            except ValueError as error:
+                raise ValidationError({"token": str(error)})
+        respuesta = Response(sincronizacion.calcular(request, desde), status=status.HTTP_200_OK)
+        respuesta["Cache-Control"] = "private, no-store"
+        return respuesta
+
+
 class ResumenFinancieroView(APIView):
     """Return key metrics and suggestions for the dashboard."""
 
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        hoy = timezone.localdate()
-        inicio_mes = hoy.replace(day=1)
-        if inicio_mes.month == 12:
-            siguiente_mes = inicio_mes.replace(year=inicio_mes.year + 1, month=1)
-        else:
-            siguiente_mes = inicio_mes.replace(month=inicio_mes.month + 1)
-
-        gastos = list(
+        inicio_mes, siguiente_mes = rango_mes(timezone.localdate())
+        mes = inicio_mes.strftime("%Y-%m")
+        version = cache.version_usuario(request.user.pk)
+        encabezados = {
+            "ETag": cache.etag("resumen", request.user.pk, mes, version),
+            "Cache-Control": "private, no-cache",
+        }
+        if cache.etag_coincide(request, encabezados["ETag"]):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=encabezados)
+
+        clave = cache.clave_resumen(request.user.pk, mes, version)
+        data = cache.obtener(clave)
+        if data is None:
+            data = self._construir(request, inicio_mes, siguiente_mes)
+            if data is None:
+                return Response(
+                    {"detail": "No fue posible generar el resumen financiero."},
+                    status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                )
+            cache.guardar(clave, data)
+        return Response(data, status=status.HTTP_200_OK, headers=encabezados)
+
+    def _construir(self, request, inicio_mes, siguiente_mes) -> dict | None:
+        consultas = consultas_resumen(request.user, inicio_mes, siguiente_mes)
+        return armar_resumen(request, **{nombre: consulta() for nombre, consulta in consultas.items()})
+
+
+def consultas_resumen(usuario, inicio_mes, siguiente_mes) -> dict[str, Callable[[], Any]]:
+    """Return the independent queries of the dashboard summary, keyed by name.
+
+    The async view runs them concurrently; the sync view one after the other.
+    """
+
+    return {
+        "totales": lambda: resumenes.totales_mes(usuario.pk, inicio_mes),
+        "gastos_recientes": lambda: list(
             Gasto.objects.filter(
-                usuario=request.user,
+                usuario=usuario,
                 fecha__gte=inicio_mes,
                 fecha__lt=siguiente_mes,
-            ).select_related("partida")
-        )
-        ingresos = list(
+            ).select_related("partida")[:5]
+        ),
+        "ingresos_recientes": lambda: list(
             Ingreso.objects.filter(
-                usuario=request.user,
+                usuario=usuario,
                 fecha__gte=inicio_mes,
                 fecha__lt=siguiente_mes,
-            )
-        )
-        partidas = list(Partida.objects.filter(usuario=request.user))
-
-        sugerencias: list[str] = []
-        total_ingresos = sum((ingreso.monto for ingreso in ingresos), Decimal("0.00"))
-        total_gastos = sum((gasto.monto for gasto in gastos), Decimal("0.00"))
-        saldo = total_ingresos - total_gastos
-
-        if total_ingresos > 0:
-            porcentaje_uso = (total_gastos / total_ingresos * Decimal("100")).quantize(Decimal("0.01"))
-            if porcentaje_uso <= Decimal("85"):
-                sugerencias.append(
-                    "Vas administrando bien tu dinero. Considera destinar parte del excedente a un fondo de inversión."
-                )
-            elif porcentaje_uso > Decimal("100"):
-                sugerencias.append(
-                    "Has gastado más de lo que ingresó este mes. Revisa tus gastos variables para realizar ajustes."
-                )
-        else:
-            sugerencias.append("Aún no registras ingresos este mes. Recuerda ingresarlos para obtener un balance realista.")
-
-        if saldo > Decimal("0"):
-            sugerencias.append(
-                "Excelente, tienes un saldo positivo. Define un objetivo de ahorro para mantener esta tendencia."
-            )
-        elif saldo < Decimal("0"):
-            sugerencias.append(
-                "Tu saldo es negativo. Intenta posponer compras no esenciales para equilibrar tus finanzas."
-            )
-
-        for partida in partidas:
-            disponible = partida.disponible_mes()
-            if disponible < Decimal("0"):
-                sugerencias.append(
-                    f"Has superado el presupuesto de {partida.nombre} en ${abs(disponible):,.2f}. Considera reducir gastos en esta categoría."
-                )
-            elif disponible <= partida.monto_asignado * Decimal("0.1"):
-                sugerencias.append(
-                    f"Estás por alcanzar el límite de {partida.nombre}. Monitorea tus próximos gastos en esta partida."
-                )
-
-        try:
-            resumen_payload = ResumenFinancieroSerializer.build(
-                ingresos=ingresos,
-                gastos=gastos,
-                partidas=partidas,
-                sugerencias=sugerencias,
-            )
-        except Exception:  # pragma: no cover - defensive logging branch
-            logger.exception("Error al construir el resumen financiero", extra={"user_id": request.user.id})
-            return Response(
-                {"detail": "No fue posible generar el resumen financiero."},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            )
-
-        serializer = ResumenFinancieroSerializer(
-            resumen_payload, context={"request": request}
+            )[:5]
+        ),
+        "partidas": lambda: list(Partida.objects.filter(usuario=usuario).con_gasto_mes()),
+        "alertas_mes": lambda: list(alertas.activas(usuario.pk, inicio_mes)),
+    }
+
+
+def armar_resumen(request, *, totales, gastos_recientes, ingresos_recientes, partidas, alertas_mes) -> dict | None:
+    """Build the summary payload from the results of :func:`consultas_resumen`."""
+
+    try:
+        resumen_payload = ResumenFinancieroSerializer.build(
+            total_ingresos=totales.total_ingresos,
+            total_gastos=totales.total_gastos,
+            gastos_por_categoria=totales.gastos_por_categoria,
+            partidas=partidas,
+            sugerencias=resumenes.sugerencias(totales, alertas_mes),
+            ingresos_recientes=ingresos_recientes,
+            gastos_recientes=gastos_recientes,
         )
-        return Response(serializer.data, status=status.HTTP_200_OK)
+    except Exception:  # pragma: no cover - defensive logging branch
+        logger.exception("Error al construir el resumen financiero", extra={"user_id": request.user.id})
+        return None
+
+    serializer = ResumenFinancieroSerializer(
+        resumen_payload, context={"request": request}
+    )
+    return serializer.data
@@ -0,0 +1,152 @@
+"""Async, read-only variants of the dashboard and ledger list endpoints.
+
+Mounted under ``/api/v1/async/`` and meant for the ASGI deployment
+(``uvicorn core.asgi:application``): while a request waits on the database
+the event loop keeps serving others instead of pinning a worker thread.
+
+Django's async ORM funnels every query through the single thread-sensitive
+executor, so awaiting several querysets with ``asyncio.gather`` would still
+run them one after the other. The independent queries are therefore run
+with ``sync_to_async(thread_sensitive=False)``: each one in a pool thread
+with its own database connection, which is released afterwards according
+to ``CONN_MAX_AGE`` or returned to the pool (``DB_POOL``, see
+:mod:`core.basedatos`).
+
+Responses, authentication, throttling and pagination match the sync DRF views.
+"""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from functools import partial, wraps
+from typing import Any
+
+from django.http import HttpResponse
+from django.utils import timezone
+from rest_framework import exceptions
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from core import throttling
+from core.asincronia import en_hilo, respuesta_json
+
+from . import cache, listados
+from .models import Gasto, Ingreso, Partida, rango_mes
+from .pagination import KeysetPagination
+from .serializers import GastoSerializer, IngresoSerializer, PartidaSerializer
+from .views import (
+    armar_resumen,
+    campos_solicitados,
+    consultas_resumen,
+    encabezados_condicionales,
+    filtrar_gastos,
+    filtrar_por_fecha,
+    solo_columnas,
+)
+
+
+async def concurrente(consultas: dict[str, Callable[[], Any]]) -> dict[str, Any]:
+    """Run the independent ``consultas`` at the same time and return their results by name."""
+
+    resultados = await asyncio.gather(*(en_hilo(consulta) for consulta in consultas.values()))
+    return dict(zip(consultas, resultados))
+
+
+def _autenticar(drf_request: Request):
+    autenticadores = [clase() for clase in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    for autenticador in autenticadores:
+        resultado = autenticador.authenticate(drf_request)
+        if resultado is not None:
+            return resultado[0]
+    raise exceptions.NotAuthenticated()
+
+
+def vista_async(vista: Callable[[Request, Any], Awaitable[HttpResponse]]):
+    """Turn ``vista(drf_request, usuario)`` into an authenticated async GET view."""
+
+    @wraps(vista)
+    async def _vista(request, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return respuesta_json({"detail": f'Método "{request.method}" no permitido.'}, status=405, headers={"Allow": "GET"})
+        drf_request = Request(request)
+        try:
+            drf_request.user = await en_hilo(_autenticar, drf_request)
+            espera = await en_hilo(throttling.rechazo, drf_request)
+            if espera is not None:
+                raise exceptions.Throttled(wait=espera)
+            return await vista(drf_request, drf_request.user, *args, **kwargs)
+        except exceptions.APIException as error:
+            headers = {}
+            if isinstance(error, (exceptions.NotAuthenticated, exceptions.AuthenticationFailed)):
+                headers["WWW-Authenticate"] = 'Bearer realm="api"'
+            if isinstance(error, exceptions.Throttled) and error.wait is not None:
+                headers["Retry-After"] = str(int(error.wait))
+            return respuesta_json({"detail": error.detail}, status=error.status_code, headers=headers)
+
+    return _vista
+
+
+@vista_async
+async def resumen(drf_request: Request, usuario) -> HttpResponse:
+    inicio_mes, siguiente_mes = rango_mes(timezone.localdate())
+    mes = inicio_mes.strftime("%Y-%m")
+    version = await en_hilo(cache.version_usuario, usuario.pk)
+    encabezados = {
+        "ETag": cache.etag("resumen", usuario.pk, mes, version),
+        "Cache-Control": "private, no-cache",
+    }
+    if cache.etag_coincide(drf_request, encabezados["ETag"]):
+        return respuesta_json(None, status=304, headers=encabezados)
+
+    clave = cache.clave_resumen(usuario.pk, mes, version)
+    data = await en_hilo(cache.obtener, clave)
+    if data is None:
+        datos = await concurrente(consultas_resumen(usuario, inicio_mes, siguiente_mes))
+        data = await en_hilo(partial(armar_resumen, drf_request, **datos))
+        if data is None:
+            return respuesta_json({"detail": "No fue posible generar el resumen financiero."}, status=500)
+        await en_hilo(cache.guardar, clave, data)
+    return respuesta_json(data, headers=encabezados)
+
+
+def _listar(drf_request: Request, queryset, serializer_class, paginar: bool) -> dict | list:
+    paginador = KeysetPagination() if paginar else None
+    campos = campos_solicitados(drf_request, serializer_class)
+    queryset = solo_columnas(queryset, serializer_class, campos, getattr(paginador, "ordering", ()))
+    data = listados.listar(drf_request, queryset, serializer_class, paginador=paginador, campos=campos)
+    if data is not None:
+        return data
+    contexto = {"request": drf_request}
+    if paginador is not None:
+        pagina = paginador.paginate_queryset(queryset, drf_request)
+        if pagina is not None:
+            serializer = serializer_class(pagina, many=True, context=contexto, campos=campos)
+            return paginador.get_paginated_response(serializer.data).data
+    return serializer_class(queryset, many=True, context=contexto, campos=campos).data
+
+
+async def _lista_condicional(drf_request: Request, nombre: str, queryset, serializer_class, paginar: bool):
+    # Same ETag inputs as ``CondicionalMixin``; these views only render JSON.
+    encabezados = await en_hilo(encabezados_condicionales, drf_request, nombre, None, "application/json")
+    if cache.etag_coincide(drf_request, encabezados["ETag"]):
+        return respuesta_json(None, status=304, headers=encabezados)
+    data = await en_hilo(_listar, drf_request, queryset, serializer_class, paginar)
+    return respuesta_json(data, headers=encabezados)
+
+
+@vista_async
+async def gastos(drf_request: Request, usuario) -> HttpResponse:
+    queryset = filtrar_gastos(Gasto.objects.filter(usuario=usuario).select_related("partida"), drf_request.query_params)
+    return await _lista_condicional(drf_request, "gasto", queryset, GastoSerializer, True)
+
+
+@vista_async
+async def ingresos(drf_request: Request, usuario) -> HttpResponse:
+    queryset = filtrar_por_fecha(Ingreso.objects.filter(usuario=usuario), drf_request.query_params)
+    return await _lista_condicional(drf_request, "ingreso", queryset, IngresoSerializer, True)
+
+
+@vista_async
+async def partidas(drf_request: Request, usuario) -> HttpResponse:
+    queryset = Partida.objects.filter(usuario=usuario).con_gasto_mes()
+    return await _lista_condicional(drf_request, "partida", queryset, PartidaSerializer, False)
@@ -0,0 +1,23 @@
+"""gunicorn settings: ``gunicorn core.wsgi -c gunicorn.conf.py``."""
+import os
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("GUNICORN_WORKERS", "2"))
+
+
+def on_starting(server):
+    # Samples left by a previous run would be added to the new ones.
+    directorio = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directorio:
+        os.makedirs(directorio, exist_ok=True)
+        for nombre in os.listdir(directorio):
+            if nombre.endswith(".db"):
+                os.remove(os.path.join(directorio, nombre))
+
+
+def child_exit(server, worker):
+    # Drop the metric files of dead workers so /metrics does not count them twice.
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,36 @@
+import copy
+
+import pytest
+from django.core.cache import cache
+from django.db import connections
+
+from accounts import credenciales
+from core import throttling
+
+REPLICA = "replica_prueba"
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix):
+    """Add a second, independent test database that stands in for a read replica.
+
+    Only tests that list it in ``django_db(databases=...)`` may touch it; see
+    ``test_replicas``.
+    """
+
+    replica = copy.deepcopy(connections.settings["default"])
+    sqlite = replica["ENGINE"] == "django.db.backends.sqlite3"
+    replica["TEST"] = {**replica["TEST"], "NAME": None if sqlite else f"test_{replica['NAME']}_replica"}
+    connections.settings[REPLICA] = replica
+
+
+@pytest.fixture(autouse=True)
+def limpiar_cache():
+    """Cached payloads and rate counters are keyed by user id or IP, which tests reuse."""
+
+    cache.clear()
+    credenciales.limpiar()
+    throttling.reiniciar()
+    yield
+    cache.clear()
+    credenciales.limpiar()
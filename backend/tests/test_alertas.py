@@ -0,0 +1,135 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas import alertas, resumenes
+from finanzas.models import Alerta, Gasto, Partida
+
+
+@pytest.fixture
+def usuario():
+    return get_user_model().objects.create_user(username="alertado", password="secret")
+
+
+@pytest.fixture
+def cliente(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+def _estado(partida):
+    return sorted(Alerta.objects.filter(partida=partida).values_list("tipo", "activa", "leida"))
+
+
+@pytest.mark.django_db
+def test_gasto_writes_raise_and_clear_alerts(usuario):
+    hoy = timezone.localdate()
+    partida = Partida.objects.create(usuario=usuario, nombre="Ocio", monto_asignado=Decimal("100.00"))
+    Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("50.00"), fecha=hoy)
+    assert _estado(partida) == []
+
+    cerca = Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("40.00"), fecha=hoy)
+    assert _estado(partida) == [("aviso", True, False)]
+
+    Alerta.objects.filter(partida=partida).update(leida=True)
+    cerca.monto = Decimal("60.00")
+    cerca.save()
+    alerta = Alerta.objects.get(partida=partida, tipo="excedido")
+    assert (alerta.gastado, alerta.asignado, alerta.porcentaje) == (Decimal("110.00"), Decimal("100.00"), Decimal("110.00"))
+    assert _estado(partida) == [("aviso", False, True), ("excedido", True, False)]
+
+    cerca.delete()
+    assert _estado(partida) == [("aviso", False, True), ("excedido", False, False)]
+    Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("45.00"), fecha=hoy)
+    # Crossing the threshold again raises the alert as unread.
+    assert _estado(partida) == [("aviso", True, False), ("excedido", False, False)]
+
+
+@pytest.mark.django_db
+def test_unchanged_partidas_cost_one_query(usuario):
+    hoy = timezone.localdate()
+    partida = Partida.objects.create(usuario=usuario, nombre="Ocio", monto_asignado=Decimal("100.00"))
+    Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("95.00"), fecha=hoy)
+    tranquila = Partida.objects.create(usuario=usuario, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    Gasto.objects.create(usuario=usuario, partida=tranquila, monto=Decimal("5.00"), fecha=hoy)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert alertas.evaluar({(partida.pk, hoy.replace(day=1)), (tranquila.pk, hoy.replace(day=1))}) == 0
+    assert len(queries) == 1
+    assert _estado(partida) == [("aviso", True, False)]
+
+
+@pytest.mark.django_db
+def test_thresholds_are_configurable(settings, usuario):
+    settings.ALERTAS_UMBRAL_AVISO = 50
+    hoy = timezone.localdate()
+    global_ = Partida.objects.create(usuario=usuario, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    propia = Partida.objects.create(usuario=usuario, nombre="Viajes", monto_asignado=Decimal("100.00"), umbral_aviso=80)
+    for partida in (global_, propia):
+        Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("60.00"), fecha=hoy)
+
+    assert _estado(global_) == [("aviso", True, False)]
+    assert _estado(propia) == []
+
+    propia.umbral_aviso = 60
+    propia.save()
+    assert _estado(propia) == [("aviso", True, False)]
+    propia.monto_asignado = Decimal("50.00")
+    propia.save()
+    assert _estado(propia) == [("aviso", False, False), ("excedido", True, False)]
+
+
+@pytest.mark.django_db
+def test_batches_and_rebuilds_evaluate_alerts(usuario, cliente):
+    hoy = timezone.localdate()
+    partida = Partida.objects.create(usuario=usuario, nombre="Super", monto_asignado=Decimal("100.00"))
+    filas = [{"partida": partida.pk, "monto": "30.00", "fecha": str(hoy), "tipo": "variable"} for _ in range(4)]
+    assert cliente.post("/api/v1/gastos/lote/", filas, format="json").status_code == 201
+    assert _estado(partida) == [("excedido", True, False)]
+
+    Alerta.objects.all().delete()
+    resumenes.reconstruir(usuario_id=usuario.pk)
+    assert _estado(partida) == [("excedido", True, False)]
+
+
+@pytest.mark.django_db
+def test_alerts_endpoint_and_summary(usuario, cliente):
+    hoy = timezone.localdate()
+    mes_anterior = hoy.replace(day=1) - timedelta(days=1)
+    hogar = Partida.objects.create(usuario=usuario, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    ocio = Partida.objects.create(usuario=usuario, nombre="Ocio", monto_asignado=Decimal("100.00"))
+    Gasto.objects.create(usuario=usuario, partida=hogar, monto=Decimal("125.50"), fecha=hoy)
+    Gasto.objects.create(usuario=usuario, partida=ocio, monto=Decimal("95.00"), fecha=hoy)
+    Gasto.objects.create(usuario=usuario, partida=ocio, monto=Decimal("95.00"), fecha=mes_anterior)
+    otro = get_user_model().objects.create_user(username="ajeno", password="secret")
+    ajena = Partida.objects.create(usuario=otro, nombre="Hogar", monto_asignado=Decimal("1.00"))
+    Gasto.objects.create(usuario=otro, partida=ajena, monto=Decimal("5.00"), fecha=hoy)
+
+    primera = cliente.get("/api/v1/alertas/", {"page_size": 2}).json()
+    assert [fila["mes"] for fila in primera["results"]] == [hoy.strftime("%Y-%m")] * 2
+    segunda = cliente.get(primera["next"]).json()
+    assert [(fila["partida_nombre"], fila["tipo"]) for fila in segunda["results"]] == [("Ocio", "aviso")]
+    assert segunda["next"] is None
+
+    del_mes = cliente.get("/api/v1/alertas/", {"mes": hoy.strftime("%Y-%m"), "activas": "1"}).json()["results"]
+    assert sorted(fila["partida_nombre"] for fila in del_mes) == ["Hogar", "Ocio"]
+    assert cliente.get("/api/v1/alertas/", {"mes": "2024-13"}).status_code == 400
+
+    excedida = next(fila for fila in del_mes if fila["tipo"] == "excedido")
+    respuesta = cliente.patch(f"/api/v1/alertas/{excedida['id']}/", {"leida": True, "activa": False}, format="json")
+    assert respuesta.status_code == 200
+    assert (respuesta.json()["leida"], respuesta.json()["activa"]) == (True, True)
+    assert cliente.delete(f"/api/v1/alertas/{excedida['id']}/").status_code == 405
+
+    sugerencias = cliente.get("/api/v1/resumen/").json()["sugerencias"]
+    assert sugerencias[-2:] == [
+        "Has superado el presupuesto de Hogar en $25.50. Considera reducir gastos en esta categoría.",
+        "Estás por alcanzar el límite de Ocio. Monitorea tus próximos gastos en esta partida.",
+    ]
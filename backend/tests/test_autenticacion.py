@@ -0,0 +1,142 @@
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts import credenciales
+
+
+@pytest.fixture
+def usuario():
+    return get_user_model().objects.create_user(username="firmado", password="secreto-123", email="f@example.com")
+
+
+def _login(username="firmado", password="secreto-123"):
+    respuesta = APIClient().post("/api/v1/auth/login/", {"username": username, "password": password}, format="json")
+    assert respuesta.status_code == 200, respuesta.content
+    return respuesta.json()
+
+
+def _cliente(access):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    return client
+
+
+def _consultas_usuario(queries):
+    return [query["sql"] for query in queries if "auth_user" in query["sql"]]
+
+
+@pytest.mark.django_db
+def test_requests_trust_the_claims_and_load_the_row_lazily(usuario):
+    cliente = _cliente(_login()["access"])
+    cliente.get("/api/v1/gastos/")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert cliente.get("/api/v1/gastos/").status_code == 200
+    assert _consultas_usuario(queries) == []
+
+    with CaptureQueriesContext(connection) as queries:
+        perfil = cliente.get("/api/v1/auth/me/").json()
+    assert perfil["email"] == "f@example.com"
+    assert len(_consultas_usuario(queries)) == 1
+    with CaptureQueriesContext(connection) as queries:
+        cliente.get("/api/v1/auth/me/")
+    assert _consultas_usuario(queries) == []
+
+    usuario.email = "nuevo@example.com"
+    usuario.save()
+    assert cliente.get("/api/v1/auth/me/").json()["email"] == "nuevo@example.com"
+
+
+@pytest.mark.django_db
+def test_changing_the_password_revokes_previous_tokens(usuario):
+    anteriores = _login()
+    cliente = _cliente(anteriores["access"])
+    respuesta = cliente.post(
+        "/api/v1/auth/password/change/",
+        {"password_actual": "secreto-123", "password_nuevo": "otra-clave-larga-9"},
+        format="json",
+    )
+    assert respuesta.status_code == 200, respuesta.content
+    nuevos = respuesta.json()
+
+    assert cliente.get("/api/v1/gastos/").status_code == 401
+    assert APIClient().post("/api/v1/auth/refresh/", {"refresh": anteriores["refresh"]}, format="json").status_code == 401
+    assert _cliente(nuevos["access"]).get("/api/v1/auth/me/").json()["username"] == "firmado"
+    refrescado = APIClient().post("/api/v1/auth/refresh/", {"refresh": nuevos["refresh"]}, format="json")
+    assert _cliente(refrescado.json()["access"]).get("/api/v1/gastos/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_password_changes_outside_the_api_revoke_tokens(usuario):
+    # The admin and ``changepassword`` save the user after ``set_password``.
+    cliente = _cliente(_login()["access"])
+    usuario.set_password("otra-clave-larga-9")
+    usuario.save()
+    assert cliente.get("/api/v1/gastos/").status_code == 401
+
+    # Upgrading the hash of the same password on login keeps the sessions.
+    usuario.password = make_password("otra-clave-larga-9", hasher="pbkdf2_sha1")
+    usuario.save(update_fields=["password"])
+    cliente = _cliente(_login(password="otra-clave-larga-9")["access"])
+    usuario.refresh_from_db()
+    assert not usuario.password.startswith("pbkdf2_sha1$")
+    assert cliente.get("/api/v1/gastos/").status_code == 200
+
+
+@pytest.mark.django_db
+def test_revocations_reach_processes_without_a_shared_cache(usuario, settings, monkeypatch):
+    """Each process has its own LocMemCache and LRUs: only expiry propagates a revocation."""
+
+    settings.AUTH_CACHE_SEGUNDOS = 0.3
+    procesos = [
+        (LocMemCache(f"proceso-{indice}", {}), credenciales.CacheLRU(1024, 0.3), credenciales.CacheLRU(1024, 0.3))
+        for indice in range(2)
+    ]
+
+    def en(indice):
+        cache, generaciones, filas = procesos[indice]
+        monkeypatch.setattr(credenciales, "cache", cache)
+        monkeypatch.setattr(credenciales, "_generaciones", generaciones)
+        monkeypatch.setattr(credenciales, "_filas", filas)
+
+    en(1)
+    assert credenciales.generacion(usuario.pk) == 0
+    en(0)
+    assert credenciales.revocar(usuario.pk) == 1
+    en(1)
+    assert credenciales.generacion(usuario.pk) == 0
+    time.sleep(0.35)
+    assert credenciales.generacion(usuario.pk) == 1
+
+
+@pytest.mark.django_db
+def test_deactivated_or_deleted_users_are_rejected(usuario):
+    cliente = _cliente(_login()["access"])
+    assert cliente.get("/api/v1/gastos/").status_code == 200
+
+    usuario.is_active = False
+    usuario.save(update_fields=["is_active"])
+    assert cliente.get("/api/v1/gastos/").status_code == 401
+
+    usuario.is_active = True
+    usuario.save(update_fields=["is_active"])
+    cliente = _cliente(_login()["access"])
+    usuario.delete()
+    assert cliente.get("/api/v1/gastos/").status_code == 401
+
+
+@pytest.mark.django_db
+def test_tokens_without_claims_fall_back_to_the_user_lookup(usuario):
+    cliente = _cliente(RefreshToken.for_user(usuario).access_token)
+
+    with CaptureQueriesContext(connection) as queries:
+        assert cliente.get("/api/v1/gastos/").status_code == 200
+    assert len(_consultas_usuario(queries)) == 1
@@ -0,0 +1,29 @@
+import json
+
+import pytest
+from django.core.management import CommandError, call_command
+
+OPCIONES = {
+    "usuarios": 2,
+    "partidas": 3,
+    "gastos": 30,
+    "ingresos": 5,
+    "anios": 1,
+    "repeticiones": 2,
+    "escenario": ["resumen", "partidas", "auth_me"],
+}
+
+
+@pytest.mark.django_db
+def test_benchmark_fails_when_query_count_regresses(tmp_path):
+    ruta = tmp_path / "api.json"
+    call_command("benchmark_api", linea_base=str(ruta), guardar=True, **OPCIONES)
+    linea_base = json.loads(ruta.read_text())
+    assert set(linea_base["escenarios"]) == {"resumen", "partidas", "auth_me"}
+
+    call_command("benchmark_api", linea_base=str(ruta), solo_consultas=True, **OPCIONES)
+
+    linea_base["escenarios"]["partidas"]["consultas"] -= 1
+    ruta.write_text(json.dumps(linea_base))
+    with pytest.raises(CommandError, match="partidas"):
+        call_command("benchmark_api", linea_base=str(ruta), solo_consultas=True, **OPCIONES)
@@ -0,0 +1,62 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas.models import Gasto, Partida
+
+
+@pytest.fixture
+def cliente():
+    user = get_user_model().objects.create_user(username="campos", password="secret")
+    partida = Partida.objects.create(usuario=user, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    for indice in range(3):
+        Gasto.objects.create(
+            usuario=user, partida=partida, monto=Decimal("10.00"), fecha=timezone.localdate(), observacion=f"n{indice}"
+        )
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_fields_prunes_the_serializer_and_the_loaded_columns(cliente):
+    with CaptureQueriesContext(connection) as queries:
+        respuesta = cliente.get("/api/v1/partidas/", {"fields": "id,nombre"})
+
+    assert respuesta.json() == [{"id": respuesta.json()[0]["id"], "nombre": "Hogar"}]
+    sql = queries.captured_queries[-1]["sql"]
+    assert "SUM" not in sql.upper()
+    assert "monto_asignado" not in sql
+
+    with CaptureQueriesContext(connection) as queries:
+        gastos = cliente.get("/api/v1/gastos/", {"fields": "id,monto", "page_size": 2}).json()
+    assert [set(fila) for fila in gastos["results"]] == [{"id", "monto"}] * 2
+    sql = queries.captured_queries[-1]["sql"]
+    assert "observacion" not in sql and "JOIN" not in sql.upper()
+
+
+@pytest.mark.django_db
+def test_omit_keeps_method_fields_working(cliente):
+    with CaptureQueriesContext(connection) as queries:
+        gastos = cliente.get("/api/v1/gastos/", {"omit": "created_at,updated_at,observacion"}).json()
+
+    assert len(queries) == 1
+    assert set(gastos[0]) == {"id", "partida", "partida_nombre", "monto", "fecha", "tipo", "categoria"}
+    assert gastos[0]["partida_nombre"] == "Hogar"
+
+    partida = cliente.get("/api/v1/partidas/", {"omit": "gastado_mes"}).json()[0]
+    assert partida["disponible_mes"] == 70.0
+
+
+@pytest.mark.django_db
+def test_unknown_fields_are_rejected_and_writes_ignore_the_selection(cliente):
+    assert cliente.get("/api/v1/gastos/", {"fields": "id,clave"}).status_code == 400
+
+    partida = cliente.get("/api/v1/partidas/").json()[0]
+    respuesta = cliente.patch(f"/api/v1/partidas/{partida['id']}/?fields=id", {"nombre": "Casa"}, format="json")
+    assert respuesta.json()["nombre"] == "Casa"
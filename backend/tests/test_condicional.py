@@ -0,0 +1,58 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas.models import Gasto, Partida, ReglaPartida
+
+
+@pytest.fixture
+def usuario(settings):
+    settings.ALLOWED_HOSTS.append("testserver")
+    return get_user_model().objects.create_user(username="condicional", password="secret")
+
+
+@pytest.fixture
+def cliente(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("ruta", ["/api/v1/gastos/", "/api/v1/gastos/?fields=id,monto", "/api/v1/partidas/", "detalle"])
+def test_matching_etag_is_answered_without_queries(usuario, cliente, ruta):
+    partida = Partida.objects.create(usuario=usuario, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    gasto = Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("10.00"), fecha=timezone.localdate())
+    if ruta == "detalle":
+        ruta = f"/api/v1/gastos/{gasto.pk}/"
+
+    primera = cliente.get(ruta)
+    assert primera.status_code == 200 and primera["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        respuesta = cliente.get(ruta, HTTP_IF_NONE_MATCH=primera["ETag"])
+    assert respuesta.status_code == 304
+    assert len(queries) == 0
+
+
+@pytest.mark.django_db
+def test_writes_stale_the_etags_of_dependent_collections(usuario, cliente, django_capture_on_commit_callbacks):
+    partida = Partida.objects.create(usuario=usuario, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    gastos = cliente.get("/api/v1/gastos/")["ETag"]
+    partidas = cliente.get("/api/v1/partidas/")["ETag"]
+    reglas = cliente.get("/api/v1/reglas-partida/")["ETag"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("10.00"), fecha=timezone.localdate())
+    assert cliente.get("/api/v1/partidas/", HTTP_IF_NONE_MATCH=partidas).status_code == 200
+    assert cliente.get("/api/v1/gastos/", HTTP_IF_NONE_MATCH=gastos).status_code == 200
+    # Rules do not depend on the ledger.
+    assert cliente.get("/api/v1/reglas-partida/", HTTP_IF_NONE_MATCH=reglas).status_code == 304
+
+    with django_capture_on_commit_callbacks(execute=True):
+        ReglaPartida.objects.create(usuario=usuario, partida=partida, patron="super")
+    assert cliente.get("/api/v1/reglas-partida/", HTTP_IF_NONE_MATCH=reglas).status_code == 200
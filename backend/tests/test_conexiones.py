@@ -0,0 +1,149 @@
+import asyncio
+import threading
+import time
+
+import django.db
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.signals import request_finished, request_started
+from django.db.backends.signals import connection_created
+from django.db.utils import ConnectionHandler
+
+from core import basedatos
+from core.asincronia import en_hilo
+
+
+def test_persistent_connections_are_the_default():
+    ajustes = basedatos.configuracion({"POSTGRES_HOST": "db"})
+    assert ajustes["HOST"] == "db"
+    assert (ajustes["CONN_MAX_AGE"], ajustes["CONN_HEALTH_CHECKS"]) == (60, True)
+    assert "OPTIONS" not in ajustes
+
+    ajustes = basedatos.configuracion({"DB_CONN_MAX_AGE": "0", "DB_CONN_HEALTH_CHECKS": "0"})
+    assert (ajustes["CONN_MAX_AGE"], ajustes["CONN_HEALTH_CHECKS"]) == (0, False)
+    assert basedatos.configuracion({"SQLITE_PATH": "/tmp/x.sqlite3"})["ENGINE"] == "django.db.backends.sqlite3"
+
+
+def test_pool_settings_come_from_the_environment(monkeypatch):
+    monkeypatch.setattr(basedatos, "find_spec", lambda nombre: None)
+    with pytest.raises(ImproperlyConfigured, match="psycopg"):
+        basedatos.configuracion({"DB_POOL": "1"})
+
+    monkeypatch.setattr(basedatos, "find_spec", lambda nombre: object())
+    entorno = {"DB_POOL": "1", "DB_POOL_MIN": "4", "DB_POOL_MAX": "16", "DB_POOL_MAX_LIFETIME": "600", "DB_POOL_CHECK": "0"}
+    ajustes = basedatos.configuracion({**entorno, "DB_CONN_MAX_AGE": "60"})
+    assert ajustes["CONN_MAX_AGE"] == 0
+    assert ajustes["OPTIONS"]["pool"] == {
+        "min_size": 4,
+        "max_size": 16,
+        "timeout": 10.0,
+        "max_lifetime": 600.0,
+        "max_idle": 300.0,
+    }
+    with pytest.raises(ImproperlyConfigured, match="DB_POOL_MAX"):
+        basedatos.configuracion({**entorno, "DB_POOL_MAX": "2"})
+
+
+def test_pool_checks_connections_before_handing_them_out():
+    psycopg_pool = pytest.importorskip("psycopg_pool")
+    opciones = basedatos.opciones_pool({})
+    assert opciones["check"] == psycopg_pool.ConnectionPool.check_connection
+
+
+@pytest.fixture
+def base_archivo(tmp_path, monkeypatch, django_db_blocker):
+    """Point ``django.db.connections`` (used by ``close_old_connections``) at a SQLite file.
+
+    The test database lives in memory, where Django ignores ``close()``, so
+    recycling can only be observed on a file.
+    """
+
+    ruta = str(tmp_path / "conexiones.sqlite3")
+    abiertas = []
+
+    def _registrar(sender, connection, **kwargs):
+        if connection.settings_dict["NAME"] == ruta:
+            abiertas.append(connection)
+
+    def crear(**ajustes):
+        handler = ConnectionHandler({"default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ruta, **ajustes}})
+        monkeypatch.setattr(django.db, "connections", handler)
+
+        def consultar():
+            conexion = handler["default"]
+            with conexion.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            # Long enough for the gathered calls to overlap and use several threads.
+            time.sleep(0.02)
+            return threading.get_ident(), conexion
+
+        return consultar, abiertas
+
+    connection_created.connect(_registrar)
+    with django_db_blocker.unblock():
+        yield crear
+    connection_created.disconnect(_registrar)
+
+
+def test_en_hilo_releases_connections_without_persistence(base_archivo):
+    consultar, abiertas = base_archivo(CONN_MAX_AGE=0)
+
+    async def principal():
+        return [await en_hilo(consultar) for _ in range(3)]
+
+    resultados = asyncio.run(principal())
+    assert len(abiertas) == 3
+    assert all(conexion.connection is None for _, conexion in resultados)
+
+
+def test_en_hilo_reuses_one_connection_per_thread_until_it_expires(base_archivo):
+    consultar, abiertas = base_archivo(CONN_MAX_AGE=60)
+
+    async def principal():
+        rondas = [await asyncio.gather(*(en_hilo(consultar) for _ in range(4))) for _ in range(3)]
+        antes = len(abiertas)
+        for _, conexion in rondas[-1]:
+            conexion.close_at = time.monotonic() - 1
+        return rondas, antes, await asyncio.gather(*(en_hilo(consultar) for _ in range(4)))
+
+    rondas, antes, despues = asyncio.run(principal())
+    resultados = [resultado for ronda in rondas for resultado in ronda]
+    por_hilo = {}
+    for hilo, conexion in resultados:
+        assert por_hilo.setdefault(hilo, conexion) is conexion
+    # Concurrent calls never share a connection, and each thread opened its own only once.
+    assert len({id(conexion) for conexion in por_hilo.values()}) == len(por_hilo) > 1
+    assert antes == len(por_hilo)
+    assert all(conexion.connection is not None for conexion in por_hilo.values())
+
+    # Expired connections are replaced before the next call instead of being used once more.
+    expirados = {hilo for hilo, _ in rondas[-1]}
+    hilos = {hilo for hilo, _ in despues}
+    assert len(abiertas) == len(por_hilo) + len(hilos & expirados) + len(hilos - set(por_hilo))
+
+
+def test_requests_keep_or_release_the_thread_connection(base_archivo):
+    for maximo, conservada in ((0, False), (60, True)):
+        consultar, _ = base_archivo(CONN_MAX_AGE=maximo)
+
+        def solicitud(consultar, resultado):
+            request_started.send(sender=None)
+            _, conexion = consultar()
+            request_finished.send(sender=None)
+            resultado.append(conexion)
+
+        resultado = []
+        hilo = threading.Thread(target=solicitud, args=(consultar, resultado))
+        hilo.start()
+        hilo.join()
+        assert (resultado[0].connection is not None) is conservada
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_compares_connection_modes(capsys):
+    call_command("benchmark_conexiones", repeticiones=3, gastos=5)
+    salida = capsys.readouterr().out
+    for escenario in ("partida_detalle", "gasto_editar"):
+        assert f"{escenario:<16} nuevas" in salida
+        assert f"{escenario:<16} persistentes" in salida
@@ -0,0 +1,74 @@
+import csv
+import io
+import zipfile
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from finanzas.models import Gasto, Ingreso, Partida
+
+
+@pytest.fixture
+def ledger():
+    user = get_user_model().objects.create_user(username="exporta", password="secret")
+    partida = Partida.objects.create(usuario=user, nombre="Comida & casa", monto_asignado=Decimal("100.00"))
+    Gasto.objects.create(usuario=user, partida=partida, monto=Decimal("12.50"), fecha=date(2024, 1, 3))
+    Gasto.objects.create(usuario=user, categoria="Ocio", monto=Decimal("7.00"), fecha=date(2024, 2, 1))
+    Ingreso.objects.create(usuario=user, monto=Decimal("900.00"), fecha=date(2024, 1, 1))
+    otro = get_user_model().objects.create_user(username="ajeno", password="secret")
+    Gasto.objects.create(usuario=otro, categoria="Ocio", monto=Decimal("1.00"), fecha=date(2024, 1, 2))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_csv_export_streams_rows_merged_by_date(ledger):
+    response = ledger.get("/api/v1/exportar/", {"hasta": "2024-01-31"})
+
+    assert response.status_code == 200
+    assert response.streaming
+    assert response["Content-Disposition"] == 'attachment; filename="movimientos.csv"'
+    filas = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+    assert [fila[:4] for fila in filas] == [
+        ["movimiento", "fecha", "monto", "partida"],
+        ["ingreso", "2024-01-01", "900.00", ""],
+        ["gasto", "2024-01-03", "12.50", "Comida & casa"],
+    ]
+
+
+@pytest.mark.django_db
+def test_csv_export_neutralizes_formulas_in_user_text(ledger):
+    user = get_user_model().objects.get(username="exporta")
+    Gasto.objects.create(
+        usuario=user, categoria="=1+2", observacion="@SUM(A1)", monto=Decimal("-3.00"), fecha=date(2024, 3, 1)
+    )
+
+    response = ledger.get("/api/v1/exportar/", {"desde": "2024-03-01"})
+
+    fila = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))[1]
+    assert fila[2] == "-3.00"
+    assert fila[4] == "'=1+2"
+    assert fila[6] == "'@SUM(A1)"
+
+
+@pytest.mark.django_db
+def test_xlsx_export_is_a_valid_workbook(ledger):
+    response = ledger.get("/api/v1/exportar/", {"formato": "xlsx"})
+
+    assert response.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(b"".join(response.streaming_content))) as libro:
+        assert libro.testzip() is None
+        hoja = libro.read("xl/worksheets/sheet1.xml").decode()
+    assert hoja.count("<row>") == 4
+    assert "Comida &amp; casa" in hoja
+    assert "<c><v>900.00</v></c>" in hoja
+
+
+@pytest.mark.django_db
+def test_export_rejects_invalid_parameters(ledger):
+    assert ledger.get("/api/v1/exportar/", {"formato": "pdf"}).status_code == 400
+    assert ledger.get("/api/v1/exportar/", {"desde": "ayer"}).status_code == 400
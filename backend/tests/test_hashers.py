@@ -0,0 +1,84 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import get_hasher, identify_hasher
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from accounts import hashers
+
+
+@pytest.fixture
+def iteraciones(settings):
+    settings.HASH_PBKDF2_ITERACIONES = 1000
+    return settings
+
+
+def _iteraciones(usuario) -> int:
+    usuario.refresh_from_db(fields=["password"])
+    return int(usuario.password.split("$")[1])
+
+
+@pytest.mark.django_db
+def test_login_rehashes_passwords_made_with_older_costs(iteraciones):
+    usuario = get_user_model().objects.create_user(username="antiguo", password="secreto-123")
+    assert _iteraciones(usuario) == 1000
+    assert isinstance(identify_hasher(usuario.password), hashers.PBKDF2Hasher)
+
+    iteraciones.HASH_PBKDF2_ITERACIONES = 2000
+    respuesta = APIClient().post("/api/v1/auth/login/", {"username": "antiguo", "password": "secreto-123"}, format="json")
+    assert respuesta.status_code == 200
+    assert _iteraciones(usuario) == 2000
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_login_checks_off_the_event_loop(iteraciones):
+    usuario = get_user_model().objects.create_user(username="asincrono", password="secreto-123")
+    iteraciones.HASH_PBKDF2_ITERACIONES = 1500
+    client = APIClient()
+
+    def login(**datos):
+        return client.post("/api/v1/auth/async/login/", datos, format="json")
+
+    tokens = login(username="asincrono", password="secreto-123")
+    assert tokens.status_code == 200, tokens.content
+    assert _iteraciones(usuario) == 1500
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens.json()['access']}")
+    assert client.get("/api/v1/auth/me/").json()["username"] == "asincrono"
+    client.credentials()
+
+    assert login(username="asincrono", password="mala").status_code == 401
+    assert login(username="nadie", password="mala").status_code == 401
+    assert set(login(username="asincrono").json()) == {"password"}
+    assert client.get("/api/v1/auth/async/login/").status_code == 405
+
+    usuario.is_active = False
+    usuario.save(update_fields=["is_active"])
+    assert login(username="asincrono", password="secreto-123").status_code == 401
+
+    iteraciones.THROTTLE_TASAS = {**iteraciones.THROTTLE_TASAS, "login_usuario": "1/min"}
+    assert login(username="limitado", password="x").status_code == 401
+    limitado = login(username="limitado", password="x")
+    assert limitado.status_code == 429
+    assert int(limitado["Retry-After"]) > 0
+
+
+def test_benchmark_recommends_pbkdf2_iterations(capsys):
+    call_command("benchmark_hash", algoritmo="pbkdf2", objetivo_ms=5, repeticiones=1)
+    salida = capsys.readouterr().out
+    assert "HASH_ALGORITMO=pbkdf2" in salida
+    assert int(salida.split("HASH_PBKDF2_ITERACIONES=")[1].split()[0]) >= 10_000
+
+
+def test_argon2id_costs_come_from_settings(settings):
+    pytest.importorskip("argon2")
+    settings.HASH_ARGON2_TIEMPO = 1
+    settings.HASH_ARGON2_MEMORIA_KIB = 8 * 1024
+    hasher = hashers.Argon2idHasher()
+    codificado = hasher.encode("secreto-123", hasher.salt())
+    assert "$argon2id$" in codificado and "m=8192,t=1,p=1" in codificado
+    assert hasher.verify("secreto-123", codificado)
+    assert not hasher.must_update(codificado)
+
+    settings.HASH_ARGON2_TIEMPO = 2
+    assert hasher.must_update(codificado)
+    assert isinstance(get_hasher("argon2"), hashers.Argon2idHasher)
@@ -0,0 +1,176 @@
+import io
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas import importacion, resumenes
+from finanzas.importacion import importar_archivo, parsear_monto
+from finanzas.models import Gasto, Importacion, Ingreso, Partida, ReglaPartida
+
+CSV = """Fecha;Descripción;Monto
+02/01/2024;Supermercado Lider;-25.990
+02/01/2024;Supermercado Lider;-25.990
+03/01/2024;Sueldo enero;1.200.000
+04/01/2024;Farmacia;no-es-monto
+"""
+
+OFX = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240105120000<TRNAMT>-15.50<FITID>A1<NAME>Cafe
+</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240106<TRNAMT>100.00<FITID>A2<NAME>Reembolso
+</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+@pytest.mark.parametrize(
+    ("valor", "esperado"),
+    [("-25.990", "-25990.00"), ("1.234,56", "1234.56"), ("1,234.56", "1234.56"), ("$ 15,5", "15.50")],
+)
+def test_parsear_monto(valor, esperado):
+    assert parsear_monto(valor) == Decimal(esperado)
+
+
+@pytest.mark.django_db
+def test_csv_import_assigns_partidas_and_skips_duplicates_on_reimport():
+    user = get_user_model().objects.create_user(username="cartola", password="secret")
+    partida = Partida.objects.create(usuario=user, nombre="Comida", monto_asignado=Decimal("100000.00"))
+    ReglaPartida.objects.create(usuario=user, partida=partida, patron="supermercado")
+
+    primera = importar_archivo(user, io.BytesIO(CSV.encode()), "csv", tamano_lote=2)
+    segunda = importar_archivo(user, io.BytesIO(CSV.encode()), "csv")
+
+    assert (primera.creados, primera.duplicados, primera.total_errores) == (3, 0, 1)
+    assert (segunda.creados, segunda.duplicados) == (0, 3)
+    assert list(Gasto.objects.filter(usuario=user).values_list("partida", "monto")) == [
+        (partida.pk, Decimal("25990.00")),
+        (partida.pk, Decimal("25990.00")),
+    ]
+    assert Ingreso.objects.get(usuario=user).monto == Decimal("1200000.00")
+    assert resumenes.verificar(user.pk) == []
+
+
+@pytest.mark.django_db
+def test_upload_endpoint_processes_ofx_off_the_request(settings, tmp_path, django_capture_on_commit_callbacks):
+    settings.ALLOWED_HOSTS.append("testserver")
+    settings.FINANZAS_IMPORTACION_DIR = tmp_path
+    settings.FINANZAS_IMPORTACION_SINCRONA = True
+    user = get_user_model().objects.create_user(username="subida", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        response = client.post(
+            "/api/v1/importaciones/",
+            {"archivo": SimpleUploadedFile("cartola.ofx", OFX.encode())},
+            format="multipart",
+        )
+
+    assert response.status_code == 202, response.content
+    trabajo = client.get(f"/api/v1/importaciones/{response.json()['id']}/").json()
+    assert trabajo["estado"] == Importacion.Estado.COMPLETADA
+    assert trabajo["creados"] == 2
+    assert Gasto.objects.get(usuario=user).fecha == date(2024, 1, 5)
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.django_db
+def test_identical_rows_are_numbered_across_an_unsorted_file():
+    user = get_user_model().objects.create_user(username="desordenada", password="secret")
+    desordenado = """Fecha;Descripción;Monto
+02/01/2024;Metro;-800
+03/01/2024;Metro;-800
+02/01/2024;Metro;-800
+"""
+
+    primera = importar_archivo(user, io.BytesIO(desordenado.encode()), "csv")
+    segunda = importar_archivo(user, io.BytesIO(desordenado.encode()), "csv")
+
+    assert (primera.creados, primera.duplicados) == (3, 0)
+    assert (segunda.creados, segunda.duplicados) == (0, 3)
+    assert sorted(Gasto.objects.filter(usuario=user).values_list("fecha", flat=True)) == [
+        date(2024, 1, 2),
+        date(2024, 1, 2),
+        date(2024, 1, 3),
+    ]
+
+
+@pytest.mark.django_db
+def test_rows_inserted_by_a_concurrent_import_count_as_duplicates(monkeypatch):
+    user = get_user_model().objects.create_user(username="concurrente", password="secret")
+    partida = importacion.Importador._partida
+    concurrente = []
+
+    def importar_antes(self, descripcion):
+        # The other import commits the same file between this one's lookup and insert.
+        if not concurrente:
+            concurrente.append(None)
+            concurrente[0] = importar_archivo(user, io.BytesIO(CSV.encode()), "csv")
+        return partida(self, descripcion)
+
+    monkeypatch.setattr(importacion.Importador, "_partida", importar_antes)
+    resultado = importar_archivo(user, io.BytesIO(CSV.encode()), "csv")
+
+    assert concurrente[0].creados == 3
+    assert (resultado.creados, resultado.duplicados) == (0, 3)
+    assert Gasto.objects.filter(usuario=user).count() == 2
+    assert resumenes.verificar(user.pk) == []
+
+
+@pytest.mark.django_db
+def test_occurrence_counters_keep_only_the_recent_dates(monkeypatch):
+    monkeypatch.setattr(importacion, "FECHAS_ABIERTAS", 2)
+    user = get_user_model().objects.create_user(username="acotada", password="secret")
+    importador = importacion.Importador(user)
+    for dia in (1, 2, 3, 2):
+        importador._huella(importacion.Movimiento(date(2024, 1, dia), Decimal("-1.00"), "Metro"))
+
+    assert list(importador._ocurrencias) == [date(2024, 1, 3), date(2024, 1, 2)]
+    assert importador._ocurrencias[date(2024, 1, 2)] == {(Decimal("-1.00"), "metro", ""): 2}
+
+
+@pytest.mark.django_db
+def test_repeated_document_numbers_do_not_hide_movements():
+    user = get_user_model().objects.create_user(username="documentos", password="secret")
+    cartola = """Fecha;Descripción;Monto;N° Documento
+02/01/2024;Transferencia;-5.000;1001
+03/01/2024;Transferencia;-7.000;1001
+03/01/2024;Transferencia;-7.000;1002
+"""
+
+    primera = importar_archivo(user, io.BytesIO(cartola.encode()), "csv")
+    segunda = importar_archivo(user, io.BytesIO(cartola.encode()), "csv")
+
+    assert (primera.creados, primera.duplicados) == (3, 0)
+    assert (segunda.creados, segunda.duplicados) == (0, 3)
+
+
+@pytest.mark.django_db
+def test_abandoned_imports_are_resumed(settings, tmp_path):
+    settings.FINANZAS_IMPORTACION_DIR = tmp_path
+    user = get_user_model().objects.create_user(username="abandonada", password="secret")
+    perdida, sin_archivo, reciente = (
+        Importacion.objects.create(usuario=user, nombre_archivo="cartola.ofx", formato="ofx", estado=estado)
+        for estado in (Importacion.Estado.PROCESANDO, Importacion.Estado.PENDIENTE, Importacion.Estado.PENDIENTE)
+    )
+    for trabajo in (perdida, reciente):
+        importacion.ruta_archivo(trabajo).write_text(OFX)
+    Importacion.objects.exclude(pk=reciente.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+
+    call_command("reanudar_importaciones", minutos=30)
+
+    estados = dict(Importacion.objects.values_list("pk", "estado"))
+    assert estados == {
+        perdida.pk: Importacion.Estado.COMPLETADA,
+        sin_archivo.pk: Importacion.Estado.FALLIDA,
+        reciente.pk: Importacion.Estado.PENDIENTE,
+    }
+    assert Gasto.objects.filter(usuario=user).count() == 1
+    assert importacion.reanudar(30) == []
@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas.models import Gasto, Ingreso, Partida
+
+
+@pytest.fixture
+def cliente(settings):
+    settings.ALLOWED_HOSTS.append("testserver")
+    user = get_user_model().objects.create_user(username="inicio", password="secret", first_name="Ana")
+    hogar = Partida.objects.create(usuario=user, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    Partida.objects.create(usuario=user, nombre="Ocio", monto_asignado=Decimal("50.00"))
+    hoy = timezone.localdate()
+    for dias in range(7):
+        Gasto.objects.create(usuario=user, partida=hogar, monto=Decimal("15.00"), fecha=hoy.replace(day=1) + timedelta(days=dias % 2))
+    Gasto.objects.create(usuario=user, categoria="Taxi", monto=Decimal("8.00"), fecha=hoy.replace(day=1))
+    Gasto.objects.create(usuario=user, partida=hogar, monto=Decimal("99.00"), fecha=hoy.replace(day=1) - timedelta(days=1))
+    Ingreso.objects.create(usuario=user, monto=Decimal("400.00"), fecha=hoy.replace(day=1))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+@pytest.mark.django_db
+def test_inicio_matches_the_individual_endpoints(cliente):
+    with CaptureQueriesContext(connection) as queries:
+        respuesta = cliente.get("/api/v1/inicio/")
+    assert respuesta.status_code == 200
+    # partidas, gastos, ingresos and active alerts of the month: the summary reuses them.
+    assert len(queries) == 4
+
+    data = respuesta.json()
+    inicio_mes = timezone.localdate().replace(day=1)
+    assert data["mes"] == inicio_mes.strftime("%Y-%m")
+    assert data["usuario"] == cliente.get("/api/v1/auth/me/").json()
+    assert data["partidas"] == cliente.get("/api/v1/partidas/").json()
+    assert data["gastos"] == cliente.get("/api/v1/gastos/", {"desde": inicio_mes.isoformat()}).json()
+    assert data["ingresos"] == cliente.get("/api/v1/ingresos/", {"desde": inicio_mes.isoformat()}).json()
+    assert data["resumen"] == cliente.get("/api/v1/resumen/").json()
+
+
+@pytest.mark.django_db
+def test_inicio_returns_only_the_requested_sections(cliente):
+    respuesta = cliente.get("/api/v1/inicio/", {"incluir": "usuario,resumen"})
+
+    assert set(respuesta.json()) == {"mes", "usuario", "resumen"}
+    assert respuesta.json()["resumen"] == cliente.get("/api/v1/resumen/").json()
+    assert len(respuesta.json()["resumen"]["gastos_recientes"]) == 5
+
+
+@pytest.mark.django_db
+def test_inicio_filters_by_month_and_validates(cliente):
+    anterior = timezone.localdate().replace(day=1) - timedelta(days=1)
+    data = cliente.get("/api/v1/inicio/", {"mes": anterior.strftime("%Y-%m"), "incluir": "gastos,partidas"}).json()
+
+    assert [gasto["monto"] for gasto in data["gastos"]] == ["99.00"]
+    assert data["partidas"][0]["gastado_mes"] == 99.0
+    assert cliente.get("/api/v1/inicio/", {"mes": "2024-13"}).status_code == 400
+    assert cliente.get("/api/v1/inicio/", {"incluir": "nada"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_inicio_honours_if_none_match(cliente):
+    etag = cliente.get("/api/v1/inicio/")["ETag"]
+
+    assert cliente.get("/api/v1/inicio/", HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert cliente.get("/api/v1/inicio/", {"incluir": "resumen"}, HTTP_IF_NONE_MATCH=etag).status_code == 200
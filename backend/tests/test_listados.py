@@ -0,0 +1,74 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.test import RequestFactory
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.renderers import JSONRapidoRenderer
+from finanzas import listados
+from finanzas.models import Gasto, Ingreso, Partida
+from finanzas.serializers import GastoSerializer, IngresoSerializer, PartidaSerializer
+
+
+@pytest.fixture
+def usuario():
+    user = get_user_model().objects.create_user(username="listados", password="secret")
+    hogar = Partida.objects.create(usuario=user, nombre="Hogar ñandú", monto_asignado=Decimal("100.00"))
+    Partida.objects.create(usuario=user, nombre="", monto_asignado=Decimal("0.00"))
+    hoy = timezone.localdate()
+    for indice in range(6):
+        Gasto.objects.create(
+            usuario=user,
+            partida=hogar if indice % 2 else None,
+            categoria="" if indice % 2 else ("Taxi" if indice % 3 else ""),
+            monto=Decimal("12.5") * (indice + 1),
+            fecha=hoy - timedelta(days=indice),
+            observacion="línea\u2028nueva" if indice == 1 else "",
+        )
+    Ingreso.objects.create(usuario=user, monto=Decimal("1000.00"), fecha=hoy, observacion="sueldo 😀")
+    return user
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "modelo, serializer_class",
+    [(Gasto, GastoSerializer), (Ingreso, IngresoSerializer), (Partida, PartidaSerializer)],
+)
+def test_fast_path_output_is_byte_identical(usuario, modelo, serializer_class):
+    request = RequestFactory().get("/")
+    request.user = usuario
+    queryset = modelo.objects.filter(usuario=usuario)
+    if modelo is Partida:
+        queryset = queryset.con_gasto_mes()
+
+    esperado = JSONRenderer().render(serializer_class(queryset, many=True, context={"request": request}).data)
+    rapido = JSONRapidoRenderer().render(listados.listar(request, queryset, serializer_class))
+
+    assert rapido == esperado
+
+
+@pytest.mark.django_db
+def test_list_endpoints_use_the_fast_path_with_selection_and_pagination(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+
+    primera = client.get("/api/v1/gastos/", {"page_size": 4, "omit": "created_at"})
+    assert len(primera.json()["results"]) == 4
+    segunda = client.get(primera.json()["next"])
+    assert [fila["id"] for fila in segunda.json()["results"]] == list(
+        Gasto.objects.filter(usuario=usuario).order_by("-fecha", "-created_at", "-id").values_list("pk", flat=True)[4:]
+    )
+    assert "created_at" not in segunda.json()["results"][0]
+
+
+def test_renderer_matches_drf_for_other_payloads():
+    data = {"detail": "Fecha inválida", 1: [Decimal("2.50"), timezone.now(), None, True, "a\u2028b"]}
+
+    assert JSONRapidoRenderer().render(data) == JSONRenderer().render(data)
+    assert JSONRapidoRenderer().render(data, "application/json; indent=2") == JSONRenderer().render(
+        data, "application/json; indent=2"
+    )
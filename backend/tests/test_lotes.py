@@ -0,0 +1,83 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from finanzas import resumenes
+from finanzas.models import Gasto, Partida
+
+
+@pytest.fixture
+def usuario_con_partida(settings):
+    settings.ALLOWED_HOSTS.append("testserver")
+    user = get_user_model().objects.create_user(username="lotes", password="secret")
+    # Large enough that no batch crosses a budget alert threshold.
+    partida = Partida.objects.create(usuario=user, nombre="Supermercado", monto_asignado=Decimal("5000.00"))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, user, partida
+
+
+def _filas(partida, cantidad):
+    return [
+        {"partida": partida.pk, "monto": "10.00", "fecha": str(date(2024, 1, 1 + indice % 28)), "tipo": "variable"}
+        for indice in range(cantidad)
+    ]
+
+
+@pytest.mark.django_db
+def test_bulk_create_uses_constant_queries(usuario_con_partida):
+    client, user, partida = usuario_con_partida
+    client.post("/api/v1/gastos/lote/", _filas(partida, 1), format="json")
+
+    with CaptureQueriesContext(connection) as pocas:
+        assert client.post("/api/v1/gastos/lote/", _filas(partida, 2), format="json").status_code == 201
+    with CaptureQueriesContext(connection) as muchas:
+        response = client.post("/api/v1/gastos/lote/", _filas(partida, 50), format="json")
+
+    assert response.status_code == 201, response.content
+    assert len(response.json()) == 50
+    assert len(muchas) == len(pocas)
+    assert Gasto.objects.filter(usuario=user).count() == 53
+    assert resumenes.verificar(user.pk) == []
+
+
+@pytest.mark.django_db
+def test_bulk_create_reports_errors_per_row_and_inserts_nothing(usuario_con_partida):
+    client, user, partida = usuario_con_partida
+    ajena = Partida.objects.create(
+        usuario=get_user_model().objects.create_user(username="otro", password="secret"),
+        nombre="Ajena",
+        monto_asignado=Decimal("1.00"),
+    )
+    filas = _filas(partida, 3)
+    filas[1]["partida"] = ajena.pk
+    filas[2]["monto"] = "no-es-un-monto"
+
+    response = client.post("/api/v1/gastos/lote/", filas, format="json")
+
+    assert response.status_code == 400
+    assert [error["indice"] for error in response.json()["errores"]] == [1, 2]
+    assert not Gasto.objects.filter(usuario=user).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_update_and_delete_keep_rollup_in_sync(usuario_con_partida):
+    client, user, partida = usuario_con_partida
+    creados = client.post("/api/v1/gastos/lote/", _filas(partida, 4), format="json").json()
+
+    cambios = [{"id": gasto["id"], "fecha": "2024-03-15", "monto": "7.50"} for gasto in creados[:2]]
+    assert client.patch("/api/v1/gastos/lote/", cambios, format="json").status_code == 200
+    eliminar = [gasto["id"] for gasto in creados[2:]]
+    response = client.delete("/api/v1/gastos/lote/", eliminar, format="json")
+
+    assert response.json() == {"eliminados": 2}
+    assert list(Gasto.objects.filter(usuario=user).values_list("monto", flat=True)) == [
+        Decimal("7.50"),
+        Decimal("7.50"),
+    ]
+    assert resumenes.verificar(user.pk) == []
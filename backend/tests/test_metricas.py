@@ -0,0 +1,41 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+pytest.importorskip("prometheus_client")
+
+
+def test_metrics_endpoint_is_hidden_when_disabled(settings, client):
+    settings.METRICAS_ACTIVAS = False
+    assert client.get("/metrics").status_code == 404
+
+
+@pytest.mark.django_db
+def test_metrics_record_views_cache_and_jwt(settings):
+    settings.METRICAS_ACTIVAS = True
+    settings.METRICAS_TOKEN = "secreto"
+    user = get_user_model().objects.create_user(username="metricas", password="secret")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+    assert client.get("/api/v1/resumen/").status_code == 200
+    client.get("/api/v1/resumen/")
+
+    anonimo = APIClient()
+    assert anonimo.get("/metrics").status_code == 401
+    cuerpo = anonimo.get("/metrics", HTTP_AUTHORIZATION="Bearer secreto").content.decode()
+    assert 'http_solicitud_duracion_segundos_count{vista="resumen_financiero",metodo="GET"}' in cuerpo
+    assert 'http_respuestas_total{vista="resumen_financiero",metodo="GET",estado="200"}' in cuerpo
+    assert 'cache_consultas_total{cache="resumen",resultado="acierto"}' in cuerpo
+    assert 'jwt_autenticacion_duracion_segundos_count{resultado="ok"}' in cuerpo
+
+
+def test_metrics_require_a_token_outside_debug(settings, client):
+    settings.METRICAS_ACTIVAS = True
+    settings.METRICAS_TOKEN = ""
+    settings.DEBUG = False
+    assert client.get("/metrics").status_code == 404
+
+    settings.DEBUG = True
+    assert client.get("/metrics").status_code == 200
@@ -0,0 +1,50 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from finanzas.models import Gasto
+
+
+@pytest.fixture
+def cliente_con_gastos(settings):
+    settings.ALLOWED_HOSTS.append("testserver")
+    user = get_user_model().objects.create_user(username="paginas", password="secret")
+    for dia in (1, 1, 1, 2, 3):
+        Gasto.objects.create(
+            usuario=user, categoria="Varios", monto=Decimal("10.00"), fecha=date(2024, 5, dia)
+        )
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, user
+
+
+@pytest.mark.django_db
+def test_keyset_pages_walk_the_whole_history(cliente_con_gastos):
+    client, user = cliente_con_gastos
+    esperado = list(
+        Gasto.objects.filter(usuario=user).order_by("-fecha", "-created_at", "-id").values_list("id", flat=True)
+    )
+
+    vistos = []
+    url = "/api/v1/gastos/?page_size=2"
+    while url:
+        data = client.get(url).json()
+        assert len(data["results"]) <= 2
+        vistos.extend(item["id"] for item in data["results"])
+        url = data["next"]
+
+    assert vistos == esperado
+
+
+@pytest.mark.django_db
+def test_list_stays_unpaginated_without_parameters(cliente_con_gastos):
+    client, _ = cliente_con_gastos
+
+    data = client.get("/api/v1/gastos/").json()
+
+    assert isinstance(data, list)
+    assert len(data) == 5
+    assert client.get("/api/v1/gastos/?cursor=basura").status_code == 404
@@ -0,0 +1,50 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas.models import Gasto, Partida
+
+
+def _crear_partidas(user, cantidad):
+    hoy = timezone.localdate()
+    for indice in range(cantidad):
+        partida = Partida.objects.create(
+            usuario=user, nombre=f"Partida {indice}", monto_asignado=Decimal("100.00")
+        )
+        Gasto.objects.create(usuario=user, partida=partida, monto="40.00", fecha=hoy)
+        Gasto.objects.create(usuario=user, partida=partida, monto="15.00", fecha=hoy - timedelta(days=40))
+
+
+def _contar_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    assert response.status_code == 200, response.content
+    return len(queries), response.json()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("url", ["/api/v1/partidas/", "/api/v1/resumen/"])
+def test_partida_month_spend_uses_constant_queries(settings, url):
+    settings.ALLOWED_HOSTS.append("testserver")
+    pocas = get_user_model().objects.create_user(username="pocas", password="secret")
+    muchas = get_user_model().objects.create_user(username="muchas", password="secret")
+    _crear_partidas(pocas, 1)
+    _crear_partidas(muchas, 8)
+    client = APIClient()
+
+    client.force_authenticate(user=pocas)
+    queries_pocas, _ = _contar_queries(client, url)
+    client.force_authenticate(user=muchas)
+    queries_muchas, data = _contar_queries(client, url)
+
+    assert queries_pocas == queries_muchas
+    partidas = data if url.endswith("partidas/") else data["partidas"]
+    assert len(partidas) == 8
+    assert {partida["gastado_mes"] for partida in partidas} == {40.0}
+    assert {partida["disponible_mes"] for partida in partidas} == {60.0}
@@ -0,0 +1,69 @@
+import json
+import logging
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from core.perfilado import RegistroSQL
+
+
+def test_registro_counts_duplicates_and_similar_statements():
+    registro = RegistroSQL()
+    ejecutar = lambda sql, params, many, context: None  # noqa: E731
+    for params in ((1,), (1,), (2,)):
+        registro(ejecutar, "SELECT * FROM t WHERE id = %s", params, False, {})
+    registro(ejecutar, "SELECT 1", None, False, {})
+
+    assert registro.duplicadas() == 1
+    assert registro.similares() == [{"sql": "SELECT * FROM t WHERE id = %s", "veces": 3}]
+    assert len(registro.lentas(2)) == 2
+
+
+@pytest.mark.django_db
+def test_middleware_is_removed_when_disabled(settings):
+    settings.PERFILADO_ACTIVO = False
+    user = get_user_model().objects.create_user(username="sinperfil", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    assert "Server-Timing" not in client.get("/api/v1/partidas/")
+
+
+@pytest.mark.django_db
+def test_sampled_request_gets_server_timing_log_and_profile(settings, tmp_path, caplog):
+    settings.PERFILADO_ACTIVO = True
+    settings.PERFILADO_MUESTREO = 100
+    settings.PERFILADO_LENTO_MS = 0
+    settings.PERFILADO_DIR = str(tmp_path)
+    user = get_user_model().objects.create_user(username="perfilado", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    with caplog.at_level(logging.INFO, logger="core.perfilado"):
+        response = client.get("/api/v1/resumen/")
+
+    assert response.status_code == 200
+    assert response["Server-Timing"].startswith("total;dur=")
+    assert "db;dur=" in response["Server-Timing"]
+    datos = json.loads(caplog.records[-1].getMessage())
+    assert datos["ruta"] == "/api/v1/resumen/"
+    assert datos["consultas"] > 0
+    assert list(tmp_path.glob("*.prof")) == [tmp_path / datos["perfil"].rsplit("/", 1)[-1]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_views_report_the_queries_of_their_pool_threads(settings, caplog):
+    settings.PERFILADO_ACTIVO = True
+    settings.PERFILADO_MUESTREO = 100
+    settings.PERFILADO_CONSULTAS_LENTAS = 50
+    user = get_user_model().objects.create_user(username="perfilado-async", password="secret")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+    with caplog.at_level(logging.INFO, logger="core.perfilado"):
+        assert client.get("/api/v1/async/partidas/").status_code == 200
+
+    datos = json.loads(caplog.records[-1].getMessage())
+    assert any("finanzas_partida" in consulta["sql"] for consulta in datos["lentas"])
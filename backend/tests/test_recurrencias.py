@@ -0,0 +1,134 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from rest_framework.test import APIClient
+
+from finanzas import recurrencias, resumenes
+from finanzas.models import Gasto, Ingreso, Partida, Recurrencia
+
+
+@pytest.mark.django_db
+def test_scheduler_materializes_due_occurrences_once():
+    user = get_user_model().objects.create_user(username="arriendo", password="secret")
+    partida = Partida.objects.create(usuario=user, nombre="Arriendo", tipo=Partida.Tipo.FIJO, monto_asignado=500)
+    Recurrencia.objects.create(
+        usuario=user,
+        movimiento=Recurrencia.Movimiento.GASTO,
+        partida=partida,
+        monto=Decimal("450.00"),
+        fecha_inicio=date(2024, 1, 31),
+        proxima_fecha=date(2024, 1, 31),
+    )
+    Recurrencia.objects.create(
+        usuario=user,
+        movimiento=Recurrencia.Movimiento.INGRESO,
+        monto=Decimal("1500.00"),
+        fecha_inicio=date(2024, 1, 1),
+        proxima_fecha=date(2024, 1, 1),
+        fecha_fin=date(2024, 2, 15),
+    )
+
+    primera = recurrencias.generar(date(2024, 4, 10), tamano_lote=1)
+    segunda = recurrencias.generar(date(2024, 4, 10))
+
+    assert (primera.gastos, primera.ingresos) == (3, 2)
+    assert (segunda.recurrencias, segunda.gastos, segunda.ingresos) == (0, 0, 0)
+    assert list(Gasto.objects.order_by("fecha").values_list("fecha", "tipo")) == [
+        (date(2024, 1, 31), Gasto.Tipo.FIJO),
+        (date(2024, 2, 29), Gasto.Tipo.FIJO),
+        (date(2024, 3, 31), Gasto.Tipo.FIJO),
+    ]
+    assert Ingreso.objects.count() == 2
+    assert list(Recurrencia.objects.order_by("movimiento").values_list("proxima_fecha", "activa")) == [
+        (date(2024, 4, 30), True),
+        (date(2024, 3, 1), False),
+    ]
+    assert resumenes.verificar(user.pk) == []
+
+
+@pytest.mark.django_db
+def test_scheduler_skips_occurrences_that_already_exist():
+    user = get_user_model().objects.create_user(username="sueldo", password="secret")
+    recurrencia = Recurrencia.objects.create(
+        usuario=user,
+        movimiento=Recurrencia.Movimiento.INGRESO,
+        monto=Decimal("100.00"),
+        frecuencia=Recurrencia.Frecuencia.SEMANAL,
+        intervalo=2,
+        fecha_inicio=date(2024, 1, 1),
+        proxima_fecha=date(2024, 1, 1),
+    )
+    # Simulates a crash after the rows were written but before proxima_fecha moved.
+    Ingreso.objects.create(usuario=user, monto=Decimal("100.00"), fecha=date(2024, 1, 1), recurrencia=recurrencia)
+
+    call_command("generar_recurrencias", hasta="2024-01-31")
+
+    assert list(Ingreso.objects.order_by("fecha").values_list("fecha", flat=True)) == [
+        date(2024, 1, 1),
+        date(2024, 1, 15),
+        date(2024, 1, 29),
+    ]
+
+
+@pytest.mark.django_db
+def test_recurrence_endpoint_validates_partida_owner():
+    user = get_user_model().objects.create_user(username="propietario", password="secret")
+    ajena = Partida.objects.create(
+        usuario=get_user_model().objects.create_user(username="otro", password="secret"),
+        nombre="Ajena",
+        monto_asignado=100,
+    )
+    client = APIClient()
+    client.force_authenticate(user=user)
+    datos = {"movimiento": "gasto", "categoria": "Suscripciones", "monto": "10.00", "fecha_inicio": "2024-05-10"}
+
+    rechazada = client.post("/api/v1/recurrencias/", {**datos, "partida": ajena.pk}, format="json")
+    creada = client.post("/api/v1/recurrencias/", datos, format="json")
+
+    assert rechazada.status_code == 400
+    assert creada.status_code == 201
+    assert creada.json()["proxima_fecha"] == "2024-05-10"
+
+
+@pytest.mark.django_db
+def test_recurring_expenses_need_a_partida_or_categoria():
+    user = get_user_model().objects.create_user(username="sin-destino", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    datos = {"movimiento": "gasto", "monto": "10.00", "fecha_inicio": "2024-05-10"}
+
+    assert client.post("/api/v1/recurrencias/", datos, format="json").status_code == 400
+    creada = client.post("/api/v1/recurrencias/", {**datos, "categoria": "Gimnasio"}, format="json").json()
+    vaciada = client.patch(f"/api/v1/recurrencias/{creada['id']}/", {"categoria": ""}, format="json")
+    ingreso = client.post("/api/v1/recurrencias/", {**datos, "movimiento": "ingreso"}, format="json")
+
+    assert vaciada.status_code == 400
+    assert ingreso.status_code == 201
+
+
+@pytest.mark.django_db
+def test_changing_the_schedule_recomputes_proxima_fecha():
+    user = get_user_model().objects.create_user(username="reprogramada", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+    datos = {"movimiento": "ingreso", "monto": "10.00", "fecha_inicio": "2024-01-15"}
+    url = f"/api/v1/recurrencias/{client.post('/api/v1/recurrencias/', datos, format='json').json()['id']}/"
+
+    movida = client.patch(url, {"fecha_inicio": "2024-01-20"}, format="json").json()
+    assert movida["proxima_fecha"] == "2024-01-20"
+
+    recurrencias.generar(date(2024, 3, 1))
+    assert client.get(url).json()["proxima_fecha"] == "2024-03-20"
+    semanal = client.patch(url, {"frecuencia": "semanal"}, format="json").json()
+    assert semanal["proxima_fecha"] == "2024-02-24"
+    assert client.patch(url, {"monto": "12.00"}, format="json").json()["proxima_fecha"] == "2024-02-24"
+
+    recurrencias.generar(date(2024, 3, 1))
+    assert list(Ingreso.objects.filter(usuario=user).values_list("fecha", flat=True).order_by("fecha")) == [
+        date(2024, 1, 20),
+        date(2024, 2, 20),
+        date(2024, 2, 24),
+    ]
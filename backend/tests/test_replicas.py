@@ -0,0 +1,100 @@
+from datetime import date
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.test import APIClient
+
+from accounts.tokens import tokens_para
+from core import basedatos, replicas
+from finanzas.models import Gasto, Partida
+
+from conftest import REPLICA
+
+
+def test_replica_aliases_come_from_the_environment():
+    principal = basedatos.configuracion({"POSTGRES_HOST": "primaria", "POSTGRES_DB": "finova"})
+    alias = basedatos.replicas(principal, {"DB_REPLICAS": "lectura-1, lectura-2:5433"})
+    assert list(alias) == ["replica1", "replica2"]
+    assert (alias["replica1"]["HOST"], alias["replica1"]["PORT"], alias["replica1"]["NAME"]) == ("lectura-1", "5432", "finova")
+    assert (alias["replica2"]["HOST"], alias["replica2"]["PORT"]) == ("lectura-2", "5433")
+    assert alias["replica1"]["TEST"] == {"MIRROR": "default"}
+    assert principal["HOST"] == "primaria"
+
+    sqlite = basedatos.configuracion({"SQLITE_PATH": "/tmp/primaria.sqlite3"})
+    assert basedatos.replicas(sqlite, {"DB_REPLICAS": "/tmp/replica.sqlite3"})["replica1"]["NAME"] == "/tmp/replica.sqlite3"
+    assert basedatos.replicas(sqlite, {}) == {}
+
+
+@pytest.fixture
+def replica(settings, tmp_path):
+    """Route reads to the empty stand-in replica declared in ``conftest``, with a cache shared by processes."""
+
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": str(tmp_path / "cache"),
+        }
+    }
+    settings.REPLICAS_LECTURA = [REPLICA]
+    settings.DATABASE_ROUTERS = ["core.replicas.EnrutadorReplicas"]
+    return REPLICA
+
+
+def test_replicas_require_a_shared_cache(replica, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    with pytest.raises(ImproperlyConfigured, match="REDIS_URL"):
+        replicas.ReplicasMiddleware(lambda request: None)
+
+
+@pytest.mark.django_db(transaction=True, databases=["default", REPLICA])
+def test_read_only_requests_use_the_replica_until_the_user_writes(replica):
+    usuario = get_user_model().objects.create_user(username="lector", password="secreto-123")
+    partida = Partida.objects.create(usuario=usuario, nombre="Casa", monto_asignado="100.00")
+    Gasto.objects.create(usuario=usuario, partida=partida, monto="10.00", fecha=date.today(), tipo="variable")
+    assert not Gasto.objects.using(replica).exists()
+    cache.clear()
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_para(usuario).access_token}")
+
+    def gastos(ruta="/api/v1/gastos/"):
+        respuesta = client.get(ruta)
+        assert respuesta.status_code == 200, respuesta.content
+        return respuesta.json()
+
+    def exportar():
+        # Streamed bodies query while the response is iterated, after the middleware returned.
+        return b"".join(client.get("/api/v1/exportar/").streaming_content).decode().splitlines()
+
+    # The replica has not received the rows yet: reads come from it.
+    assert gastos() == []
+    assert gastos("/api/v1/async/gastos/") == []
+    assert client.get("/api/v1/resumen/").json()["total_gastos"] == "0.00"
+    assert len(exportar()) == 1
+    # Delta sync and everything outside a request stay on the primary.
+    assert len(gastos("/api/v1/sincronizar/")["gastos"]) == 1
+    assert Gasto.objects.count() == 1
+
+    creado = client.post(
+        "/api/v1/gastos/",
+        {"partida": partida.pk, "monto": "5.00", "fecha": str(date.today()), "tipo": "variable"},
+        format="json",
+    )
+    assert creado.status_code == 201
+    assert len(gastos()) == 2
+    assert len(gastos("/api/v1/async/gastos/")) == 2
+    assert len(exportar()) == 3
+
+    # Once the stickiness window is over, reads go back to the replica.
+    cache.delete(replicas._clave(usuario.pk))
+    assert gastos() == []
+
+
+def test_replicas_are_never_migrated(replica):
+    enrutador = replicas.EnrutadorReplicas()
+    assert enrutador.allow_migrate(replica, "finanzas") is False
+    assert enrutador.allow_migrate("default", "finanzas") is None
+    assert enrutador.db_for_read(Gasto) is None
+    assert enrutador.db_for_write(Gasto) == "default"
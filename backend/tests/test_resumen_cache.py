@@ -0,0 +1,62 @@
+import time
+from decimal import Decimal
+
+import pytest
+from django.core.cache.backends.locmem import LocMemCache
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from core import caches
+from finanzas import cache
+from finanzas.models import Ingreso
+
+
+@pytest.mark.django_db
+def test_resumen_is_cached_and_invalidated_on_write(settings, django_capture_on_commit_callbacks):
+    settings.ALLOWED_HOSTS.append("testserver")
+    user = get_user_model().objects.create_user(username="cacheado", password="secret")
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    primera = client.get("/api/v1/resumen/")
+    etag = primera["ETag"]
+    with CaptureQueriesContext(connection) as queries:
+        no_modificado = client.get("/api/v1/resumen/", HTTP_IF_NONE_MATCH=etag)
+        cacheado = client.get("/api/v1/resumen/")
+    assert no_modificado.status_code == 304
+    assert cacheado.json() == primera.json()
+    assert len(queries) == 0
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Ingreso.objects.create(usuario=user, monto=Decimal("500.00"), fecha=timezone.localdate())
+
+    actualizado = client.get("/api/v1/resumen/", HTTP_IF_NONE_MATCH=etag)
+    assert actualizado.status_code == 200
+    assert actualizado["ETag"] != etag
+    assert Decimal(actualizado.json()["total_ingresos"]) == Decimal("500.00")
+
+
+def test_versions_expire_in_per_process_caches(settings, monkeypatch):
+    """Two workers with their own LocMemCache: the one that did not serve the write catches up on expiry."""
+
+    settings.FINANZAS_CACHE_VERSION_SEGUNDOS = 0.3
+    workers = [LocMemCache(f"worker-{indice}", {}) for indice in range(2)]
+
+    def en(indice):
+        monkeypatch.setattr(cache, "_cache", lambda: workers[indice])
+
+    en(1)
+    anterior = cache.version_usuario(7)
+    en(0)
+    cache.version_usuario(7)
+    cache.invalidar_usuario(7)
+    en(1)
+    assert cache.version_usuario(7) == anterior
+    time.sleep(0.35)
+    assert cache.version_usuario(7) > anterior
+
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": "redis://x"}}
+    assert caches.compartida() and cache._vida_version() is None
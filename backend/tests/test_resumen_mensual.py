@@ -0,0 +1,72 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas import resumenes
+from finanzas.models import Gasto, Ingreso, Partida, ResumenMensual
+
+
+@pytest.mark.django_db
+def test_rollup_follows_creates_moves_and_deletes():
+    user = get_user_model().objects.create_user(username="rollup", password="secret")
+    comida = Partida.objects.create(usuario=user, nombre="Comida", monto_asignado=Decimal("100.00"))
+    hogar = Partida.objects.create(usuario=user, nombre="Hogar", monto_asignado=Decimal("100.00"))
+
+    gasto = Gasto.objects.create(usuario=user, partida=comida, monto="30.00", fecha=date(2024, 1, 10))
+    Gasto.objects.create(usuario=user, categoria="Taxi", monto="5.00", fecha=date(2024, 1, 11))
+    ingreso = Ingreso.objects.create(usuario=user, monto="1000.00", fecha=date(2024, 1, 1))
+
+    gasto.partida = hogar
+    gasto.fecha = date(2024, 2, 3)
+    gasto.monto = Decimal("45.00")
+    gasto.save()
+    ingreso.delete()
+
+    assert resumenes.verificar(user.pk) == []
+    fila = ResumenMensual.objects.get(usuario=user, mes=date(2024, 2, 1), partida=hogar)
+    assert fila.total_gastos == Decimal("45.00")
+    assert fila.cantidad_gastos == 1
+    assert not ResumenMensual.objects.filter(usuario=user, partida=comida).exists()
+
+    hogar.delete()
+    assert resumenes.verificar(user.pk) == []
+
+
+@pytest.mark.django_db
+def test_resumen_reads_totals_from_rollup(settings):
+    settings.ALLOWED_HOSTS.append("testserver")
+    user = get_user_model().objects.create_user(username="dashboard", password="secret")
+    partida = Partida.objects.create(usuario=user, nombre="Servicios", monto_asignado=Decimal("100.00"))
+    hoy = timezone.localdate()
+    Gasto.objects.create(usuario=user, partida=partida, monto="25.50", fecha=hoy)
+    Gasto.objects.create(usuario=user, categoria="Cine", monto="10.00", fecha=hoy)
+    Ingreso.objects.create(usuario=user, monto="200.00", fecha=hoy)
+    client = APIClient()
+    client.force_authenticate(user=user)
+
+    data = client.get("/api/v1/resumen/").json()
+
+    assert Decimal(data["total_gastos"]) == Decimal("35.50")
+    assert Decimal(data["total_ingresos"]) == Decimal("200.00")
+    assert {key: Decimal(value) for key, value in data["gastos_por_categoria"].items()} == {
+        "Servicios": Decimal("25.50"),
+        "Cine": Decimal("10.00"),
+    }
+
+
+@pytest.mark.django_db
+def test_reconstruir_resumenes_detects_and_repairs_drift():
+    user = get_user_model().objects.create_user(username="drift", password="secret")
+    Ingreso.objects.create(usuario=user, monto="50.00", fecha=date(2024, 3, 5))
+    ResumenMensual.objects.filter(usuario=user).update(total_ingresos=Decimal("1.00"))
+
+    with pytest.raises(CommandError):
+        call_command("reconstruir_resumenes", "--verificar")
+
+    call_command("reconstruir_resumenes", "--usuario", str(user.pk))
+    call_command("reconstruir_resumenes", "--verificar")
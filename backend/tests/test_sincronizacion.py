@@ -0,0 +1,105 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from finanzas import sincronizacion
+from finanzas.models import Eliminacion, Gasto, Ingreso, Partida
+
+
+@pytest.fixture
+def usuario():
+    return get_user_model().objects.create_user(username="sincronizado", password="secret")
+
+
+@pytest.fixture
+def cliente(usuario):
+    client = APIClient()
+    client.force_authenticate(user=usuario)
+    return client
+
+
+def _token(momento):
+    return sincronizacion.codificar_token(momento)
+
+
+@pytest.mark.django_db
+def test_sync_returns_only_changes_since_the_token(settings, usuario, cliente):
+    settings.SINCRONIZACION_MARGEN_SEGUNDOS = 0
+    hoy = timezone.localdate()
+    partida = Partida.objects.create(usuario=usuario, nombre="Hogar", monto_asignado=Decimal("100.00"))
+    antiguo = Gasto.objects.create(usuario=usuario, partida=partida, monto=Decimal("10.00"), fecha=hoy)
+    borrado = Gasto.objects.create(usuario=usuario, categoria="Taxi", monto=Decimal("5.00"), fecha=hoy)
+    Ingreso.objects.create(usuario=usuario, monto=Decimal("900.00"), fecha=hoy)
+
+    completa = cliente.get("/api/v1/sincronizar/").json()
+    assert completa["completa"] is True
+    assert len(completa["gastos"]) == 2 and len(completa["ingresos"]) == 1 and len(completa["partidas"]) == 1
+
+    nuevo = Gasto.objects.create(usuario=usuario, categoria="Cine", monto=Decimal("7.00"), fecha=hoy)
+    borrado_id = borrado.pk
+    borrado.delete()
+    delta = cliente.get("/api/v1/sincronizar/", {"token": completa["token"]}).json()
+
+    assert delta["completa"] is False
+    assert [fila["id"] for fila in delta["gastos"]] == [nuevo.pk]
+    assert delta["gastos"][0] == cliente.get(f"/api/v1/gastos/{nuevo.pk}/").json()
+    assert delta["ingresos"] == []
+    assert delta["eliminados"] == {"gastos": [borrado_id], "ingresos": [], "partidas": []}
+    # Gastos changed, so the partidas' month spend is resent.
+    assert [fila["id"] for fila in delta["partidas"]] == [partida.pk]
+
+    siguiente = cliente.get("/api/v1/sincronizar/", {"token": delta["token"]}).json()
+    assert siguiente["gastos"] == siguiente["partidas"] == []
+    assert antiguo.pk not in [fila["id"] for fila in delta["gastos"]]
+
+
+@pytest.mark.django_db
+def test_deleting_a_partida_resends_its_gastos(settings, usuario, cliente):
+    settings.SINCRONIZACION_MARGEN_SEGUNDOS = 0
+    partida = Partida.objects.create(usuario=usuario, nombre="Ocio", monto_asignado=Decimal("50.00"))
+    gasto = Gasto.objects.create(usuario=usuario, partida=partida, categoria="Cine", monto=Decimal("10.00"), fecha=timezone.localdate())
+    token = cliente.get("/api/v1/sincronizar/").json()["token"]
+
+    partida_id = partida.pk
+    partida.delete()
+    delta = cliente.get("/api/v1/sincronizar/", {"token": token}).json()
+
+    assert delta["eliminados"]["partidas"] == [partida_id]
+    assert [(fila["id"], fila["partida"]) for fila in delta["gastos"]] == [(gasto.pk, None)]
+
+
+@pytest.mark.django_db
+def test_batch_deletes_leave_tombstones_but_user_deletion_does_not(usuario, cliente):
+    ids = [
+        Ingreso.objects.create(usuario=usuario, monto=Decimal("1.00"), fecha=timezone.localdate()).pk
+        for _ in range(3)
+    ]
+    assert cliente.delete("/api/v1/ingresos/lote/", ids, format="json").status_code == 200
+    assert sorted(Eliminacion.objects.filter(modelo="ingreso").values_list("objeto_id", flat=True)) == ids
+
+    Gasto.objects.create(usuario=usuario, categoria="Taxi", monto=Decimal("5.00"), fecha=timezone.localdate())
+    usuario.delete()
+    assert not Eliminacion.objects.exists()
+
+
+@pytest.mark.django_db
+def test_old_or_invalid_tokens(settings, usuario, cliente):
+    settings.SINCRONIZACION_RETENCION_DIAS = 30
+    Eliminacion.objects.create(
+        usuario=usuario, modelo="gasto", objeto_id=1, eliminado_en=timezone.now() - timedelta(days=31)
+    )
+
+    viejo = cliente.get("/api/v1/sincronizar/", {"token": _token(timezone.now() - timedelta(days=31))}).json()
+    assert viejo["completa"] is True
+    assert cliente.get("/api/v1/sincronizar/", {"token": "no-es-un-token"}).status_code == 400
+
+    with pytest.raises(CommandError, match="SINCRONIZACION_RETENCION_DIAS"):
+        call_command("purgar_eliminaciones", dias=29)
+    assert Eliminacion.objects.exists()
+    call_command("purgar_eliminaciones", dias=30)
+    assert not Eliminacion.objects.exists()
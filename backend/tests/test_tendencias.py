@@ -0,0 +1,78 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from finanzas.models import Gasto, Ingreso, Partida
+
+
+@pytest.fixture
+def movimientos():
+    user = get_user_model().objects.create_user(username="tendencias", password="secret")
+    partida = Partida.objects.create(usuario=user, nombre="Casa", monto_asignado=Decimal("500.00"))
+    Ingreso.objects.create(usuario=user, monto=Decimal("1000.00"), fecha=date(2024, 1, 2))
+    Gasto.objects.create(usuario=user, partida=partida, monto=Decimal("100.00"), fecha=date(2024, 1, 3))
+    Gasto.objects.create(usuario=user, partida=partida, monto=Decimal("50.00"), fecha=date(2024, 1, 10))
+    Gasto.objects.create(usuario=user, categoria="Ocio", monto=Decimal("20.00"), fecha=date(2024, 3, 5))
+    Gasto.objects.create(usuario=user, categoria="Ocio", monto=Decimal("5.00"), fecha=date(2025, 2, 1))
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client, partida
+
+
+@pytest.mark.django_db
+def test_monthly_trend_reads_the_rollup_in_one_query(movimientos, django_assert_max_num_queries):
+    client, partida = movimientos
+
+    with django_assert_max_num_queries(3):
+        response = client.get("/api/v1/tendencias/", {"desde": "2024-01-15", "hasta": "2024-03-20"})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["desde"], data["hasta"]) == ("2024-01-01", "2024-03-31")
+    assert [tramo["inicio"] for tramo in data["resultados"]] == ["2024-01-01", "2024-02-01", "2024-03-01"]
+    enero, febrero, marzo = data["resultados"]
+    assert (enero["ingresos"], enero["gastos"], enero["saldo"]) == ("1000.00", "150.00", "850.00")
+    assert enero["partidas"] == [{"partida": partida.pk, "total": "150.00"}]
+    assert febrero == {"inicio": "2024-02-01", "ingresos": "0.00", "gastos": "0.00", "saldo": "0.00", "partidas": []}
+    assert marzo["partidas"] == [{"partida": None, "total": "20.00"}]
+
+
+@pytest.mark.django_db
+def test_weekly_and_yearly_buckets(movimientos):
+    client, _ = movimientos
+
+    semanas = client.get("/api/v1/tendencias/", {"periodo": "semana", "desde": "2024-01-01", "hasta": "2024-01-14"})
+    anios = client.get("/api/v1/tendencias/", {"periodo": "anio", "desde": "2024-06-01", "hasta": "2025-06-01"})
+
+    assert [(t["inicio"], t["gastos"]) for t in semanas.json()["resultados"]] == [
+        ("2024-01-01", "100.00"),
+        ("2024-01-08", "50.00"),
+    ]
+    assert [(t["inicio"], t["ingresos"], t["gastos"]) for t in anios.json()["resultados"]] == [
+        ("2024-01-01", "1000.00", "170.00"),
+        ("2025-01-01", "0.00", "5.00"),
+    ]
+
+
+@pytest.mark.django_db
+def test_trend_rejects_invalid_parameters(movimientos):
+    client, _ = movimientos
+    assert client.get("/api/v1/tendencias/", {"periodo": "dia"}).status_code == 400
+    assert client.get("/api/v1/tendencias/", {"desde": "2024-02-01", "hasta": "2024-01-01"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_trend_bounds_the_range(movimientos):
+    client, _ = movimientos
+    assert client.get("/api/v1/tendencias/", {"hasta": "9999-12-31"}).status_code == 400
+    ultimo = client.get("/api/v1/tendencias/", {"desde": "9998-01-01", "hasta": "9998-12-31", "periodo": "semana"})
+    assert ultimo.status_code == 200
+
+    respuesta = client.get("/api/v1/tendencias/", {"desde": "1900-01-01", "periodo": "semana"})
+    assert respuesta.status_code == 400
+    assert "262" in respuesta.json()["desde"]
+    anios = client.get("/api/v1/tendencias/", {"desde": "1925-01-01", "hasta": "2024-12-31", "periodo": "anio"})
+    assert len(anios.json()["resultados"]) == 100
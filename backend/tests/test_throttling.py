@@ -0,0 +1,100 @@
+import pytest
+from django.contrib.auth import get_user_model
+from rest_framework.test import APIClient
+
+from accounts.tokens import tokens_para
+from core import throttling
+
+
+class Reloj:
+    def __init__(self, ahora: float = 1_000_020.0) -> None:
+        self.ahora = ahora
+
+    def __call__(self) -> float:
+        return self.ahora
+
+
+def test_sliding_window_counter():
+    assert throttling.parsear_tasa("5/min") == (5, 60)
+    assert throttling.parsear_tasa("100/15m") == (100, 900)
+    with pytest.raises(ValueError):
+        throttling.parsear_tasa("muchas")
+
+    reloj = Reloj(600.0)
+    almacen = throttling.AlmacenMemoria(reloj=reloj)
+    assert [almacen.consumir("k", 4, 60).permitido for _ in range(5)] == [True] * 4 + [False]
+    # The full current window has to become the previous one and fade by 0/4.
+    assert almacen.consumir("k", 4, 60).espera == pytest.approx(60.0)
+    assert all(almacen.consumir("j", 8, 60).permitido for _ in range(8))
+
+    # A quarter into the next window three quarters of the previous count still weigh.
+    reloj.ahora = 675.0
+    assert [almacen.consumir("k", 4, 60).permitido for _ in range(2)] == [True, False]
+    rechazo = almacen.consumir("j", 4, 60)
+    assert (rechazo.permitido, rechazo.espera) == (False, pytest.approx(15.0))
+    reloj.ahora = 705.0
+    assert almacen.consumir("j", 4, 60).permitido
+
+    reloj.ahora = 900.0
+    almacen.maximo = 1
+    almacen.consumir("nueva", 4, 60)
+    assert list(almacen._contadores) == ["nueva"]
+
+
+@pytest.fixture
+def reloj_fijo(monkeypatch):
+    """Keep the requests of a test inside one window, whatever the wall clock."""
+
+    monkeypatch.setattr(throttling, "_almacen", throttling.AlmacenMemoria(reloj=Reloj()))
+
+
+@pytest.mark.django_db
+def test_login_is_throttled_per_username_and_ip(settings, reloj_fijo):
+    settings.THROTTLE_TASAS = {**settings.THROTTLE_TASAS, "login_usuario": "3/min", "login_ip": "5/min"}
+    get_user_model().objects.create_user(username="victima", password="secreto-123")
+    client = APIClient()
+
+    def intentar(username):
+        return client.post("/api/v1/auth/login/", {"username": username, "password": "mala"}, format="json")
+
+    assert [intentar(" Victima ").status_code for _ in range(3)] == [401, 401, 401]
+    bloqueado = intentar("victima")
+    assert bloqueado.status_code == 429
+    assert 0 < int(bloqueado["Retry-After"]) <= 120
+
+    # Other clients can still log in as the same user.
+    otra_ip = APIClient(REMOTE_ADDR="10.0.0.2")
+    assert otra_ip.post("/api/v1/auth/login/", {"username": "victima", "password": "secreto-123"}).status_code == 200
+
+    assert intentar("otro").status_code == 401
+    assert intentar("otro").status_code == 429
+
+
+@pytest.mark.django_db(transaction=True)
+def test_writes_are_throttled_per_user(settings, reloj_fijo):
+    settings.THROTTLE_TASAS = {**settings.THROTTLE_TASAS, "escritura": "2/min"}
+    usuario = get_user_model().objects.create_user(username="escritor", password="secreto-123")
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {tokens_para(usuario).access_token}")
+    payload = {"monto": "10.00", "fecha": "2024-01-01", "tipo": "fijo"}
+
+    assert [client.post("/api/v1/ingresos/", payload, format="json").status_code for _ in range(3)] == [201, 201, 429]
+    assert client.get("/api/v1/ingresos/").status_code == 200
+    assert client.get("/api/v1/async/ingresos/").status_code == 200
+
+    settings.THROTTLE_TASAS = {**settings.THROTTLE_TASAS, "ip": "1/min"}
+    assert client.get("/api/v1/async/ingresos/").status_code == 429
+
+
+def test_redis_store_matches_the_memory_one():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    reloj = Reloj(600.0)
+    almacen = throttling.AlmacenRedis.__new__(throttling.AlmacenRedis)
+    almacen.cliente = fakeredis.FakeRedis()
+    almacen.script = almacen.cliente.register_script(throttling._SCRIPT_REDIS)
+    almacen.reloj = reloj
+
+    assert [almacen.consumir("k", 2, 60).permitido for _ in range(3)] == [True, True, False]
+    reloj.ahora = 690.0
+    assert [almacen.consumir("k", 2, 60).permitido for _ in range(2)] == [True, False]
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from finanzas.models import Gasto, Ingreso, Partida
+
+
+@pytest.fixture
+def cliente():
+    user = get_user_model().objects.create_user(username="asincrono", password="secret")
+    partida = Partida.objects.create(usuario=user, nombre="Hogar", monto_asignado=Decimal("300.00"))
+    hoy = timezone.localdate()
+    for dias in range(3):
+        Gasto.objects.create(usuario=user, partida=partida, monto=Decimal("40.00"), fecha=hoy - timedelta(days=dias))
+    Ingreso.objects.create(usuario=user, monto=Decimal("900.00"), fecha=hoy)
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+    return client
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    "ruta",
+    [
+        "resumen/",
+        "gastos/",
+        "gastos/?page_size=2",
+        "gastos/?fields=id,monto,partida_nombre",
+        "ingresos/?omit=observacion",
+        "partidas/",
+        "partidas/?fields=nombre,disponible_mes",
+    ],
+)
+def test_async_endpoints_match_the_sync_ones(cliente, ruta):
+    sincrona = cliente.get(f"/api/v1/{ruta}")
+    asincrona = cliente.get(f"/api/v1/async/{ruta}")
+
+    assert asincrona.status_code == 200
+    if "page_size" in ruta:
+        assert asincrona.json()["results"] == sincrona.json()["results"]
+    else:
+        assert asincrona.json() == sincrona.json()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_endpoints_require_authentication_and_get(cliente):
+    assert APIClient().get("/api/v1/async/resumen/").status_code == 401
+    assert cliente.get("/api/v1/async/gastos/?cursor=roto").status_code == 404
+    assert cliente.post("/api/v1/async/gastos/", {}).status_code == 405
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize("ruta", ["gastos/", "ingresos/", "partidas/"])
+def test_async_lists_answer_conditional_requests(cliente, ruta):
+    primera = cliente.get(f"/api/v1/async/{ruta}")
+    etag = primera["ETag"]
+
+    assert cliente.get(f"/api/v1/async/{ruta}", HTTP_IF_NONE_MATCH=etag).status_code == 304
+    assert cliente.get(f"/api/v1/async/{ruta}?page_size=1", HTTP_IF_NONE_MATCH=etag).status_code == 200
+    Ingreso.objects.create(usuario=Partida.objects.get().usuario, monto=Decimal("1.00"))
+    assert cliente.get(f"/api/v1/async/{ruta}", HTTP_IF_NONE_MATCH=etag).status_code == 200
+    assert cliente.get("/api/v1/async/gastos/?fields=nada").status_code == 400
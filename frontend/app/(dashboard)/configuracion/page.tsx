@@ -23,7 +23,7 @@ const schema = z
 type FormValues = z.infer<typeof schema>;
 
 export default function ConfiguracionPage() {
-  const { user, accessToken, refreshProfile } = useAuth();
+  const { user, accessToken, refreshProfile, updateTokens } = useAuth();
   const {
     register,
     handleSubmit,
@@ -39,9 +39,10 @@ export default function ConfiguracionPage() {
         password_actual: values.password_actual,
         password_nuevo: values.password_nuevo
       }),
-    onSuccess: async () => {
+    onSuccess: async (tokens) => {
       reset();
-      await refreshProfile();
+      updateTokens(tokens);
+      await refreshProfile(tokens.access);
     }
   });
 
@@ -1,18 +1,24 @@
 "use client";
 
-import { useQuery } from "@tanstack/react-query";
+import { useQuery, useQueryClient } from "@tanstack/react-query";
 import clsx from "clsx";
 
 import { useAuth } from "@/components/auth/auth-context";
 import { TransactionTable } from "@/components/transactions/TransactionTable";
-import { fetchResumenFinanciero } from "@/lib/api";
+import { fetchInicio } from "@/lib/api";
 
 export default function DashboardPage() {
   const { accessToken, user } = useAuth();
+  const queryClient = useQueryClient();
 
   const { data, isLoading, isError, error } = useQuery({
     queryKey: ["resumen", accessToken],
-    queryFn: () => fetchResumenFinanciero(accessToken ?? ""),
+    queryFn: async () => {
+      // One request for the summary and the budget items; the latter primes the partidas pages.
+      const inicio = await fetchInicio(accessToken ?? "", { incluir: ["partidas", "resumen"] });
+      queryClient.setQueryData(["partidas", accessToken], inicio.partidas);
+      return inicio.resumen;
+    },
     enabled: Boolean(accessToken)
   });
 
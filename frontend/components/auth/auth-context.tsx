@@ -27,6 +27,7 @@ type AuthContextValue = {
   login: (payload: LoginPayload) => Promise<void>;
   logout: (options?: { redirect?: boolean }) => void;
   refreshProfile: (token?: string) => Promise<void>;
+  updateTokens: (tokens: TokenResponse) => void;
 };
 
 const AuthContext = createContext<AuthContextValue | undefined>(undefined);
@@ -99,6 +100,15 @@ export function AuthProvider({ children }: { children: ReactNode }) {
     [persistTokens, refreshProfile, router]
   );
 
+  const updateTokens = useCallback(
+    (tokens: TokenResponse) => {
+      setAccessToken(tokens.access);
+      setRefreshToken(tokens.refresh);
+      persistTokens(tokens);
+    },
+    [persistTokens]
+  );
+
   const logout = useCallback(
     ({ redirect = true }: { redirect?: boolean } = {}) => {
       clearSession({ redirect });
@@ -129,8 +139,8 @@ export function AuthProvider({ children }: { children: ReactNode }) {
   }, [refreshProfile]);
 
   const value = useMemo<AuthContextValue>(
-    () => ({ user, accessToken, refreshToken, isLoading, login, logout, refreshProfile }),
-    [user, accessToken, refreshToken, isLoading, login, logout, refreshProfile]
+    () => ({ user, accessToken, refreshToken, isLoading, login, logout, refreshProfile, updateTokens }),
+    [user, accessToken, refreshToken, isLoading, login, logout, refreshProfile, updateTokens]
   );
 
   return <AuthContext.Provider value={value}>{children}</AuthContext.Provider>;
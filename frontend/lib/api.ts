@@ -64,6 +64,17 @@ export type ResumenFinanciero = {
   gastos_recientes: Gasto[];
 };
 
+export type InicioSeccion = "usuario" | "partidas" | "gastos" | "ingresos" | "resumen";
+
+export type Inicio = {
+  mes: string;
+  usuario?: UserProfile;
+  partidas?: Partida[];
+  gastos?: Gasto[];
+  ingresos?: Ingreso[];
+  resumen?: ResumenFinanciero;
+};
+
 type RequestOptions = {
   method?: "GET" | "POST" | "PUT" | "PATCH" | "DELETE";
   body?: unknown;
@@ -91,6 +102,15 @@ type ResumenResponse = Omit<ResumenFinanciero, "total_ingresos" | "total_gastos"
   gastos_recientes: GastoResponse[];
 };
 
+type InicioResponse = {
+  mes: string;
+  usuario?: UserProfile;
+  partidas?: PartidaResponse[];
+  gastos?: GastoResponse[];
+  ingresos?: IngresoResponse[];
+  resumen?: ResumenResponse;
+};
+
 export async function login(payload: LoginPayload): Promise<TokenResponse> {
   return request<TokenResponse>("/api/v1/auth/login/", { method: "POST", body: payload });
 }
@@ -102,8 +122,9 @@ export async function fetchProfile(accessToken: string): Promise<UserProfile> {
 export async function changePassword(
   accessToken: string,
   payload: { password_actual: string; password_nuevo: string }
-): Promise<{ detail: string }> {
-  return request<{ detail: string }>("/api/v1/auth/password/change/", {
+): Promise<{ detail: string } & TokenResponse> {
+  // El cambio revoca los tokens anteriores; la respuesta trae un par nuevo.
+  return request<{ detail: string } & TokenResponse>("/api/v1/auth/password/change/", {
     method: "POST",
     body: payload,
     token: accessToken
@@ -228,18 +249,25 @@ export async function deleteIngreso(token: string, id: number): Promise<void> {
 
 export async function fetchResumenFinanciero(token: string): Promise<ResumenFinanciero> {
   const data = await request<ResumenResponse>("/api/v1/resumen/", { token });
+  return mapResumen(data);
+}
+
+export async function fetchInicio(
+  token: string,
+  options: { mes?: string; incluir?: InicioSeccion[] } = {}
+): Promise<Inicio> {
+  const params = new URLSearchParams();
+  if (options.mes) params.set("mes", options.mes);
+  if (options.incluir) params.set("incluir", options.incluir.join(","));
+  const query = params.toString();
+  const data = await request<InicioResponse>(`/api/v1/inicio/${query ? `?${query}` : ""}`, { token });
   return {
-    total_ingresos: parseNumber(data.total_ingresos),
-    total_gastos: parseNumber(data.total_gastos),
-    saldo: parseNumber(data.saldo),
-    ahorro_porcentaje: parseNumber(data.ahorro_porcentaje),
-    gastos_por_categoria: Object.fromEntries(
-      Object.entries(data.gastos_por_categoria).map(([key, value]) => [key, parseNumber(value)])
-    ),
-    partidas: data.partidas.map(mapPartida),
-    sugerencias: data.sugerencias,
-    ingresos_recientes: data.ingresos_recientes.map(mapIngreso),
-    gastos_recientes: data.gastos_recientes.map(mapGasto)
+    mes: data.mes,
+    usuario: data.usuario,
+    partidas: data.partidas?.map(mapPartida),
+    gastos: data.gastos?.map(mapGasto),
+    ingresos: data.ingresos?.map(mapIngreso),
+    resumen: data.resumen ? mapResumen(data.resumen) : undefined
   };
 }
 
@@ -285,6 +313,22 @@ function parseNumber(value: string | number | null | undefined): number {
   return 0;
 }
 
+function mapResumen(data: ResumenResponse): ResumenFinanciero {
+  return {
+    total_ingresos: parseNumber(data.total_ingresos),
+    total_gastos: parseNumber(data.total_gastos),
+    saldo: parseNumber(data.saldo),
+    ahorro_porcentaje: parseNumber(data.ahorro_porcentaje),
+    gastos_por_categoria: Object.fromEntries(
+      Object.entries(data.gastos_por_categoria).map(([key, value]) => [key, parseNumber(value)])
+    ),
+    partidas: data.partidas.map(mapPartida),
+    sugerencias: data.sugerencias,
+    ingresos_recientes: data.ingresos_recientes.map(mapIngreso),
+    gastos_recientes: data.gastos_recientes.map(mapGasto)
+  };
+}
+
 function mapPartida(data: PartidaResponse): Partida {
   return {
     ...data,